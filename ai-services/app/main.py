@@ -21,12 +21,22 @@ app.add_middleware(
 
 # Import routes
 from app.routes import generation, chat, scraping, analysis
+from app.services.gemini_service import gemini_service
+from app.services.scraper_service import scraper_service
+from app.services.crawler_service import crawler_service
+from app.services.monitor_service import page_monitor
+from app.services.conflict_prescreen import conflict_prescreen
 
 app.include_router(generation.router, prefix="/api/ai", tags=["generation"])
 app.include_router(chat.router, prefix="/api/ai", tags=["chat"])
 app.include_router(scraping.router, prefix="/api/ai", tags=["scraping"])
 app.include_router(analysis.router, prefix="/api/ai", tags=["analysis"])
 
+@app.on_event("shutdown")
+async def shutdown():
+    # The scraper's Chromium outlives requests, so close it with the app
+    await scraper_service.close()
+
 @app.get("/health")
 def health_check():
     return {
@@ -35,6 +45,16 @@ def health_check():
         "version": "1.0.0"
     }
 
+@app.get("/stats")
+def service_stats():
+    return {
+        "llm": gemini_service.get_stats(),
+        "scraper": scraper_service.get_stats(),
+        "crawler": crawler_service.get_stats(),
+        "monitor": page_monitor.get_stats(),
+        "conflict_prescreen": conflict_prescreen.get_stats()
+    }
+
 @app.get("/")
 def root():
     return {
@@ -1,11 +1,18 @@
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import List, Optional, Dict
 from app.services.gemini_service import gemini_service
+from app.services.conflict_prescreen import conflict_prescreen
+from app.utils.helpers import format_sse_event, SSE_HEADERS
 import json
+import os
 
 router = APIRouter()
 
+# Conflict-check proposed edits before they are accepted (one more Gemini call per edit)
+EDIT_CONFLICT_CHECK = os.getenv('CHAT_EDIT_CONFLICT_CHECK', 'false').lower() not in ('0', 'false', 'no')
+
 class ChatRequest(BaseModel):
     project_id: str
     message: str
@@ -26,23 +33,53 @@ class ChatResponse(BaseModel):
 async def chat_with_ai(request: ChatRequest):
     """Chat with Gemini AI to refine BRD"""
     try:
-        # Detect intent
-        intent = detect_intent(request.message)
-        
-        if intent == "generate":
-            return await handle_generate_request(request)
-        elif intent == "web_scraping":
-            return await handle_scraping_request(request)
-        elif intent == "conflict_check":
-            return await handle_conflict_check(request)
-        elif intent == "edit":
-            return await handle_edit_request(request)
-        else:
-            return await handle_general_chat(request)
+        return await dispatch_chat(request, detect_intent(request.message))
             
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/chat/stream")
+async def chat_with_ai_stream(request: ChatRequest):
+    """Chat as a text/event-stream; general replies are streamed token by token"""
+    intent = detect_intent(request.message)
+    
+    async def event_stream():
+        try:
+            if intent == "general":
+                parts = []
+                async for chunk in gemini_service.stream_content(
+                    build_general_chat_prompt(request),
+                    max_tokens=200,
+                    use_cache=False
+                ):
+                    parts.append(chunk)
+                    yield format_sse_event("token", {"text": chunk})
+                response = ChatResponse(message=''.join(parts))
+            else:
+                # Structured intents produce suggestions/updates, sent whole
+                response = await dispatch_chat(request, intent)
+            
+            yield format_sse_event("done", response.model_dump())
+            
+        except Exception as e:
+            # Headers are already sent, so report failures in-band
+            yield format_sse_event("error", {"detail": str(e)})
+    
+    return StreamingResponse(event_stream(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+async def dispatch_chat(request: ChatRequest, intent: str) -> ChatResponse:
+    """Route a chat message to the handler for its intent"""
+    if intent == "generate":
+        return await handle_generate_request(request)
+    elif intent == "web_scraping":
+        return await handle_scraping_request(request)
+    elif intent == "conflict_check":
+        return await handle_conflict_check(request)
+    elif intent == "edit":
+        return await handle_edit_request(request)
+    else:
+        return await handle_general_chat(request)
+
 def detect_intent(message: str) -> str:
     """Detect user intent from message"""
     message_lower = message.lower()
@@ -104,37 +141,18 @@ async def handle_conflict_check(request: ChatRequest) -> ChatResponse:
             suggestions=[]
         )
     
-    prompt = f"""Analyze this BRD content for conflicting requirements:
-
-{json.dumps(request.context.get('content', {}), indent=2)}
-
-Identify any contradictions, inconsistencies, or conflicting statements.
-Look for conflicts in:
-- Timelines (different deadlines mentioned)
-- Budget (different amounts)
-- Scope (feature X required vs feature X out of scope)
-- Technical requirements (conflicting technologies)
-
-Return ONLY a JSON array of conflicts in this format:
-[
-  {{
-    "type": "timeline_conflict",
-    "description": "Requirement A says Q2 2024, but Requirement B says Q4 2024",
-    "severity": "high",
-    "sources": ["Section A", "Section B"]
-  }}
-]
-
-If no conflicts found, return: []
-"""
-    
     try:
-        response = await gemini_service.generate_content_with_json(prompt)
-        conflicts = response if isinstance(response, list) else response.get('conflicts', [])
+        # Only candidate pairs found locally and not judged before are sent to Gemini
+        result = await conflict_prescreen.check(request.context.get('content', {}), project_id=request.project_id)
+        conflicts = result['conflicts']
+        unchecked = (
+            f" {result['truncated_candidates']} more candidate pair(s) were not checked."
+            if result['truncated_candidates'] else ""
+        )
         
         if conflicts:
             return ChatResponse(
-                message=f"Found {len(conflicts)} potential conflict(s) in your BRD. Review them carefully.",
+                message=f"Found {len(conflicts)} potential conflict(s) in your BRD. Review them carefully.{unchecked}",
                 suggestions=[
                     Suggestion(
                         type="conflict",
@@ -147,7 +165,7 @@ If no conflicts found, return: []
             )
         else:
             return ChatResponse(
-                message="✅ No conflicts detected! Your BRD requirements appear to be consistent.",
+                message=f"✅ No conflicts detected! Your BRD requirements appear to be consistent.{unchecked}",
                 suggestions=[]
             )
     except:
@@ -186,8 +204,13 @@ Generate the updates now:"""
     try:
         updated_content = await gemini_service.generate_content_with_json(prompt, max_tokens=2000)
         
+        suggestions = []
+        if EDIT_CONFLICT_CHECK:
+            suggestions = await check_edited_sections(request.project_id, current_content, updated_content)
+        
         return ChatResponse(
             message="I've updated the BRD based on your request. The changes are highlighted in the preview.",
+            suggestions=suggestions,
             brd_update=updated_content
         )
     except Exception as e:
@@ -196,10 +219,60 @@ Generate the updates now:"""
             suggestions=[]
         )
 
+async def check_edited_sections(project_id: str, current_content: Dict, updated_content: Dict) -> List[Suggestion]:
+    """
+    Incremental conflict check of the BRD after an edit
+    
+    Only candidate pairs that involve an edited section are sent to Gemini;
+    verdicts for untouched section pairs come from the project's conflict state.
+    The edit is only a proposal, so the project's state is not updated.
+    
+    Args:
+        project_id: Project whose conflict state to reuse
+        current_content: BRD content before the edit
+        updated_content: Sections returned by the edit
+        
+    Returns:
+        Up to 3 conflict suggestions involving the edited sections
+    """
+    if not isinstance(current_content, dict) or not isinstance(updated_content, dict) or not updated_content:
+        return []
+    if list(updated_content) == ['content'] and isinstance(updated_content['content'], str):
+        # The edit reply was not JSON (parse_json_response's text wrapper), not a section
+        return []
+    try:
+        conflicts = await conflict_prescreen.detect(
+            {**current_content, **updated_content}, project_id=project_id, persist=False
+        )
+    except Exception as e:
+        print(f"⚠️  Conflict check after edit failed: {str(e)}")
+        return []
+    
+    edited = set(updated_content)
+    return [
+        Suggestion(
+            type="conflict",
+            text=conflict.get('description', 'Conflict detected'),
+            action="review",
+            data=conflict
+        )
+        for conflict in conflicts
+        if edited.intersection(conflict.get('sources', []))
+    ][:3]
+
 async def handle_general_chat(request: ChatRequest) -> ChatResponse:
     """Handle general conversation"""
     
-    prompt = f"""You are an AI Business Analyst assistant helping create Business Requirements Documents.
+    prompt = build_general_chat_prompt(request)
+    
+    # Conversational replies should not be served from the response cache
+    response = await gemini_service.generate_content(prompt, max_tokens=200, use_cache=False)
+    
+    return ChatResponse(message=response)
+
+def build_general_chat_prompt(request: ChatRequest) -> str:
+    """Build the prompt for general conversation"""
+    return f"""You are an AI Business Analyst assistant helping create Business Requirements Documents.
 
 Current context: {"BRD already generated" if request.context else "No BRD yet"}
 
@@ -208,8 +281,4 @@ User message: {request.message}
 Provide helpful, concise guidance. Be actionable and specific.
 Keep your response under 100 words.
 
-Your response:"""
-    
-    response = await gemini_service.generate_content(prompt, max_tokens=200)
-    
-    return ChatResponse(message=response)
\ No newline at end of file
+Your response:"""
\ No newline at end of file
@@ -1,8 +1,17 @@
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import List, Dict, Optional
+from typing import List, Dict, Literal, Optional
 from app.services.gemini_service import gemini_service
 from app.services.template_service import template_service
+from app.services.generation_service import (
+    generation_service,
+    SourceIndex,
+    template_terms
+)
+from app.utils.helpers import format_sse_event, SSE_HEADERS
+from app.utils.json_stream import IncrementalJSONParser
+import asyncio
 import json
 
 router = APIRouter()
@@ -11,10 +20,21 @@ class GenerateBRDRequest(BaseModel):
     project_id: str
     data_sources: Dict
     template: str = "comprehensive"
+    # "single": one call for the whole document
+    # "parallel": concurrent per-section calls merged into the same shape
+    generation_mode: Literal["single", "parallel"] = "single"
+    # Content and fingerprints from an earlier run; when both are given,
+    # only sections whose source items changed are regenerated. Fingerprints
+    # always describe each section's own per-section context, including after
+    # a single-mode run, so the follow-up call can reuse unaffected sections.
+    previous_content: Optional[Dict] = None
+    previous_fingerprints: Optional[Dict[str, Dict]] = None
 
 class GenerateBRDResponse(BaseModel):
     brd_content: Dict
     message: str
+    source_fingerprints: Dict[str, Dict] = {}
+    regenerated_sections: List[str] = []
 
 @router.post("/generate", response_model=GenerateBRDResponse)
 async def generate_brd(request: GenerateBRDRequest):
@@ -23,11 +43,104 @@ async def generate_brd(request: GenerateBRDRequest):
         # Load template structure
         template_structure = template_service.load_template(request.template)
         
-        # Format data sources
-        formatted_data = format_data_sources(request.data_sources)
+        incremental = request.previous_content is not None and request.previous_fingerprints is not None
         
-        # Generate BRD with Gemini
-        prompt = f"""You are an expert Business Analyst. Generate a comprehensive Business Requirements Document (BRD) from the following data sources.
+        if request.generation_mode == "parallel" or incremental:
+            # Fan out one smaller call per template section, skipping
+            # sections whose inputs are unchanged since the previous run
+            brd_content, fingerprints, regenerated = await generation_service.generate_sections(
+                template_structure,
+                request.data_sources,
+                previous_content=request.previous_content,
+                previous_fingerprints=request.previous_fingerprints
+            )
+            message = "BRD generated successfully using Gemini AI"
+            if incremental:
+                message = f"Regenerated {len(regenerated)} of {len(brd_content)} sections; the rest were unchanged"
+        else:
+            # Pick the source chunks most relevant to the template within the context budget
+            index = await asyncio.to_thread(SourceIndex, request.data_sources)
+            formatted_data, _ = index.assemble(template_terms(template_structure))
+            
+            # Generate BRD with Gemini
+            prompt = build_brd_prompt(template_structure, formatted_data)
+            
+            # Use JSON-specific method
+            brd_content = ensure_brd_structure(
+                await gemini_service.generate_content_with_json(prompt, max_tokens=4000)
+            )
+            message = "BRD generated successfully using Gemini AI"
+            
+            fingerprints = index.section_fingerprints(template_structure.get('sections', []))
+            regenerated = list(brd_content)
+        
+        return GenerateBRDResponse(
+            brd_content=brd_content,
+            message=message,
+            source_fingerprints=fingerprints,
+            regenerated_sections=regenerated
+        )
+        
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/generate/stream")
+async def generate_brd_stream(request: GenerateBRDRequest):
+    """
+    Generate a BRD as a text/event-stream
+    
+    Emits "token" events as text arrives, a "section" event as soon as each
+    top-level section object is complete, and a final "done" event with the
+    parsed document and its source fingerprints. Only single mode streams;
+    parallel and incremental generation go through /generate, which the
+    fingerprints from "done" can be passed to.
+    """
+    if (
+        request.generation_mode != "single"
+        or request.previous_content is not None
+        or request.previous_fingerprints is not None
+    ):
+        raise HTTPException(
+            status_code=400,
+            detail="Streaming supports single-mode generation only; use /generate for parallel or incremental runs"
+        )
+    
+    template_structure = template_service.load_template(request.template)
+    index = await asyncio.to_thread(SourceIndex, request.data_sources)
+    formatted_data, _ = index.assemble(template_terms(template_structure))
+    fingerprints = index.section_fingerprints(template_structure.get('sections', []))
+    prompt = gemini_service.json_prompt(build_brd_prompt(template_structure, formatted_data))
+    
+    async def event_stream():
+        try:
+            parts = []
+            sections = IncrementalJSONParser()
+            async for chunk in gemini_service.stream_content(prompt, max_tokens=4000):
+                parts.append(chunk)
+                yield format_sse_event("token", {"text": chunk})
+                
+                for section_id, section in sections.feed(chunk):
+                    yield format_sse_event("section", {"id": section_id, "section": section})
+            
+            brd_content = ensure_brd_structure(
+                gemini_service.parse_json_response(''.join(parts))
+            )
+            yield format_sse_event("done", GenerateBRDResponse(
+                brd_content=brd_content,
+                message="BRD generated successfully using Gemini AI",
+                source_fingerprints=fingerprints,
+                regenerated_sections=list(brd_content)
+            ).model_dump())
+            
+        except Exception as e:
+            # Headers are already sent, so report failures in-band
+            yield format_sse_event("error", {"detail": str(e)})
+    
+    return StreamingResponse(event_stream(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+def build_brd_prompt(template_structure: Dict, formatted_data: str) -> str:
+    """Build the full-document BRD generation prompt"""
+    return f"""You are an expert Business Analyst. Generate a comprehensive Business Requirements Document (BRD) from the following data sources.
 
 DATA SOURCES:
 {formatted_data}
@@ -63,47 +176,9 @@ Example format:
 }}
 
 Generate the complete BRD now."""
-        
-        # Use JSON-specific method
-        brd_content = await gemini_service.generate_content_with_json(prompt, max_tokens=4000)
-        
-        # Ensure proper structure
-        if not isinstance(brd_content, dict):
-            brd_content = {"raw_content": str(brd_content)}
-        
-        return GenerateBRDResponse(
-            brd_content=brd_content,
-            message="BRD generated successfully using Gemini AI"
-        )
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
 
-def format_data_sources(data_sources: Dict) -> str:
-    """Format data sources into readable text"""
-    formatted = []
-    
-    if "emails" in data_sources:
-        formatted.append("=== EMAILS ===")
-        emails = data_sources["emails"][:20] if isinstance(data_sources["emails"], list) else []
-        for email in emails:
-            formatted.append(f"From: {email.get('from', 'Unknown')}")
-            formatted.append(f"Subject: {email.get('subject', 'No subject')}")
-            formatted.append(f"Body: {email.get('body', '')[:300]}")
-            formatted.append("---")
-    
-    if "meetings" in data_sources:
-        formatted.append("\n=== MEETING TRANSCRIPTS ===")
-        meetings = data_sources["meetings"][:10] if isinstance(data_sources["meetings"], list) else []
-        for meeting in meetings:
-            formatted.append(f"Meeting: {meeting.get('meeting_id', 'Unknown')}")
-            formatted.append(f"Transcript: {meeting.get('transcript', '')[:500]}")
-            formatted.append("---")
-    
-    if "slack" in data_sources:
-        formatted.append("\n=== SLACK MESSAGES ===")
-        slack = data_sources["slack"][:30] if isinstance(data_sources["slack"], list) else []
-        for msg in slack:
-            formatted.append(f"[{msg.get('user', 'Unknown')}]: {msg.get('text', '')}")
-    
-    return "\n".join(formatted)
\ No newline at end of file
+def ensure_brd_structure(brd_content) -> Dict:
+    """Wrap non-object model output so the response always carries a dict"""
+    if not isinstance(brd_content, dict):
+        brd_content = {"raw_content": str(brd_content)}
+    return brd_content
@@ -1,7 +1,9 @@
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
-from typing import Dict, List
+from typing import Dict, List, Optional
 from app.services.scraper_service import scraper_service
+from app.services.crawler_service import crawler_service
+from app.services.monitor_service import page_monitor
 from app.services.gemini_service import gemini_service
 
 router = APIRouter()
@@ -13,6 +15,56 @@ class ScrapeRequest(BaseModel):
 class ScrapeResponse(BaseModel):
     insights: Dict
     suggestions: List[Dict]
+    fetch_tier: Optional[str] = None
+    cache_status: Optional[str] = None
+    analysis_cached: bool = False
+
+class BatchScrapeRequest(BaseModel):
+    urls: List[str]
+    project_id: str
+    max_depth: int = 0
+    max_pages: Optional[int] = None
+    time_budget_seconds: Optional[float] = None
+
+class CrawledPage(BaseModel):
+    url: str
+    depth: int = 0
+    status: str
+    title: Optional[str] = ''
+    meta_description: Optional[str] = ''
+    headings: List[str] = []
+    text: str = ''
+    fetch_tier: Optional[str] = None
+    error: Optional[str] = None
+
+class BatchScrapeResponse(BaseModel):
+    pages: List[CrawledPage]
+    insights: Dict
+    suggestions: List[Dict]
+    stats: Dict
+
+class MonitorRequest(BaseModel):
+    url: str
+    project_id: str
+    analyze: bool = True
+
+class MonitorResponse(BaseModel):
+    url: str
+    status: str
+    title: Optional[str] = ''
+    checked_at: float
+    previous_snapshot_at: Optional[float] = None
+    summary: Dict = {}
+    structure: Dict = {}
+    changes: List[Dict] = []
+    analysis: Optional[Dict] = None
+
+MAX_BATCH_URLS = 20
+MAX_CRAWL_DEPTH = 3
+# Characters of page text shared out across all crawled pages in the merged prompt
+BATCH_PROMPT_TEXT_BUDGET = 8000
+# Characters of changed content sent for a monitoring analysis
+MONITOR_PROMPT_DIFF_BUDGET = 6000
 
 @router.post("/scrape", response_model=ScrapeResponse)
 async def scrape_website(request: ScrapeRequest):
@@ -20,6 +72,19 @@ async def scrape_website(request: ScrapeRequest):
     try:
         # Scrape the website
         scraped_data = await scraper_service.scrape(request.url)
+        page_hash = scraped_data.get('content_hash')
+        
+        # Same content as last time: reuse the previous analysis
+        if page_hash:
+            previous = await scraper_service.get_cached_analysis(request.url, page_hash)
+            if previous is not None:
+                return ScrapeResponse(
+                    insights=previous.get('insights', {}),
+                    suggestions=previous.get('suggestions', []),
+                    fetch_tier=scraped_data.get('fetch_tier'),
+                    cache_status=scraped_data.get('cache_status'),
+                    analysis_cached=True
+                )
         
         # Analyze with Gemini
         analysis_prompt = f"""Analyze this competitor website data and provide actionable business insights:
@@ -60,6 +125,10 @@ Return ONLY valid JSON in this format:
         
         analysis = await gemini_service.generate_content_with_json(analysis_prompt, max_tokens=1500)
         
+        # Only a real analysis is reused for the unchanged page; an unparseable
+        # reply ({"content": text}) would otherwise be served for the cache lifetime
+        is_analysis = isinstance(analysis, dict) and ('insights' in analysis or 'suggestions' in analysis)
+        
         # Ensure proper structure
         if not isinstance(analysis, dict):
             analysis = {"insights": {"summary": str(analysis)}, "suggestions": []}
@@ -69,10 +138,174 @@ Return ONLY valid JSON in this format:
         if 'suggestions' not in analysis:
             analysis['suggestions'] = []
         
+        if page_hash and is_analysis:
+            await scraper_service.save_analysis(request.url, page_hash, {
+                'insights': analysis['insights'],
+                'suggestions': analysis['suggestions']
+            })
+        
         return ScrapeResponse(
             insights=analysis.get('insights', {}),
-            suggestions=analysis.get('suggestions', [])
+            suggestions=analysis.get('suggestions', []),
+            fetch_tier=scraped_data.get('fetch_tier'),
+            cache_status=scraped_data.get('cache_status')
         )
         
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Scraping failed: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Scraping failed: {str(e)}")
+
+@router.post("/scrape/batch", response_model=BatchScrapeResponse)
+async def scrape_batch(request: BatchScrapeRequest):
+    """Crawl several competitor sites concurrently and analyze them together"""
+    if not request.urls:
+        raise HTTPException(status_code=400, detail="At least one URL is required")
+    if len(request.urls) > MAX_BATCH_URLS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_URLS} URLs per batch")
+    if not 0 <= request.max_depth <= MAX_CRAWL_DEPTH:
+        raise HTTPException(status_code=400, detail=f"max_depth must be between 0 and {MAX_CRAWL_DEPTH}")
+
+    try:
+        crawl = await crawler_service.crawl(
+            request.urls,
+            max_depth=request.max_depth,
+            max_pages=request.max_pages,
+            time_budget=request.time_budget_seconds
+        )
+        pages = [CrawledPage(**page) for page in crawl['pages']]
+        scraped = [page for page in pages if page.status == 'ok']
+
+        insights, suggestions = {}, []
+        if scraped:
+            analysis = await gemini_service.generate_content_with_json(
+                build_batch_analysis_prompt(scraped),
+                max_tokens=2500
+            )
+            if isinstance(analysis, dict):
+                insights = analysis.get('insights', {})
+                suggestions = analysis.get('suggestions', [])
+            else:
+                insights = {"summary": str(analysis)}
+
+        return BatchScrapeResponse(
+            pages=pages,
+            insights=insights,
+            suggestions=suggestions,
+            stats=crawl['stats']
+        )
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Batch scraping failed: {str(e)}")
+
+def build_batch_analysis_prompt(pages: List[CrawledPage]) -> str:
+    """Build one competitive analysis prompt covering every crawled page"""
+    per_page = max(BATCH_PROMPT_TEXT_BUDGET // len(pages), 300)
+    sections = []
+    for index, page in enumerate(pages, 1):
+        sections.append(f"""--- PAGE {index} ---
+URL: {page.url}
+Title: {page.title or 'Unknown'}
+Headings: {', '.join(page.headings[:10])}
+Content: {page.text[:per_page]}""")
+
+    return f"""Analyze these competitor web pages together and provide actionable business insights:
+
+{chr(10).join(sections)}
+
+Compare the competitors and provide:
+1. Main product/service offerings across the market
+2. Key features highlighted (note which competitors offer them)
+3. Competitive advantages (what each does well)
+4. Gaps or weaknesses common to these competitors
+5. 3-5 specific recommendations for our BRD
+
+Return ONLY valid JSON in this format:
+{{
+  "insights": {{
+    "main_offerings": "...",
+    "key_features": ["feature1", "feature2"],
+    "competitive_advantages": ["advantage1", "advantage2"],
+    "gaps_identified": ["gap1", "gap2"]
+  }},
+  "suggestions": [
+    {{
+      "text": "Add feature X to match competitor capability",
+      "type": "feature",
+      "section": "functional_requirements",
+      "priority": "high"
+    }}
+  ]
+}}"""
+
+@router.post("/scrape/monitor", response_model=MonitorResponse)
+async def monitor_website(request: MonitorRequest):
+    """Check a competitor page for changes since the last check and analyze only what changed"""
+    try:
+        async def analyze_changes(result: Dict) -> Optional[Dict]:
+            if not result['changes']:
+                return None
+            analysis = await gemini_service.generate_content_with_json(
+                build_change_analysis_prompt(result),
+                max_tokens=1500
+            )
+            if not isinstance(analysis, dict):
+                analysis = {"summary": str(analysis)}
+            return analysis
+
+        # The new snapshot is only stored once its changes have been analyzed
+        result = await page_monitor.check(request.url, analyze=analyze_changes if request.analyze else None)
+
+        return MonitorResponse(**result)
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Monitoring failed: {str(e)}")
+
+@router.get("/scrape/monitor/history")
+async def monitor_history(url: str):
+    """List the stored snapshots of a monitored page"""
+    return {"url": url, "snapshots": await page_monitor.history(url)}
+
+def build_change_analysis_prompt(result: Dict) -> str:
+    """Build a prompt describing only the changed blocks of a monitored page"""
+    lines = []
+    used = 0
+    omitted = 0
+    for change in result['changes']:
+        where = f" (under \"{change['section']}\")" if change.get('section') else ''
+        if change['change'] == 'modified':
+            entry = f"MODIFIED {change['tag']}{where}:\n  before: {change['before']}\n  after: {change['after']}"
+        elif change['change'] == 'added':
+            entry = f"ADDED {change['tag']}{where}: {change['after']}"
+        else:
+            entry = f"REMOVED {change['tag']}{where}: {change['before']}"
+        if used + len(entry) > MONITOR_PROMPT_DIFF_BUDGET:
+            omitted += 1
+            continue
+        lines.append(entry)
+        used += len(entry)
+    if omitted:
+        lines.append(f"... {omitted} more changed block(s) omitted")
+
+    structure = result.get('structure', {})
+    return f"""A competitor web page changed since we last checked it. Explain what changed and what it means for our BRD.
+
+URL: {result['url']}
+Title: {result.get('title') or 'Unknown'}
+Headings added: {', '.join(structure.get('headings_added', [])) or 'none'}
+Headings removed: {', '.join(structure.get('headings_removed', [])) or 'none'}
+
+CHANGES:
+{chr(10).join(lines)}
+
+Return ONLY valid JSON in this format:
+{{
+  "summary": "One paragraph on what the competitor changed",
+  "brd_implications": ["implication1", "implication2"],
+  "suggestions": [
+    {{
+      "text": "Update pricing section to respond to competitor's new tier",
+      "type": "feature",
+      "section": "functional_requirements",
+      "priority": "high"
+    }}
+  ]
+}}"""
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Synthetic fixtures for the offline benchmarks
+Realistic request payloads, competitor-style HTML pages and a local fixture web server
+"""
+
+import hashlib
+import random
+from typing import Dict, List, Tuple
+
+from aiohttp import web
+
+
+PEOPLE = [
+    ("John Doe", "CEO"), ("Sarah Smith", "Product Manager"), ("Mike Chen", "Tech Lead"),
+    ("Lisa Park", "QA Lead"), ("Raj Patel", "Finance Director"), ("Emma Wilson", "UX Designer"),
+]
+
+REQUIREMENT_SENTENCES = [
+    "The mobile app must support OAuth 2.0 login for all users",
+    "Push notifications should include real-time alerts for order updates",
+    "Users need to be able to browse products offline",
+    "The checkout flow must include Stripe integration for card payments",
+    "The platform shall support both iOS and Android from day one",
+    "We will need at least 8 weeks for proper testing",
+    "Launch is targeted for Q2 2024 pending budget approval",
+    "The budget has been approved for $150,000 for phase one",
+    "GDPR and CCPA compliance is required to ship in Europe",
+    "The admin dashboard should have export to CSV and PDF",
+]
+
+NOISE_SENTENCES = [
+    "Anyone up for lunch at the new place downstairs?",
+    "Thanks everyone for joining today",
+    "I'll be out of office on Friday",
+    "Great work on the demo last week",
+]
+
+
+def sample_data_sources(
+    n_emails: int = 50,
+    n_meetings: int = 10,
+    n_slack: int = 100,
+    seed: int = 0
+) -> Dict[str, List[Dict]]:
+    """
+    Build a data_sources payload shaped like the parser output
+
+    Args:
+        n_emails: Number of emails
+        n_meetings: Number of meeting transcripts
+        n_slack: Number of Slack messages
+        seed: RNG seed
+
+    Returns:
+        Dictionary with emails, meetings and slack lists
+    """
+    rng = random.Random(seed)
+
+    def paragraph(sentences: int) -> str:
+        pool = REQUIREMENT_SENTENCES + NOISE_SENTENCES
+        return '. '.join(rng.choice(pool) for _ in range(sentences)) + '.'
+
+    emails = []
+    for i in range(n_emails):
+        sender, role = rng.choice(PEOPLE)
+        emails.append({
+            'from': f"{sender.split()[0].lower()}@company.com",
+            'to': 'team@company.com',
+            'date': f"2024-01-{(i % 28) + 1:02d}T09:30:00Z",
+            'subject': f"RE: Mobile App Requirements #{i}",
+            'body': f"Hi team,\n\n{paragraph(rng.randint(4, 10))}\n\nBest regards,\n{sender} ({role})"
+        })
+
+    meetings = []
+    for i in range(n_meetings):
+        lines = []
+        for minute in range(rng.randint(20, 40)):
+            speaker, _ = rng.choice(PEOPLE)
+            lines.append(f"[14:{minute:02d}] {speaker}: {paragraph(rng.randint(1, 3))}")
+        meetings.append({
+            'meeting_id': f"meeting_{i:03d}",
+            'date': f"2024-02-{(i % 28) + 1:02d}",
+            'participants': [name for name, _ in PEOPLE[:4]],
+            'transcript': '\n'.join(lines)
+        })
+
+    slack = []
+    for i in range(n_slack):
+        speaker, _ = rng.choice(PEOPLE)
+        slack.append({
+            'user': speaker,
+            'channel': rng.choice(['mobile-app', 'general', 'design']),
+            'timestamp': f"2024-03-01T10:{i % 60:02d}:00Z",
+            'text': paragraph(rng.randint(1, 2))
+        })
+
+    return {'emails': emails, 'meetings': meetings, 'slack': slack}
+
+
+def sample_brd_content(sections: int = 16, seed: int = 0) -> Dict[str, Dict]:
+    """
+    Build a generated-BRD-shaped document
+
+    Args:
+        sections: Number of sections
+        seed: RNG seed
+
+    Returns:
+        BRD content keyed by section ID
+    """
+    rng = random.Random(seed)
+    return {
+        f"section_{i:02d}": {
+            'title': f"Section {i}",
+            'content': '. '.join(rng.choice(REQUIREMENT_SENTENCES) for _ in range(rng.randint(3, 8))) + '.',
+            'completed': True
+        }
+        for i in range(sections)
+    }
+
+
+def make_page(index: int = 0, paragraphs: int = 40, js_shell: bool = False, seed: int = 0) -> str:
+    """
+    Build a competitor marketing page
+
+    Args:
+        index: Page number (varies title and content)
+        paragraphs: Number of body paragraphs
+        js_shell: Return a client-rendered shell with almost no text instead
+        seed: RNG seed
+
+    Returns:
+        HTML document
+    """
+    rng = random.Random(seed * 1000 + index)
+    title = f"Competitor {index} - Mobile Commerce Platform"
+
+    if js_shell:
+        return f"""<!DOCTYPE html>
+<html><head><title>{title}</title>
+<meta name="description" content="Loading...">
+<script src="/static/js/main.{index}.js"></script></head>
+<body><noscript>You need to enable JavaScript to run this app.</noscript>
+<div id="root"></div>
+<script>window.__INITIAL_STATE__ = {{"page": {index}}};</script>
+</body></html>"""
+
+    features = ['One-click checkout', 'Offline catalog', 'Loyalty rewards', 'Live chat support',
+                'AI recommendations', 'Multi-currency pricing', 'Subscription billing', 'Analytics dashboard']
+    body = []
+    for p in range(paragraphs):
+        if p % 5 == 0:
+            body.append(f"<h2>{rng.choice(features)}</h2>")
+        if p % 11 == 0:
+            body.append(f"<h3>Why teams choose us #{p}</h3>")
+        sentences = ' '.join(rng.choice(REQUIREMENT_SENTENCES) + '.' for _ in range(rng.randint(2, 6)))
+        body.append(f"<p class=\"copy\">{sentences} <a href=\"/pages/{(index + p) % 50}.html\">Learn more</a></p>")
+        if p % 7 == 0:
+            body.append("<ul>" + ''.join(f"<li>{f}</li>" for f in rng.sample(features, 3)) + "</ul>")
+
+    return f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+<meta name="description" content="Competitor {index} helps retailers launch mobile commerce apps.">
+<style>body {{ font-family: sans-serif; }} .copy {{ line-height: 1.5; }}</style>
+<script>window.analytics = {{ track: function() {{}} }};</script>
+</head>
+<body>
+<header><nav><a href="/">Home</a> <a href="/pricing.html">Pricing</a> <a href="/features.html">Features</a> <a href="/private/admin.html">Admin</a></nav></header>
+<main>
+<h1>{title}</h1>
+{''.join(body)}
+</main>
+<footer><p>&copy; 2024 Competitor {index}. All rights reserved.</p></footer>
+<script>console.log("loaded");</script>
+</body>
+</html>"""
+
+
+def build_site(pages: int = 50, paragraphs: int = 40, js_shells: int = 0, crawl_delay: float = 0) -> Dict[str, str]:
+    """
+    Build a set of fixture pages keyed by URL path
+
+    Args:
+        pages: Number of regular pages
+        paragraphs: Paragraphs per page
+        js_shells: Number of additional client-rendered shell pages
+        crawl_delay: Crawl-delay advertised in robots.txt (0 = none)
+
+    Returns:
+        Dictionary of path -> HTML
+    """
+    site = {f"/pages/{i}.html": make_page(i, paragraphs) for i in range(pages)}
+    site.update({f"/app/{i}.html": make_page(i, js_shell=True) for i in range(js_shells)})
+    site['/'] = make_page(0, paragraphs)
+    site['/robots.txt'] = "User-agent: *\nDisallow: /private/\n"
+    if crawl_delay:
+        site['/robots.txt'] += f"Crawl-delay: {crawl_delay}\n"
+    return site
+
+
+async def start_fixture_server(site: Dict[str, str], host: str = '127.0.0.1', port: int = 0) -> Tuple[web.AppRunner, str]:
+    """
+    Serve fixture pages from a local aiohttp server
+
+    Pages carry an ETag and answer conditional requests with 304. The dict is
+    read on every request, so tests can edit pages while the server runs.
+
+    Args:
+        site: Dictionary of path -> body (from build_site)
+        host: Interface to bind
+        port: Port to bind, 0 for any free port
+
+    Returns:
+        Tuple of (runner to clean up, base URL)
+    """
+    async def handle(request: web.Request) -> web.Response:
+        body = site.get(request.path)
+        if body is None:
+            return web.Response(status=404, text='Not found')
+        etag = '"' + hashlib.md5(body.encode('utf-8')).hexdigest() + '"'
+        if request.headers.get('If-None-Match') == etag:
+            return web.Response(status=304, headers={'ETag': etag})
+        content_type = 'text/plain' if request.path.endswith('.txt') else 'text/html'
+        return web.Response(text=body, content_type=content_type, headers={'ETag': etag})
+
+    app = web.Application()
+    app.router.add_get('/{tail:.*}', handle)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    site_server = web.TCPSite(runner, host, port)
+    await site_server.start()
+    bound_port = site_server._server.sockets[0].getsockname()[1]
+    return runner, f"http://{host}:{bound_port}"
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Benchmark the conflict pre-screen against sending the whole BRD to the LLM
+Reports LLM calls, prompt tokens and latency per check on the stub backend,
+and the cost of re-checking after single-section edits with and without the
+per-project conflict state.
+
+Usage (from ai-services/):
+    python -m app.scripts.benchmark_conflict_prescreen
+    python -m app.scripts.benchmark_conflict_prescreen --documents 50 --sections 24 --conflict-rate 0.3 --edits 10
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+# The benchmark always runs offline
+os.environ['LLM_BACKEND'] = 'stub'
+os.environ.setdefault('LLM_CACHE_ENABLED', 'false')
+# Measure the calls themselves, not the free-tier per-key quota
+os.environ.setdefault('GEMINI_KEY_RPM', '1000000')
+
+from app.scripts.bench_fixtures import REQUIREMENT_SENTENCES, sample_brd_content
+from app.scripts.benchmark_routes import git_commit, summarize
+from app.services.conflict_prescreen import ConflictPrescreen
+from app.services.gemini_service import GeminiService
+from app.utils.helpers import estimate_tokens
+
+CONFLICTING_STATEMENTS = [
+    ('timeline', "Launch is now expected in Q4 2024 after the vendor review."),
+    ('budget', "Finance capped phase one at $90,000 for the mobile app."),
+    ('scope', "The mobile app must not support OAuth 2.0 login for guest users."),
+    ('testing', "Testing is planned to take 3 weeks before launch."),
+]
+
+
+def reference_prompt(brd_content: Dict[str, Any]) -> str:
+    """The /conflicts prompt as it was before the pre-screen"""
+    return f"""Analyze this Business Requirements Document for conflicts, contradictions, and inconsistencies:
+
+BRD CONTENT:
+{json.dumps(brd_content, indent=2)}
+
+Look for conflicts in:
+1. Timeline conflicts (different deadlines, conflicting schedules)
+2. Scope conflicts (feature required in one place, out of scope in another)
+3. Budget conflicts (different amounts mentioned)
+4. Technical conflicts (incompatible technologies or approaches)
+5. Stakeholder conflicts (different requirements from different stakeholders)
+
+For each conflict found, provide:
+- id: unique identifier
+- type: category of conflict
+- description: clear explanation
+- sources: which sections conflict
+- resolution_options: 2-3 ways to resolve
+
+Return ONLY valid JSON array:
+[
+  {{
+    "id": "conf_001",
+    "type": "timeline_conflict",
+    "description": "Section A requires Q2 launch but Section B needs 6 months (Q3)",
+    "sources": ["executive_summary", "timeline"],
+    "resolution_options": [
+      {{"option": "Reduce scope for Q2 MVP", "impact": "Lower initial features"}},
+      {{"option": "Extend to Q3", "impact": "Delayed market entry"}}
+    ]
+  }}
+]
+
+If NO conflicts found, return: []"""
+
+
+def build_documents(count: int, sections: int, conflict_rate: float, seed: int) -> List[Dict[str, Any]]:
+    """Generated BRDs; a share of them get one contradicting statement appended to a section"""
+    rng = random.Random(seed)
+    documents = []
+    for index in range(count):
+        brd = sample_brd_content(sections, seed=seed + index)
+        if rng.random() < conflict_rate:
+            section_id, statement = rng.choice(CONFLICTING_STATEMENTS)
+            brd[f"{section_id}_notes"] = {'title': section_id.title(), 'content': statement, 'completed': True}
+        documents.append(brd)
+    return documents
+
+
+async def run_reference(llm: GeminiService, documents: List[Dict[str, Any]]) -> Dict[str, Any]:
+    latencies, prompt_tokens = [], 0
+    for brd in documents:
+        prompt = reference_prompt(brd)
+        prompt_tokens += estimate_tokens(prompt)
+        started = time.perf_counter()
+        await llm.generate_content_with_json(prompt, max_tokens=2000)
+        latencies.append(time.perf_counter() - started)
+    return {'llm_calls': len(documents), 'prompt_tokens': prompt_tokens, 'latency': summarize(latencies)}
+
+
+async def run_prescreen(llm: GeminiService, documents: List[Dict[str, Any]]) -> Dict[str, Any]:
+    prescreen = ConflictPrescreen(llm=llm)
+    latencies, conflicts = [], 0
+    for brd in documents:
+        started = time.perf_counter()
+        conflicts += len(await prescreen.detect(brd, max_tokens=2000))
+        latencies.append(time.perf_counter() - started)
+    stats = prescreen.get_stats()
+    return {
+        'llm_calls': stats['llm_calls'],
+        'llm_skipped': stats['llm_skipped'],
+        'prompt_tokens': round(stats['avg_prompt_tokens'] * stats['llm_calls']),
+        'candidates': stats['candidates'],
+        'confirmed': conflicts,
+        'avg_screen_ms': stats['avg_screen_ms'],
+        'latency': summarize(latencies),
+    }
+
+
+async def run_edits(documents: List[Dict[str, Any]], edits: int, seed: int, incremental: bool) -> Dict[str, Any]:
+    """Check each document, then re-check after each of `edits` single-section rewrites"""
+    rng = random.Random(seed)
+    prescreen = ConflictPrescreen(llm=GeminiService())
+    latencies = []
+    for index, original in enumerate(documents):
+        brd = dict(original)
+        project_id = f"bench-{index}" if incremental else None
+        await prescreen.detect(brd, project_id=project_id)
+        for _ in range(edits):
+            section_id = rng.choice(list(brd))
+            sentences = rng.sample(REQUIREMENT_SENTENCES + [statement for _, statement in CONFLICTING_STATEMENTS], 4)
+            brd[section_id] = dict(brd[section_id], content='. '.join(sentences) + '.')
+            started = time.perf_counter()
+            await prescreen.detect(brd, project_id=project_id)
+            latencies.append(time.perf_counter() - started)
+    stats = prescreen.get_stats()
+    return {
+        'rechecks': len(latencies),
+        'llm_calls': stats['llm_calls'],
+        'candidates_sent': stats['candidates_sent'],
+        'verdicts_reused': stats['verdicts_reused'],
+        'prompt_tokens': round(stats['avg_prompt_tokens'] * stats['llm_calls']),
+        'latency': summarize(latencies),
+    }
+
+
+def run(args) -> Dict:
+    os.environ['STUB_LATENCY_MS'] = str(args.latency_ms)
+    documents = build_documents(args.documents, args.sections, args.conflict_rate, args.seed)
+    # Separate clients so one arm's key-pool quota use does not throttle the other
+    reference = asyncio.run(run_reference(GeminiService(), documents))
+    prescreen = asyncio.run(run_prescreen(GeminiService(), documents))
+    edits = {}
+    if args.edits:
+        edits = {
+            'full': asyncio.run(run_edits(documents, args.edits, args.seed, incremental=False)),
+            'incremental': asyncio.run(run_edits(documents, args.edits, args.seed, incremental=True)),
+        }
+    return {
+        'meta': {
+            'git_commit': git_commit(),
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'documents': args.documents,
+            'sections': args.sections,
+            'conflict_rate': args.conflict_rate,
+            'stub_latency_ms': args.latency_ms,
+        },
+        'reference': reference,
+        'prescreen': prescreen,
+        'edits': edits,
+    }
+
+
+def parse_args(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Benchmark the deterministic conflict pre-screen")
+    parser.add_argument('--documents', type=int, default=40)
+    parser.add_argument('--sections', type=int, default=16)
+    parser.add_argument('--conflict-rate', type=float, default=0.25, help="Share of documents with an injected conflict")
+    parser.add_argument('--edits', type=int, default=5, help="Single-section edits re-checked per document (0 to skip)")
+    parser.add_argument('--latency-ms', type=float, default=800, help="Stub backend mean latency")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default='', help="Write results JSON here (default bench_results/conflict-prescreen-<timestamp>.json)")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None):
+    args = parse_args(argv)
+    results = run(args)
+
+    for name in ('reference', 'prescreen'):
+        entry = results[name]
+        print(f"   {name}: {entry['llm_calls']} LLM calls, {entry['prompt_tokens']} prompt tokens, "
+              f"p50 {entry['latency']['p50']} ms, p95 {entry['latency']['p95']} ms")
+    print(f"   pre-screen skipped {results['prescreen']['llm_skipped']}/{results['meta']['documents']} checks, "
+          f"{results['prescreen']['avg_screen_ms']} ms per screen")
+    for name, entry in results['edits'].items():
+        print(f"   re-check after edit ({name}): {entry['llm_calls']} LLM calls for {entry['rechecks']} re-checks, "
+              f"{entry['candidates_sent']} candidates sent, {entry['verdicts_reused']} reused, "
+              f"{entry['prompt_tokens']} prompt tokens, p50 {entry['latency']['p50']} ms")
+
+    output = Path(args.output or f"bench_results/conflict-prescreen-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2))
+    print(f"✅ Results saved to {output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Benchmark indexed conflict detection against the original pairwise scan
+Checks that exhaustive (unblocked) detection matches the original output exactly.
+
+Usage (from ai-services/):
+    python -m app.scripts.benchmark_conflicts
+    python -m app.scripts.benchmark_conflicts --sizes 1000,10000,100000 --reference-max 2000 --exhaustive-max 2000
+"""
+
+import argparse
+import json
+import random
+import re
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from app.scripts.benchmark_routes import git_commit
+from app.utils.conflicts import find_conflicts
+
+SUBJECTS = ['checkout', 'search', 'login', 'invoice', 'catalog', 'report', 'export', 'dashboard',
+            'notification', 'payment', 'profile', 'inventory', 'shipping', 'refund', 'audit', 'billing']
+QUALIFIERS = ['mobile', 'partner', 'admin', 'guest', 'regional', 'bulk', 'offline', 'scheduled']
+MODALS = ['must support', 'must not require', 'should include', 'must be available for', 'needs to cover',
+          'must never block', 'will support']
+FACTS = ['in Q{q}', 'by Q{q} 2025', 'within {n} weeks', 'in {n} days', 'for ${amount:,}', 'under ${amount}',
+         'over {n} months', '']
+
+
+def make_requirements(count: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """Synthetic extracted requirements; topics repeat so that realistic conflicts exist"""
+    rng = random.Random(seed)
+    # Roughly 20 requirements per distinct feature, like a large BRD corpus
+    features = [
+        f"{rng.choice(QUALIFIERS)} {rng.choice(SUBJECTS)} feature{index}"
+        for index in range(max(1, count // 20))
+    ]
+    requirements = []
+    for index in range(count):
+        fact = rng.choice(FACTS).format(
+            q=rng.randint(1, 4), n=rng.choice([2, 4, 6, 8, 12]), amount=rng.choice([50000, 75000, 150000])
+        )
+        requirements.append({
+            'id': f'REQ-{index:06d}',
+            'text': f"The {rng.choice(features)} {rng.choice(MODALS)} bulk exports {fact}".strip()
+        })
+    return requirements
+
+
+def reference_detect_conflicts(requirements: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """detect_conflicts_in_requirements as it was before indexing"""
+    conflicts = []
+    conflict_patterns = [
+        (r'\bmust\b.*\bnot\b', r'\bmust\b'),
+        (r'\bq[1-4]\b', r'\bq[1-4]\b'),
+        (r'\$[\d,]+', r'\$[\d,]+'),
+        (r'\d+\s*(?:weeks?|months?|days?)', r'\d+\s*(?:weeks?|months?|days?)'),
+    ]
+    for i, req1 in enumerate(requirements):
+        for j, req2 in enumerate(requirements[i+1:], start=i+1):
+            text1 = req1.get('text', '').lower()
+            text2 = req2.get('text', '').lower()
+            for pattern1, pattern2 in conflict_patterns:
+                match1 = re.search(pattern1, text1, re.IGNORECASE)
+                match2 = re.search(pattern2, text2, re.IGNORECASE)
+                if match1 and match2 and match1.group() != match2.group():
+                    conflicts.append({
+                        'id': f'conflict_{len(conflicts) + 1}',
+                        'type': 'value_mismatch',
+                        'requirement_1': req1,
+                        'requirement_2': req2,
+                        'description': f"Potential conflict: '{match1.group()}' vs '{match2.group()}'"
+                    })
+    return conflicts
+
+
+def timed(function, *args, **kwargs):
+    started = time.perf_counter()
+    result = function(*args, **kwargs)
+    return result, time.perf_counter() - started
+
+
+def run(args) -> Dict:
+    runs = []
+    for size in [int(size) for size in args.sizes.split(',')]:
+        requirements = make_requirements(size, args.seed)
+        entry: Dict[str, Any] = {'requirements': size}
+
+        if size <= args.reference_max:
+            reference, reference_s = timed(reference_detect_conflicts, requirements)
+            entry['reference_seconds'] = round(reference_s, 3)
+            entry['reference_conflicts'] = len(reference)
+        if size <= args.exhaustive_max:
+            exhaustive, exhaustive_s = timed(find_conflicts, requirements, topic_blocking=False)
+            entry['exhaustive_seconds'] = round(exhaustive_s, 3)
+            entry['exhaustive_conflicts'] = len(exhaustive)
+            if size <= args.reference_max:
+                entry['identical_to_reference'] = exhaustive == reference
+                entry['speedup'] = round(reference_s / exhaustive_s, 1) if exhaustive_s else 0.0
+
+        blocked, blocked_s = timed(find_conflicts, requirements, topic_blocking=True)
+        entry['blocked_seconds'] = round(blocked_s, 3)
+        entry['blocked_conflicts'] = len(blocked)
+        runs.append(entry)
+
+    return {
+        'meta': {
+            'git_commit': git_commit(),
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'seed': args.seed,
+        },
+        'runs': runs,
+    }
+
+
+def parse_args(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Benchmark requirement conflict detection")
+    parser.add_argument('--sizes', default='500,2000,10000,100000', help="Comma-separated requirement counts")
+    parser.add_argument('--reference-max', type=int, default=1000, help="Largest size to run the original O(n²) scan on")
+    parser.add_argument('--exhaustive-max', type=int, default=2000,
+                        help="Largest size to run unblocked detection on (its output grows quadratically)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default='', help="Write results JSON here (default bench_results/conflicts-<timestamp>.json)")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None):
+    args = parse_args(argv)
+    results = run(args)
+
+    for entry in results['runs']:
+        parts = [f"{entry['requirements']} requirements:"]
+        if 'reference_seconds' in entry:
+            parts.append(f"original {entry['reference_seconds']}s ({entry['reference_conflicts']} conflicts)")
+        if 'exhaustive_seconds' in entry:
+            parts.append(f"indexed {entry['exhaustive_seconds']}s ({entry['exhaustive_conflicts']})")
+        if 'identical_to_reference' in entry:
+            parts.append(f"{entry['speedup']}x, identical" if entry['identical_to_reference'] else "⚠️  output differs")
+        parts.append(f"topic-blocked {entry['blocked_seconds']}s ({entry['blocked_conflicts']})")
+        print(f"   {parts[0]} {' | '.join(parts[1:])}")
+
+    output = Path(args.output or f"bench_results/conflicts-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2))
+    print(f"✅ Results saved to {output}")
+
+
+if __name__ == '__main__':
+    main()
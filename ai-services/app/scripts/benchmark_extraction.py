@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Benchmark the single-pass HTML extractor against the BeautifulSoup implementation
+Checks that both produce identical output on every page.
+
+Usage (from ai-services/):
+    python -m app.scripts.benchmark_extraction
+    python -m app.scripts.benchmark_extraction --pages-dir ./saved_pages --repeat 20
+    python -m app.scripts.benchmark_extraction --save-dir ./saved_pages   # keep the generated corpus
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from app.scripts.bench_fixtures import make_page
+from app.scripts.benchmark_routes import git_commit
+from app.services.html_extractor import extract_page, extract_page_soup
+
+# Markup the generated pages do not cover
+EDGE_CASE_PAGES = {
+    'entities.html': '<html><head><title>Caf&eacute; &amp; Co &#8211; Menu</title></head>'
+                     '<body><p>Prices&nbsp;from &pound;5 &copy 2024</p><p>A &lt; B</p></body></html>',
+    'nested_headings.html': '<h1>Top <h2>Inner</h2> tail</h1><h3>Third <b>bold</b></h3><h2>Unclosed',
+    'noscript_meta.html': '<head><noscript><meta name="description" content="hidden"></noscript>'
+                          '<meta name="description"><title></title></head><body>'
+                          '<noscript><p>Enable JS</p></noscript><div>Visible</div></body>',
+    'title_markup.html': '<title>Plain <b>bold</b></title><title>Second</title><p>Body</p>',
+    'links.html': '<a href="/a#x">A</a><a href>Self</a><a href="mailto:x@y.z">M</a>'
+                  '<a href="  ./b  ">B</a><a href="/a">A again</a><script><a href="/s">S</a></script>',
+    'whitespace.html': '<pre>line one\n\n   line   two  \r\n\tline three</pre><p>a  b   c</p>',
+}
+
+
+def build_corpus(sizes: List[int], pages_per_size: int) -> Dict[str, str]:
+    """Generated competitor pages of several sizes plus the edge cases"""
+    corpus = dict(EDGE_CASE_PAGES)
+    for paragraphs in sizes:
+        for index in range(pages_per_size):
+            corpus[f"page_{paragraphs:04d}p_{index}.html"] = make_page(index, paragraphs)
+    return corpus
+
+
+def load_corpus(pages_dir: str) -> Dict[str, str]:
+    """Saved pages from a directory (*.html, *.htm)"""
+    corpus = {}
+    for path in sorted(Path(pages_dir).glob('*.htm*')):
+        corpus[path.name] = path.read_text(encoding='utf-8', errors='replace')
+    if not corpus:
+        raise SystemExit(f"No .html files found in {pages_dir}")
+    return corpus
+
+
+def time_extractor(extractor: Callable[[str, str], Dict], html: str, url: str, repeat: int) -> float:
+    """Median seconds per extraction over `repeat` runs"""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        extractor(html, url)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def run(args) -> Dict:
+    corpus = load_corpus(args.pages_dir) if args.pages_dir else build_corpus(
+        [int(size) for size in args.sizes.split(',')], args.pages_per_size
+    )
+
+    if args.save_dir:
+        save_dir = Path(args.save_dir)
+        save_dir.mkdir(parents=True, exist_ok=True)
+        for name, html in corpus.items():
+            (save_dir / name).write_text(html, encoding='utf-8')
+        print(f"💾 Saved {len(corpus)} pages to {save_dir}")
+
+    pages = []
+    mismatches = []
+    for name, html in corpus.items():
+        url = f"https://competitor.example/{name}"
+        fast, soup = extract_page(html, url), extract_page_soup(html, url)
+        differing = [field for field in soup if fast.get(field) != soup[field]]
+        if differing:
+            mismatches.append({'page': name, 'fields': differing})
+
+        fast_s = time_extractor(extract_page, html, url, args.repeat)
+        soup_s = time_extractor(extract_page_soup, html, url, args.repeat)
+        pages.append({
+            'page': name,
+            'bytes': len(html.encode('utf-8')),
+            'fast_ms': round(fast_s * 1000, 3),
+            'soup_ms': round(soup_s * 1000, 3),
+            'speedup': round(soup_s / fast_s, 2) if fast_s else 0.0,
+            'identical': not differing
+        })
+
+    total_bytes = sum(page['bytes'] for page in pages)
+    fast_total = sum(page['fast_ms'] for page in pages)
+    soup_total = sum(page['soup_ms'] for page in pages)
+    return {
+        'meta': {
+            'git_commit': git_commit(),
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'corpus': args.pages_dir or 'generated',
+            'repeat': args.repeat,
+        },
+        'summary': {
+            'pages': len(pages),
+            'total_bytes': total_bytes,
+            'fast_ms_total': round(fast_total, 2),
+            'soup_ms_total': round(soup_total, 2),
+            'fast_mb_per_s': round(total_bytes / 1e6 / (fast_total / 1000), 2) if fast_total else 0.0,
+            'soup_mb_per_s': round(total_bytes / 1e6 / (soup_total / 1000), 2) if soup_total else 0.0,
+            'speedup': round(soup_total / fast_total, 2) if fast_total else 0.0,
+            'identical_pages': len(pages) - len(mismatches),
+        },
+        'mismatches': mismatches,
+        'pages': pages,
+    }
+
+
+def parse_args(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Benchmark HTML extraction engines")
+    parser.add_argument('--pages-dir', default='', help="Directory of saved .html pages (default: generated corpus)")
+    parser.add_argument('--save-dir', default='', help="Also write the corpus to this directory")
+    parser.add_argument('--sizes', default='10,40,160,640', help="Paragraph counts for generated pages")
+    parser.add_argument('--pages-per-size', type=int, default=3)
+    parser.add_argument('--repeat', type=int, default=5, help="Timed runs per page and engine (median is reported)")
+    parser.add_argument('--output', default='', help="Write results JSON here (default bench_results/extraction-<timestamp>.json)")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None):
+    args = parse_args(argv)
+    results = run(args)
+
+    summary = results['summary']
+    print(f"📄 {summary['pages']} pages, {summary['total_bytes'] / 1e6:.2f} MB")
+    print(f"   fast: {summary['fast_ms_total']} ms ({summary['fast_mb_per_s']} MB/s)")
+    print(f"   soup: {summary['soup_ms_total']} ms ({summary['soup_mb_per_s']} MB/s)")
+    print(f"   speedup: {summary['speedup']}x, identical output on {summary['identical_pages']}/{summary['pages']} pages")
+    for mismatch in results['mismatches']:
+        print(f"⚠️  {mismatch['page']}: {', '.join(mismatch['fields'])} differ")
+
+    output = Path(args.output or f"bench_results/extraction-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2))
+    print(f"✅ Results saved to {output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Benchmark BM25 prompt context against the old fixed-slice truncation
+Plants distinct, topic-specific facts at random positions across a generated
+corpus and reports how many of them reach the whole-document prompt and each
+section's prompt, at what prompt size, plus index build and query timings.
+
+Usage (from ai-services/):
+    python -m app.scripts.benchmark_retrieval
+    python -m app.scripts.benchmark_retrieval --emails 20000 --meetings 500 --slack 20000 --facts 20
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+# The benchmark always runs offline
+os.environ['LLM_BACKEND'] = 'stub'
+
+from app.scripts.bench_fixtures import sample_data_sources
+from app.scripts.benchmark_routes import git_commit
+from app.services.generation_service import (
+    SECTION_CONTEXT_TOKENS,
+    SourceIndex,
+    section_terms,
+    template_terms,
+    _tokens,
+)
+from app.services.template_service import template_service
+
+# The slice limits and per-item truncation format_data_sources used before BM25
+REFERENCE_LIMITS = {'emails': 20, 'meetings': 10, 'slack': 30}
+
+# One fact template per section topic; {k} and {n} make every planted fact unique
+TOPIC_FACTS = {
+    'timeline': "Milestone M{k}: the beta launch deadline is week {n} of the schedule",
+    'budget': "Budget line B{k}: finance approved funding of ${n},000 for this cost item",
+    'stakeholders': "Owner O{k}: the team lead and sponsor for workstream {n} must approve changes",
+    'scope': "Scope item S{k}: phase {n} of the MVP will include this feature",
+    'requirements': "Requirement R{k}: the system must support bulk import of {n} records",
+    'risks': "Risk K{k}: vendor delay is a blocker and a concern for release {n}",
+    'metrics': "KPI P{k}: target is to increase the conversion rate by {n} percent",
+    'technical': "Integration T{k}: the platform API must connect to database shard {n}",
+    'compliance': "Compliance C{k}: GDPR privacy review {n} is a legal requirement for security",
+}
+
+
+def plant_facts(data_sources: Dict[str, List[Dict]], per_topic: int, seed: int) -> Dict[str, List[str]]:
+    """Append per_topic facts for each topic to random items; returns the planted sentences by topic"""
+    rng = random.Random(seed)
+    fields = {'emails': 'body', 'meetings': 'transcript', 'slack': 'text'}
+    slots = [(source_type, index) for source_type, items in data_sources.items() for index in range(len(items))]
+    facts = {}
+    for topic, template in TOPIC_FACTS.items():
+        facts[topic] = []
+        for k in range(per_topic):
+            fact = template.format(k=k, n=rng.randint(2, 99))
+            source_type, index = rng.choice(slots)
+            item = data_sources[source_type][index]
+            item[fields[source_type]] = f"{item[fields[source_type]]} {fact}."
+            facts[topic].append(fact)
+    return facts
+
+
+def reference_format(data_sources: Dict[str, Any]) -> str:
+    """format_data_sources as it was before the index: first N items per type, truncated"""
+    formatted = []
+    if "emails" in data_sources:
+        formatted.append("=== EMAILS ===")
+        for email in data_sources["emails"][:REFERENCE_LIMITS['emails']]:
+            formatted.append(f"From: {email.get('from', 'Unknown')}")
+            formatted.append(f"Subject: {email.get('subject', 'No subject')}")
+            formatted.append(f"Body: {email.get('body', '')[:300]}")
+            formatted.append("---")
+    if "meetings" in data_sources:
+        formatted.append("\n=== MEETING TRANSCRIPTS ===")
+        for meeting in data_sources["meetings"][:REFERENCE_LIMITS['meetings']]:
+            formatted.append(f"Meeting: {meeting.get('meeting_id', 'Unknown')}")
+            formatted.append(f"Transcript: {meeting.get('transcript', '')[:500]}")
+            formatted.append("---")
+    if "slack" in data_sources:
+        formatted.append("\n=== SLACK MESSAGES ===")
+        for msg in data_sources["slack"][:REFERENCE_LIMITS['slack']]:
+            formatted.append(f"[{msg.get('user', 'Unknown')}]: {msg.get('text', '')}")
+    return "\n".join(formatted)
+
+
+def reference_section_context(section: Dict[str, Any], data_sources: Dict[str, Any]) -> str:
+    """Per-section context before the index: items sharing a term with the section, then sliced"""
+    terms = section_terms(section)
+    texts = {
+        'emails': lambda item: f"{item.get('subject', '')} {item.get('body', '')}",
+        'meetings': lambda item: f"{item.get('summary', '')} {item.get('transcript', '')}",
+        'slack': lambda item: str(item.get('text', '')),
+    }
+    selected = {
+        source_type: [item for item in items if terms & _tokens(texts[source_type](item))]
+        for source_type, items in data_sources.items()
+    }
+    if not any(selected.values()):
+        selected = data_sources
+    return reference_format(selected)
+
+
+def relevant_topics(section: Dict[str, Any]) -> List[str]:
+    terms = section_terms(section)
+    return [topic for topic in TOPIC_FACTS if topic[:6] in terms]
+
+
+def coverage(context: str, facts: List[str]) -> float:
+    return round(sum(1 for fact in facts if fact in context) / len(facts), 3) if facts else 0.0
+
+
+def tokens(text: str) -> int:
+    return len(text) // 4
+
+
+def compare_sections(
+    index: SourceIndex,
+    sections: List[Dict[str, Any]],
+    data_sources: Dict[str, Any],
+    facts: Dict[str, List[str]],
+    token_budget: Optional[int] = None
+) -> Tuple[Dict[str, Any], List[float]]:
+    """Per-section fact coverage and prompt size for both strategies, plus BM25 query timings"""
+    reference_cov, bm25_cov, reference_tokens, bm25_tokens, query_seconds = [], [], [], [], []
+    for section in sections:
+        section_facts = [fact for topic in relevant_topics(section) for fact in facts[topic]]
+        reference = reference_section_context(section, data_sources)
+        started = time.perf_counter()
+        context, _ = index.assemble(section_terms(section), token_budget)
+        query_seconds.append(time.perf_counter() - started)
+        reference_tokens.append(tokens(reference))
+        bm25_tokens.append(tokens(context))
+        if section_facts:
+            reference_cov.append(coverage(reference, section_facts))
+            bm25_cov.append(coverage(context, section_facts))
+    return {
+        'sections_with_facts': len(bm25_cov),
+        'reference': {
+            'fact_coverage': round(statistics.fmean(reference_cov), 3) if reference_cov else 0.0,
+            'avg_prompt_tokens': round(statistics.fmean(reference_tokens)),
+        },
+        'bm25': {
+            'fact_coverage': round(statistics.fmean(bm25_cov), 3) if bm25_cov else 0.0,
+            'avg_prompt_tokens': round(statistics.fmean(bm25_tokens)),
+        },
+    }, query_seconds
+
+
+def run(args) -> Dict:
+    data_sources = sample_data_sources(args.emails, args.meetings, args.slack, args.seed)
+    facts = plant_facts(data_sources, args.facts, args.seed)
+    all_facts = [fact for topic_facts in facts.values() for fact in topic_facts]
+    template = template_service.load_template(args.template)
+
+    started = time.perf_counter()
+    index = SourceIndex(data_sources)
+    build_seconds = time.perf_counter() - started
+
+    reference = reference_format(data_sources)
+    started = time.perf_counter()
+    context, _ = index.assemble(template_terms(template), args.budget)
+    document_query_seconds = time.perf_counter() - started
+
+    sections, query_seconds = compare_sections(
+        index, template.get('sections', []), data_sources, facts, args.section_budget
+    )
+    query_ms = [seconds * 1000 for seconds in query_seconds]
+
+    return {
+        'meta': {
+            'git_commit': git_commit(),
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'emails': args.emails,
+            'meetings': args.meetings,
+            'slack': args.slack,
+            'planted_facts': len(all_facts),
+            'template': args.template,
+        },
+        'index': {
+            'build_ms': round(build_seconds * 1000, 1),
+            **index.get_stats(),
+        },
+        'document': {
+            'reference': {'fact_coverage': coverage(reference, all_facts), 'prompt_tokens': tokens(reference)},
+            'bm25': {
+                'fact_coverage': coverage(context, all_facts),
+                'prompt_tokens': tokens(context),
+                'query_ms': round(document_query_seconds * 1000, 2),
+            },
+        },
+        'sections': {
+            **sections,
+            'query_ms': {
+                'median': round(statistics.median(query_ms), 2) if query_ms else 0.0,
+                'max': round(max(query_ms), 2) if query_ms else 0.0,
+            },
+        },
+    }
+
+
+def parse_args(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Benchmark BM25 prompt context against fixed-slice truncation")
+    parser.add_argument('--emails', type=int, default=5000)
+    parser.add_argument('--meetings', type=int, default=200)
+    parser.add_argument('--slack', type=int, default=5000)
+    parser.add_argument('--facts', type=int, default=10, help="Facts planted per section topic")
+    parser.add_argument('--template', default='comprehensive')
+    parser.add_argument('--budget', type=int, default=None, help="Whole-document token budget (default CONTEXT_TOKEN_BUDGET)")
+    parser.add_argument('--section-budget', type=int, default=SECTION_CONTEXT_TOKENS, help="Per-section token budget")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default='', help="Write results JSON here (default bench_results/retrieval-<timestamp>.json)")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None):
+    args = parse_args(argv)
+    results = run(args)
+
+    index = results['index']
+    print(f"🔎 {index['chunks']} chunks, {index['terms']} terms, {index['occurrences']} occurrences indexed in {index['build_ms']} ms")
+    for scope in ('document', 'sections'):
+        for name in ('reference', 'bm25'):
+            entry = results[scope][name]
+            size = entry.get('prompt_tokens', entry.get('avg_prompt_tokens'))
+            print(f"   {scope} ({name}): {entry['fact_coverage']:.1%} of planted facts, {size} prompt tokens")
+    print(f"   section query: median {results['sections']['query_ms']['median']} ms, "
+          f"max {results['sections']['query_ms']['max']} ms")
+
+    output = Path(args.output or f"bench_results/retrieval-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2))
+    print(f"✅ Results saved to {output}")
+
+
+if __name__ == '__main__':
+    main()
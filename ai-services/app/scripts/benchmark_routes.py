@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+"""
+End-to-end load test for the AI service routes
+Runs fully offline: the app uses the stub LLM backend and /scrape targets a local fixture server.
+
+Usage (from ai-services/):
+    python -m app.scripts.benchmark_routes --concurrency 16 --requests 200
+    python -m app.scripts.benchmark_routes --routes generate,chat --latency-ms 300 --output bench.json
+    python -m app.scripts.benchmark_routes --base-url http://localhost:8000   # already-running app
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import aiohttp
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from app.scripts.bench_fixtures import (
+    build_site,
+    sample_brd_content,
+    sample_data_sources,
+    start_fixture_server,
+)
+
+ROUTES = ['generate', 'chat', 'conflicts', 'scrape']
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a list of numbers (0 for an empty list)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(int(round(pct / 100.0 * len(ordered) + 0.5)) - 1, 0)
+    return ordered[min(rank, len(ordered) - 1)]
+
+
+def summarize(latencies: List[float]) -> Dict[str, float]:
+    """Latency summary in milliseconds"""
+    ms = [value * 1000 for value in latencies]
+    return {
+        'p50': round(percentile(ms, 50), 2),
+        'p95': round(percentile(ms, 95), 2),
+        'p99': round(percentile(ms, 99), 2),
+        'mean': round(statistics.fmean(ms), 2) if ms else 0.0,
+        'max': round(max(ms), 2) if ms else 0.0,
+    }
+
+
+def git_commit() -> str:
+    """Current git commit hash, or 'unknown' outside a checkout"""
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', 'HEAD'],
+            cwd=Path(__file__).resolve().parent,
+            stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except Exception:
+        return 'unknown'
+
+
+class LoopLagMonitor:
+    """Measure event-loop responsiveness by how late a periodic sleep wakes up"""
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.samples: List[float] = []
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(loop.time() - started - self.interval, 0.0))
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+
+def build_payloads(args, fixture_url: str) -> Dict[str, Callable[[int], Dict[str, Any]]]:
+    """
+    Request body factories for each route, indexed by request number
+
+    Args:
+        args: Parsed command line arguments
+        fixture_url: Base URL of the fixture server
+
+    Returns:
+        Dictionary of route name -> callable(i) returning the JSON body
+    """
+    data_sources = sample_data_sources(args.emails, args.meetings, args.slack, seed=args.seed)
+    brd_content = sample_brd_content(args.sections, seed=args.seed)
+
+    def generate(i: int) -> Dict[str, Any]:
+        return {
+            'project_id': f"bench-{i}",
+            'data_sources': data_sources,
+            'template': 'comprehensive',
+            'generation_mode': args.generation_mode
+        }
+
+    def chat(i: int) -> Dict[str, Any]:
+        return {
+            'project_id': f"bench-{i}",
+            'message': f"Can you summarize the main risks for release {i}?",
+            'context': {'brd_content': brd_content}
+        }
+
+    def conflicts(i: int) -> Dict[str, Any]:
+        return {'project_id': f"bench-{i}", 'brd_content': brd_content}
+
+    def scrape(i: int) -> Dict[str, Any]:
+        return {'project_id': f"bench-{i}", 'url': f"{fixture_url}/pages/{i % args.pages}.html"}
+
+    return {'generate': generate, 'chat': chat, 'conflicts': conflicts, 'scrape': scrape}
+
+
+async def run_route(
+    session: aiohttp.ClientSession,
+    base_url: str,
+    route: str,
+    payload: Callable[[int], Dict[str, Any]],
+    total: int,
+    concurrency: int,
+    timeout: float
+) -> Dict[str, Any]:
+    """
+    Send `total` requests to one route with `concurrency` workers
+
+    Returns:
+        Throughput, latency percentiles and error counts for the route
+    """
+    url = f"{base_url}/api/ai/{route}"
+    latencies: List[float] = []
+    errors: Dict[str, int] = {}
+    counter = iter(range(total))
+    request_timeout = aiohttp.ClientTimeout(total=timeout)
+
+    async def worker():
+        for i in counter:
+            started = time.perf_counter()
+            try:
+                async with session.post(url, json=payload(i), timeout=request_timeout) as response:
+                    await response.read()
+                    status = response.status
+            except Exception as e:
+                errors[type(e).__name__] = errors.get(type(e).__name__, 0) + 1
+                continue
+            if status == 200:
+                latencies.append(time.perf_counter() - started)
+            else:
+                errors[str(status)] = errors.get(str(status), 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    return {
+        'requests': total,
+        'succeeded': len(latencies),
+        'errors': errors,
+        'elapsed_seconds': round(elapsed, 3),
+        'throughput_rps': round(len(latencies) / elapsed, 2) if elapsed > 0 else 0.0,
+        'latency_ms': summarize(latencies)
+    }
+
+
+async def start_app(host: str, port: int):
+    """Start the FastAPI app with uvicorn inside this event loop"""
+    import uvicorn
+    from app.main import app
+
+    config = uvicorn.Config(app, host=host, port=port, log_level='warning', lifespan='on')
+    server = uvicorn.Server(config)
+    # Leave Ctrl+C handling to asyncio.run
+    server.install_signal_handlers = lambda: None
+    task = asyncio.create_task(server.serve())
+    while not server.started:
+        if task.done():
+            task.result()
+        await asyncio.sleep(0.05)
+    port = server.servers[0].sockets[0].getsockname()[1]
+    return server, task, f"http://{host}:{port}"
+
+
+async def fetch_stats(session: aiohttp.ClientSession, base_url: str) -> Dict[str, Any]:
+    """Read the app's /stats endpoint, if it is reachable"""
+    try:
+        async with session.get(f"{base_url}/stats") as response:
+            return await response.json()
+    except Exception:
+        return {}
+
+
+async def run(args) -> Dict[str, Any]:
+    """Run the whole benchmark and return the results document"""
+    routes = [route.strip() for route in args.routes.split(',') if route.strip()]
+    unknown = set(routes) - set(ROUTES)
+    if unknown:
+        raise SystemExit(f"Unknown route(s): {', '.join(sorted(unknown))}")
+
+    fixture_runner, fixture_url = await start_fixture_server(build_site(args.pages, args.paragraphs))
+
+    server = server_task = None
+    base_url = args.base_url
+    if not base_url:
+        server, server_task, base_url = await start_app('127.0.0.1', args.port)
+
+    # Lag is only meaningful when the app shares this loop
+    monitor = LoopLagMonitor()
+    monitor.start()
+
+    payloads = build_payloads(args, fixture_url)
+    connector = aiohttp.TCPConnector(limit=args.concurrency * 2)
+    results: Dict[str, Any] = {}
+
+    try:
+        async with aiohttp.ClientSession(connector=connector) as session:
+            for route in routes:
+                if args.warmup:
+                    await run_route(session, base_url, route, payloads[route], args.warmup,
+                                    min(args.warmup, args.concurrency), args.timeout)
+                lag_start = len(monitor.samples)
+                print(f"🚀 {route}: {args.requests} requests @ concurrency {args.concurrency}")
+                results[route] = await run_route(
+                    session, base_url, route, payloads[route],
+                    args.requests, args.concurrency, args.timeout
+                )
+                if server is not None:
+                    results[route]['event_loop_lag_ms'] = summarize(monitor.samples[lag_start:])
+                latency = results[route]['latency_ms']
+                print(f"   {results[route]['throughput_rps']} req/s  "
+                      f"p50 {latency['p50']}ms  p95 {latency['p95']}ms  p99 {latency['p99']}ms  "
+                      f"errors {sum(results[route]['errors'].values())}")
+            app_stats = await fetch_stats(session, base_url)
+    finally:
+        await monitor.stop()
+        if server is not None:
+            server.should_exit = True
+            await server_task
+        await fixture_runner.cleanup()
+
+    return {
+        'meta': {
+            'git_commit': git_commit(),
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'target': args.base_url or 'in-process',
+            'config': {
+                key: value for key, value in vars(args).items()
+                if key not in ('output', 'base_url')
+            },
+        },
+        'routes': results,
+        'event_loop_lag_ms': summarize(monitor.samples) if server is not None else None,
+        'app_stats': app_stats,
+    }
+
+
+def parse_args(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Load-test the AI service routes offline")
+    parser.add_argument('--routes', default=','.join(ROUTES), help="Comma-separated routes to hit")
+    parser.add_argument('--requests', type=int, default=100, help="Requests per route")
+    parser.add_argument('--concurrency', type=int, default=16, help="Concurrent clients per route")
+    parser.add_argument('--warmup', type=int, default=0, help="Untimed requests per route before measuring")
+    parser.add_argument('--timeout', type=float, default=120.0, help="Per-request client timeout (seconds)")
+    parser.add_argument('--base-url', default='', help="Benchmark an already-running app instead of starting one")
+    parser.add_argument('--port', type=int, default=0, help="Port for the in-process app (0 = any free port)")
+    parser.add_argument('--latency-ms', type=float, default=200.0, help="Stub LLM mean latency")
+    parser.add_argument('--jitter-ms', type=float, default=50.0, help="Stub LLM latency jitter")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Stub LLM error rate")
+    parser.add_argument('--cache', action='store_true', help="Keep the LLM response cache enabled")
+    parser.add_argument('--generation-mode', default='single', choices=['single', 'parallel'])
+    parser.add_argument('--emails', type=int, default=50)
+    parser.add_argument('--meetings', type=int, default=10)
+    parser.add_argument('--slack', type=int, default=100)
+    parser.add_argument('--sections', type=int, default=16, help="Sections in the chat/conflicts BRD payload")
+    parser.add_argument('--pages', type=int, default=50, help="Fixture pages to rotate /scrape over")
+    parser.add_argument('--paragraphs', type=int, default=40, help="Paragraphs per fixture page")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default='', help="Write results JSON here (default bench_results/<timestamp>.json)")
+    return parser.parse_args(argv)
+
+
+def configure_environment(args):
+    """Point the in-process app at the stub backend before it is imported"""
+    if args.base_url:
+        return
+    os.environ['LLM_BACKEND'] = 'stub'
+    os.environ['STUB_LATENCY_MS'] = str(args.latency_ms)
+    os.environ['STUB_LATENCY_JITTER_MS'] = str(args.jitter_ms)
+    os.environ['STUB_ERROR_RATE'] = str(args.error_rate)
+    os.environ['STUB_SEED'] = str(args.seed)
+    # Distinct payloads per request would otherwise still share prompts
+    os.environ['LLM_CACHE_ENABLED'] = 'true' if args.cache else 'false'
+    # The stub has no real quota
+    os.environ.setdefault('GEMINI_KEY_RPM', '1000000')
+
+
+def main(argv: Optional[List[str]] = None):
+    args = parse_args(argv)
+    configure_environment(args)
+
+    results = asyncio.run(run(args))
+
+    output = Path(args.output or f"bench_results/{datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2))
+    print(f"✅ Results saved to {output}")
+
+
+if __name__ == '__main__':
+    main()
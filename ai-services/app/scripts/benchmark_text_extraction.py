@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Benchmark the compiled requirement/stakeholder extraction against the original helpers
+Checks that both produce identical output on every text.
+
+Usage (from ai-services/):
+    python -m app.scripts.benchmark_text_extraction
+    python -m app.scripts.benchmark_text_extraction --corpus ../demo-data/processed/corpus_emails.json --repeat 3
+"""
+
+import argparse
+import json
+import re
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from app.scripts.bench_fixtures import sample_data_sources
+from app.scripts.benchmark_routes import git_commit
+from app.utils.extraction import extract_text_signals, find_requirements, find_stakeholders
+from app.utils.json_stream import iter_json_records
+
+# Text the generated corpus does not cover
+EDGE_CASE_TEXTS = [
+    '',
+    'no punctuation at all but the system must support exports for every region',
+    'Trailing runs!!! The app MUST   BE fast?! Really... we NEED\tTO ship it by Friday ok',
+    'Unicode: the café app must include résumé upload for all users. Straße needs to be shown.',
+    'Case folding: the system MUſT have audit logs for every change. We requıre to sign off.',
+    'DİAL: İstanbul office must have its own invoice format for every customer',
+    'John Doe (CEO), Sarah Smith - Product Manager) and Mike Chen, Tech Lead, Mike Chen (CTO)',
+    'Anna Lee,Designer. Bob Ray (\nOps Lead\n) approved. Carl Moe - ',
+]
+
+
+def reference_extract_requirements(text: str) -> List[str]:
+    """extract_requirements_from_text as it was before the compiled engine"""
+    requirements = []
+    indicators = [
+        r'must\s+(?:have|be|include|support)',
+        r'should\s+(?:have|be|include|support)',
+        r'shall\s+(?:have|be|include|support)',
+        r'required?\s+to',
+        r'needs?\s+to',
+        r'(?:will|would)\s+(?:have|include|support)',
+    ]
+    pattern = '|'.join(indicators)
+    sentences = re.split(r'[.!?]+', text)
+    for sentence in sentences:
+        sentence = sentence.strip()
+        if re.search(pattern, sentence, re.IGNORECASE):
+            if len(sentence.split()) >= 5:
+                requirements.append(sentence)
+    return requirements
+
+
+def reference_extract_stakeholders(text: str) -> List[Dict[str, str]]:
+    """extract_stakeholders as it was before the compiled engine"""
+    stakeholders = []
+    patterns = [
+        r'([A-Z][a-z]+\s+[A-Z][a-z]+)\s*[\(\-]\s*([A-Z][A-Za-z\s]+)[\)]',
+        r'([A-Z][a-z]+\s+[A-Z][a-z]+),\s*([A-Z][A-Za-z\s]+)',
+    ]
+    for pattern in patterns:
+        for match in re.finditer(pattern, text):
+            stakeholders.append({'name': match.group(1).strip(), 'role': match.group(2).strip()})
+    seen_names = set()
+    unique_stakeholders = []
+    for stakeholder in stakeholders:
+        if stakeholder['name'] not in seen_names:
+            seen_names.add(stakeholder['name'])
+            unique_stakeholders.append(stakeholder)
+    return unique_stakeholders
+
+
+def reference_signals(text: str):
+    return reference_extract_requirements(text), reference_extract_stakeholders(text)
+
+
+def build_corpus(emails: int, meetings: int, seed: int) -> List[str]:
+    """Generated email bodies and meeting transcripts plus the edge cases"""
+    sources = sample_data_sources(emails, meetings, 0, seed)
+    return (
+        [email['body'] for email in sources['emails']]
+        + [meeting['transcript'] for meeting in sources['meetings']]
+        + EDGE_CASE_TEXTS
+    )
+
+
+def load_corpus(path: str) -> List[str]:
+    """Bodies/transcripts from a JSON or JSON-lines file of emails or meetings"""
+    texts = []
+    for record in iter_json_records(path):
+        if isinstance(record, dict):
+            texts.append(record.get('body') or record.get('transcript') or record.get('text') or '')
+    if not texts:
+        raise SystemExit(f"No records found in {path}")
+    return texts + EDGE_CASE_TEXTS
+
+
+def time_function(function: Callable[[str], object], texts: List[str], repeat: int) -> float:
+    """Median seconds to run function over every text"""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for text in texts:
+            function(text)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def run(args) -> Dict:
+    texts = load_corpus(args.corpus) if args.corpus else build_corpus(args.emails, args.meetings, args.seed)
+    total_bytes = sum(len(text.encode('utf-8')) for text in texts)
+
+    pairs = {
+        'requirements': (reference_extract_requirements, find_requirements),
+        'stakeholders': (reference_extract_stakeholders, find_stakeholders),
+        'combined': (reference_signals, extract_text_signals),
+    }
+    results = {}
+    mismatches = []
+    for name, (reference, compiled) in pairs.items():
+        differing = [index for index, text in enumerate(texts) if reference(text) != compiled(text)]
+        mismatches.extend({'function': name, 'text_index': index} for index in differing[:20])
+
+        reference_s = time_function(reference, texts, args.repeat)
+        compiled_s = time_function(compiled, texts, args.repeat)
+        results[name] = {
+            'reference_ms': round(reference_s * 1000, 2),
+            'compiled_ms': round(compiled_s * 1000, 2),
+            'reference_mb_per_s': round(total_bytes / 1e6 / reference_s, 2) if reference_s else 0.0,
+            'compiled_mb_per_s': round(total_bytes / 1e6 / compiled_s, 2) if compiled_s else 0.0,
+            'speedup': round(reference_s / compiled_s, 2) if compiled_s else 0.0,
+            'identical_texts': len(texts) - len(differing),
+        }
+
+    return {
+        'meta': {
+            'git_commit': git_commit(),
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'corpus': args.corpus or 'generated',
+            'texts': len(texts),
+            'total_bytes': total_bytes,
+            'repeat': args.repeat,
+        },
+        'results': results,
+        'mismatches': mismatches,
+    }
+
+
+def parse_args(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Benchmark requirement/stakeholder extraction")
+    parser.add_argument('--corpus', default='', help="JSON/JSONL file of emails or meetings (default: generated corpus)")
+    parser.add_argument('--emails', type=int, default=20000)
+    parser.add_argument('--meetings', type=int, default=500)
+    parser.add_argument('--repeat', type=int, default=3, help="Timed passes per function (median is reported)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default='', help="Write results JSON here (default bench_results/text-extraction-<timestamp>.json)")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None):
+    args = parse_args(argv)
+    results = run(args)
+
+    meta = results['meta']
+    print(f"📄 {meta['texts']} texts, {meta['total_bytes'] / 1e6:.2f} MB")
+    for name, entry in results['results'].items():
+        print(f"   {name}: {entry['reference_ms']} ms -> {entry['compiled_ms']} ms "
+              f"({entry['compiled_mb_per_s']} MB/s, {entry['speedup']}x), "
+              f"identical on {entry['identical_texts']}/{meta['texts']}")
+    for mismatch in results['mismatches']:
+        print(f"⚠️  {mismatch['function']} differs on text {mismatch['text_index']}")
+
+    output = Path(args.output or f"bench_results/text-extraction-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2))
+    print(f"✅ Results saved to {output}")
+
+
+if __name__ == '__main__':
+    main()
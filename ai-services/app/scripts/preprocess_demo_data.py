@@ -2,13 +2,23 @@
 """
 Preprocess demo data from various sources
 This script processes Enron emails, AMI transcripts, etc.
+
+Usage (from ai-services/):
+    python app/scripts/preprocess_demo_data.py                      # hand-written samples
+    python app/scripts/preprocess_demo_data.py --maildir ~/enron/maildir --ami ~/ami/words
+    python app/scripts/preprocess_demo_data.py --mbox export.mbox --workers 8 --limit 5000
 """
 
+import argparse
 import json
 import os
 import sys
+import time
+from itertools import islice
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
 def create_directory_structure():
     """Create necessary directories"""
     dirs = [
@@ -382,8 +392,59 @@ $200,000 approved
     print("ℹ️  Note: sample_doc.pdf would need to be created manually or with a PDF library")
     print("    For demo purposes, the requirements.txt file is sufficient")
 
-def main():
+def ingest_corpora(args):
+    """Convert raw mbox/maildir/AMI corpora into processed JSON files"""
+    from app.services.corpus_ingest import CorpusIngester
+    from app.services.parser_service import enrich_email, enrich_meeting
+    from app.utils.json_stream import write_json_array
+
+    output_dir = Path(args.output_dir)
+    jobs = []
+    if args.mbox or args.maildir:
+        ingester = CorpusIngester(workers=args.workers)
+        def emails():
+            if args.mbox:
+                yield from ingester.iter_mbox(args.mbox, transform=enrich_email)
+            if args.maildir:
+                yield from ingester.iter_maildir(args.maildir, transform=enrich_email)
+        jobs.append(("📧", "emails", ingester, emails(), output_dir / 'corpus_emails.json'))
+    if args.ami:
+        ingester = CorpusIngester(workers=args.workers)
+        jobs.append(("🎤", "meetings", ingester, ingester.iter_ami(args.ami, transform=enrich_meeting),
+                     output_dir / 'corpus_meetings.json'))
+
+    for icon, kind, ingester, records, output_path in jobs:
+        print(f"{icon} Ingesting {kind} with {ingester.workers} workers...")
+        started = time.perf_counter()
+        count = write_json_array(islice(records, args.limit or None), str(output_path))
+        elapsed = time.perf_counter() - started
+        stats = ingester.get_stats()
+        print(f"✅ {count} {kind} -> {output_path} in {elapsed:.1f}s ({count / elapsed if elapsed else 0:.0f} records/sec)")
+        if stats['skipped'] or stats['duplicates']:
+            print(f"   skipped {stats['skipped']} unreadable, dropped {stats['duplicates']} duplicates")
+        print()
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Generate demo data or ingest raw email/meeting corpora")
+    parser.add_argument('--mbox', nargs='*', default=[], help="mbox files to ingest")
+    parser.add_argument('--maildir', nargs='*', default=[], help="Maildir roots to ingest (e.g. Enron maildir/)")
+    parser.add_argument('--ami', nargs='*', default=[], help="Directories with AMI *.words.xml annotations")
+    parser.add_argument('--output-dir', default='../demo-data/processed')
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes, 0 = CPU count (default INGEST_WORKERS)")
+    parser.add_argument('--limit', type=int, default=0, help="Max records per output file (0 = all)")
+    return parser.parse_args(argv)
+
+def main(argv=None):
     """Main preprocessing function"""
+    args = parse_args(argv)
+    if args.mbox or args.maildir or args.ami:
+        try:
+            ingest_corpora(args)
+        except Exception as e:
+            print(f"❌ Error during ingestion: {str(e)}")
+            sys.exit(1)
+        return
+
     print("="*60)
     print("🚀 ReqForge AI - Demo Data Preprocessing")
     print("="*60)
@@ -0,0 +1,165 @@
+"""
+Long-lived headless Chromium shared by all scrapes
+Each scrape gets its own browser context from a bounded pool
+"""
+
+import asyncio
+import os
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional, Set
+
+
+class BrowserPool:
+    """Lazily started Chromium that hands out isolated contexts and recycles itself"""
+
+    def __init__(
+        self,
+        max_contexts: Optional[int] = None,
+        max_uses: Optional[int] = None,
+        blocked_resources: Optional[Set[str]] = None
+    ):
+        """
+        Initialize the pool from arguments or environment variables
+
+        Args:
+            max_contexts: Concurrent browser contexts (SCRAPER_MAX_CONTEXTS)
+            max_uses: Contexts served before the browser is replaced (SCRAPER_BROWSER_MAX_USES)
+            blocked_resources: Playwright resource types to abort (SCRAPER_BLOCK_RESOURCES)
+        """
+        self.max_contexts = max_contexts or int(os.getenv('SCRAPER_MAX_CONTEXTS', '4'))
+        self.max_uses = max_uses or int(os.getenv('SCRAPER_BROWSER_MAX_USES', '100'))
+        if blocked_resources is None:
+            raw = os.getenv('SCRAPER_BLOCK_RESOURCES', 'image,font,media')
+            blocked_resources = {kind.strip() for kind in raw.split(',') if kind.strip()}
+        self.blocked_resources = blocked_resources
+
+        self._playwright = None
+        self._browser = None
+        self._uses = 0
+        # Open contexts per browser, so a retired browser closes after its last page
+        self._active: Dict[Any, int] = {}
+        self._retired: Set[Any] = set()
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._lock: Optional[asyncio.Lock] = None
+        self.stats = {'launches': 0, 'recycles': 0, 'contexts': 0, 'failures': 0, 'blocked_requests': 0}
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        """Create the semaphore lazily so it binds to the running loop"""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_contexts)
+        return self._semaphore
+
+    def _get_lock(self) -> asyncio.Lock:
+        """Create the launch lock lazily so it binds to the running loop"""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        return self._lock
+
+    async def _ensure_browser(self):
+        """Return a connected browser, launching or replacing it when needed"""
+        async with self._get_lock():
+            browser = self._browser
+            if browser is not None and (not browser.is_connected() or self._uses >= self.max_uses):
+                await self._retire(browser)
+                browser = None
+
+            if browser is None:
+                if self._playwright is None:
+                    from playwright.async_api import async_playwright
+                    self._playwright = await async_playwright().start()
+                browser = await self._playwright.chromium.launch(headless=True)
+                self._browser = browser
+                self._uses = 0
+                self._active[browser] = 0
+                self.stats['launches'] += 1
+
+            self._uses += 1
+            self._active[browser] += 1
+            return browser
+
+    async def _retire(self, browser):
+        """Stop handing out a browser and close it once its contexts are done"""
+        if browser is self._browser:
+            self._browser = None
+            self.stats['recycles'] += 1
+        self._retired.add(browser)
+        if self._active.get(browser, 0) == 0:
+            await self._close_browser(browser)
+
+    async def _close_browser(self, browser):
+        """Close a browser, ignoring errors from one that already died"""
+        self._retired.discard(browser)
+        self._active.pop(browser, None)
+        try:
+            await browser.close()
+        except Exception:
+            pass
+
+    async def _block_heavy_resources(self, route):
+        """Abort images, fonts and media; let everything else through"""
+        if route.request.resource_type in self.blocked_resources:
+            self.stats['blocked_requests'] += 1
+            await route.abort()
+        else:
+            await route.continue_()
+
+    @asynccontextmanager
+    async def page(self) -> AsyncIterator[Any]:
+        """
+        Borrow a fresh page in its own browser context
+
+        Waits while max_contexts pages are already out. The context is closed
+        on exit; if the browser crashed, it is replaced for the next caller.
+
+        Yields:
+            Playwright Page
+        """
+        async with self._get_semaphore():
+            browser = await self._ensure_browser()
+            context = None
+            try:
+                context = await browser.new_context()
+                if self.blocked_resources:
+                    await context.route('**/*', self._block_heavy_resources)
+                self.stats['contexts'] += 1
+                yield await context.new_page()
+            except Exception:
+                self.stats['failures'] += 1
+                if not browser.is_connected():
+                    async with self._get_lock():
+                        await self._retire(browser)
+                raise
+            finally:
+                if context is not None:
+                    try:
+                        await context.close()
+                    except Exception:
+                        pass
+                self._active[browser] = self._active.get(browser, 1) - 1
+                if browser in self._retired and self._active[browser] <= 0:
+                    await self._close_browser(browser)
+
+    async def close(self):
+        """Close every browser and stop Playwright (called on app shutdown)"""
+        async with self._get_lock():
+            for browser in list(self._active):
+                await self._close_browser(browser)
+            self._browser = None
+            if self._playwright is not None:
+                await self._playwright.stop()
+                self._playwright = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get pool counters
+
+        Returns:
+            Dictionary with launch/recycle counters and current usage
+        """
+        return {
+            **self.stats,
+            'running': self._browser is not None,
+            'uses': self._uses,
+            'active_contexts': sum(self._active.values()),
+            'max_contexts': self.max_contexts,
+        }
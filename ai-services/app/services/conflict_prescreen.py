@@ -0,0 +1,559 @@
+"""
+Deterministic conflict pre-screen for BRD conflict checks
+Finds statements with mismatched dates, quarters, budgets, durations or
+must/must-not wording locally and only sends those pairs to Gemini
+"""
+
+import hashlib
+import json
+import os
+import re
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.services.gemini_service import GeminiService, gemini_service
+from app.utils.conflicts import FACT_TYPES, extract_facts, topic_terms
+from app.utils.typed_facts import extract_typed_facts
+
+# Fact types reported to the LLM, in prompt order
+PRESCREEN_FACT_TYPES = FACT_TYPES + ('date',)
+FACT_LABELS = {
+    'modality': 'must vs must not',
+    'quarter': 'quarter',
+    'amount': 'budget/amount',
+    'duration': 'duration',
+    'date': 'date',
+}
+# Compared on typed values (cents, day ranges, days) rather than matched text
+TYPED_FACT_TYPES = ('amount', 'duration', 'date')
+# must/must-not pairs are only contradictory when they talk about the same thing
+TOPIC_REQUIRED = {'modality'}
+
+# Statements end at sentence punctuation followed by whitespace, or at a line break
+STATEMENT_BREAK = re.compile(r'(?<=[.!?])\s+|\n+')
+NON_CONTENT_KEYS = {'title', 'id', 'completed'}
+
+
+def brd_sections(brd_content: Any) -> List[Tuple[str, Any]]:
+    """(section ID, value) pairs of a BRD; anything but a dict is one section"""
+    if isinstance(brd_content, dict):
+        return [(str(section), value) for section, value in brd_content.items()]
+    return [('content', brd_content)]
+
+
+def section_hash(value: Any) -> str:
+    """Content hash of one section, independent of key order"""
+    payload = json.dumps(value, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def brd_statements(brd_content: Dict[str, Any], max_chars: int = 300) -> List[Dict[str, Any]]:
+    """
+    Split a BRD into statements that carry a comparable fact
+
+    Args:
+        brd_content: BRD content keyed by section ID
+        max_chars: Statements longer than this are truncated in the context
+
+    Returns:
+        List of statements (section, section_hash, text, facts, terms) in
+        document order; facts maps fact type to its normalized value and
+        matched text
+    """
+    statements = []
+    for section, value in brd_sections(brd_content):
+        statements.extend(section_statements(section, value, section_hash(value), max_chars))
+    return statements
+
+
+def section_statements(section: str, value: Any, digest: str, max_chars: int = 300) -> List[Dict[str, Any]]:
+    """
+    Statements of one section (see brd_statements)
+
+    Args:
+        section: Section ID
+        value: Section content
+        digest: section_hash of the content
+        max_chars: Statements longer than this are truncated in the context
+
+    Returns:
+        List of statements in section order
+    """
+    statements = []
+    for text in _section_texts(value):
+        for sentence in STATEMENT_BREAK.split(text):
+            sentence = sentence.strip()
+            if not sentence:
+                continue
+            facts = _statement_facts(sentence)
+            if facts:
+                statements.append({
+                    'section': section,
+                    'section_hash': digest,
+                    'text': sentence if len(sentence) <= max_chars else sentence[:max_chars].rstrip() + '…',
+                    'facts': facts,
+                    'terms': topic_terms(sentence),
+                })
+    return statements
+
+
+def _section_texts(value: Any) -> List[str]:
+    """Every string inside a section, skipping titles and flags"""
+    if isinstance(value, str):
+        return [value]
+    texts = []
+    if isinstance(value, dict):
+        for key, item in value.items():
+            if key not in NON_CONTENT_KEYS:
+                texts.extend(_section_texts(item))
+    elif isinstance(value, list):
+        for item in value:
+            texts.extend(_section_texts(item))
+    return texts
+
+
+def _statement_facts(sentence: str) -> Dict[str, Tuple[Any, str]]:
+    """Fact type -> (normalized value, matched text) for one statement"""
+    facts = {}
+    for fact_type, (earlier, later) in extract_facts(sentence).items():
+        if fact_type == 'modality':
+            # "must ... not" is the earlier-side match; plain "must" the later one
+            fact = earlier or later
+            if fact is not None:
+                facts[fact_type] = (fact.value, fact.text)
+        elif fact_type == 'quarter' and later is not None:
+            facts[fact_type] = (later.value, later.text)
+    # First typed fact of each kind, so "$150K" and "$150,000" compare equal
+    for fact in extract_typed_facts(sentence):
+        if fact.kind in TYPED_FACT_TYPES and fact.kind not in facts:
+            facts[fact.kind] = ((fact.low, fact.high), fact.text)
+    return facts
+
+
+def find_candidates(statements: List[Dict[str, Any]], max_candidates: int) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Pairs of statements whose facts of the same type disagree
+
+    Statements are grouped by normalized value per fact type, so only pairs
+    across different values are visited and "8 weeks" vs "56 days" or
+    "$150K" vs "$150,000" never become candidates. Pairs that share more
+    topic terms rank first, and a pair of texts repeated across sections is
+    only sent once.
+
+    Args:
+        statements: Output of brd_statements
+        max_candidates: Most candidate pairs to return
+
+    Returns:
+        Tuple of (list of candidates (id, statement_1, statement_2,
+        mismatches), number of further candidates cut off by max_candidates)
+    """
+    pairs: Dict[Tuple[int, int], List[Tuple[str, str, str]]] = {}
+    for fact_type in PRESCREEN_FACT_TYPES:
+        groups: Dict[Any, List[int]] = {}
+        for index, statement in enumerate(statements):
+            fact = statement['facts'].get(fact_type)
+            if fact is not None:
+                groups.setdefault(fact[0], []).append(index)
+        values = list(groups)
+        for a, value_a in enumerate(values):
+            for value_b in values[a + 1:]:
+                for i in groups[value_a]:
+                    for j in groups[value_b]:
+                        first, second = min(i, j), max(i, j)
+                        if statements[first]['text'] == statements[second]['text']:
+                            continue
+                        if fact_type in TOPIC_REQUIRED and not statements[first]['terms'] & statements[second]['terms']:
+                            continue
+                        pairs.setdefault((first, second), []).append((
+                            fact_type,
+                            statements[first]['facts'][fact_type][1],
+                            statements[second]['facts'][fact_type][1],
+                        ))
+
+    ranked = sorted(
+        pairs.items(),
+        key=lambda item: (-len(statements[item[0][0]]['terms'] & statements[item[0][1]]['terms']), item[0])
+    )
+    candidates = []
+    truncated = 0
+    seen_texts = set()
+    for (i, j), mismatches in ranked:
+        # The same statement repeated across sections is confirmed once
+        texts = frozenset((statements[i]['text'], statements[j]['text']))
+        if texts in seen_texts:
+            continue
+        seen_texts.add(texts)
+        if len(candidates) >= max_candidates:
+            truncated += 1
+            continue
+        candidates.append({
+            'id': f"C{len(candidates) + 1}",
+            'statement_1': statements[i],
+            'statement_2': statements[j],
+            'mismatches': mismatches,
+        })
+    return candidates, truncated
+
+
+def build_confirmation_prompt(candidates: List[Dict[str, Any]]) -> str:
+    """
+    Prompt asking Gemini to confirm candidate pairs and suggest resolutions
+
+    Args:
+        candidates: Output of find_candidates
+
+    Returns:
+        Prompt text with only the candidate statements
+    """
+    lines = []
+    for candidate in candidates:
+        mismatches = '; '.join(
+            f"{FACT_LABELS[fact_type]} '{text_1}' vs '{text_2}'"
+            for fact_type, text_1, text_2 in candidate['mismatches']
+        )
+        lines.append(f"[{candidate['id']}] {mismatches}")
+        lines.append(f"  A ({candidate['statement_1']['section']}): {candidate['statement_1']['text']}")
+        lines.append(f"  B ({candidate['statement_2']['section']}): {candidate['statement_2']['text']}")
+    candidate_block = '\n'.join(lines)
+
+    return f"""These statement pairs from a Business Requirements Document mention different values.
+Decide which pairs are real conflicts (contradictory timelines, budgets, durations, dates or
+must/must-not requirements) and which are consistent (e.g. different phases or features).
+
+CANDIDATE CONFLICTS:
+{candidate_block}
+
+For each REAL conflict provide:
+- candidate: the candidate ID (e.g. "C1")
+- type: category of conflict (timeline_conflict, budget_conflict, scope_conflict, ...)
+- description: clear explanation
+- severity: high, medium or low
+- resolution_options: 2-3 ways to resolve
+
+Return ONLY valid JSON array:
+[
+  {{
+    "candidate": "C1",
+    "type": "timeline_conflict",
+    "description": "Timeline section requires Q2 launch but executive summary says Q3",
+    "severity": "high",
+    "resolution_options": [
+      {{"option": "Reduce scope for Q2 MVP", "impact": "Lower initial features"}},
+      {{"option": "Extend to Q3", "impact": "Delayed market entry"}}
+    ]
+  }}
+]
+
+If none of the candidates is a real conflict, return: []"""
+
+
+def candidate_key(candidate: Dict[str, Any]) -> str:
+    """Identity of a candidate pair: both statements and the content hashes of their sections"""
+    first, second = candidate['statement_1'], candidate['statement_2']
+    payload = json.dumps([
+        first['section'], first['section_hash'], first['text'],
+        second['section'], second['section_hash'], second['text'],
+    ], ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class ProjectConflictState:
+    """
+    Conflict-check results of one project, keyed by section content hashes
+
+    sections holds each section's hash and extracted statements; verdicts
+    holds Gemini's answer per candidate pair (the confirmed conflicts, or an
+    empty list for a rejected pair). A pair's key includes both sections'
+    hashes, so editing a section invalidates exactly the pairs it is part of.
+    """
+
+    def __init__(self):
+        self.sections: Dict[str, Tuple[str, List[Dict[str, Any]]]] = {}
+        self.verdicts: Dict[str, List[Dict[str, Any]]] = {}
+
+
+class ConflictPrescreen:
+    """Local candidate search in front of the Gemini conflict check"""
+
+    def __init__(self, llm: Optional[GeminiService] = None, max_candidates: Optional[int] = None):
+        """
+        Initialize the pre-screen
+
+        Args:
+            llm: Gemini client used to confirm candidates
+            max_candidates: Most candidate pairs sent per check
+                (CONFLICT_PRESCREEN_MAX_CANDIDATES)
+        """
+        self.llm = llm or gemini_service
+        self.max_candidates = max_candidates or int(os.getenv('CONFLICT_PRESCREEN_MAX_CANDIDATES', '20'))
+        self.max_statement_chars = int(os.getenv('CONFLICT_PRESCREEN_STATEMENT_CHARS', '300'))
+        # Per-project state for incremental re-checks, least recently checked evicted first
+        self.max_projects = int(os.getenv('CONFLICT_STATE_MAX_PROJECTS', '256'))
+        self._projects: 'OrderedDict[str, ProjectConflictState]' = OrderedDict()
+        self.stats = {
+            'checks': 0,
+            'llm_calls': 0,
+            'llm_skipped': 0,
+            'candidates': 0,
+            'candidates_sent': 0,
+            'candidates_truncated': 0,
+            'verdicts_reused': 0,
+            'sections_extracted': 0,
+            'sections_reused': 0,
+            'confirmed': 0,
+            'unparsed_replies': 0,
+            'prompt_chars': 0,
+            'full_document_chars': 0,
+            'screen_seconds': 0.0,
+            'llm_seconds': 0.0,
+        }
+
+    def screen(self, brd_content: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Candidate conflict pairs in a BRD, without calling the LLM
+
+        Args:
+            brd_content: BRD content keyed by section ID
+
+        Returns:
+            List of candidates (see find_candidates)
+        """
+        return find_candidates(brd_statements(brd_content, self.max_statement_chars), self.max_candidates)[0]
+
+    def _project_state(self, project_id: Optional[str]) -> Optional[ProjectConflictState]:
+        """The project's state (created on first use), or None without a project"""
+        if not project_id:
+            return None
+        state = self._projects.get(project_id)
+        if state is None:
+            state = self._projects[project_id] = ProjectConflictState()
+            while len(self._projects) > self.max_projects:
+                self._projects.popitem(last=False)
+        else:
+            self._projects.move_to_end(project_id)
+        return state
+
+    def forget(self, project_id: str):
+        """Drop a project's cached conflict state"""
+        self._projects.pop(project_id, None)
+
+    def _statements(
+        self,
+        brd_content: Any,
+        state: Optional[ProjectConflictState],
+        persist: bool = True
+    ) -> List[Dict[str, Any]]:
+        """Statements of every section, re-extracting only sections whose content changed"""
+        statements = []
+        sections = {}
+        for section, value in brd_sections(brd_content):
+            digest = section_hash(value)
+            cached = state.sections.get(section) if state is not None else None
+            if cached is not None and cached[0] == digest:
+                section_result = cached[1]
+                self.stats['sections_reused'] += 1
+            else:
+                section_result = section_statements(section, value, digest, self.max_statement_chars)
+                self.stats['sections_extracted'] += 1
+            sections[section] = (digest, section_result)
+            statements.extend(section_result)
+        if state is not None and persist:
+            # Removed sections are forgotten
+            state.sections = sections
+        return statements
+
+    async def detect(
+        self,
+        brd_content: Dict[str, Any],
+        max_tokens: int = 2000,
+        project_id: Optional[str] = None,
+        persist: bool = True
+    ) -> List[Dict[str, Any]]:
+        """
+        Conflicts in a BRD confirmed by Gemini (see check)
+
+        Returns:
+            List of conflicts
+        """
+        result = await self.check(brd_content, max_tokens, project_id, persist)
+        return result['conflicts']
+
+    async def check(
+        self,
+        brd_content: Dict[str, Any],
+        max_tokens: int = 2000,
+        project_id: Optional[str] = None,
+        persist: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Conflicts in a BRD confirmed by Gemini among the local candidates
+
+        With a project_id, verdicts from the project's previous checks are
+        reused for every candidate pair whose two sections are unchanged, so
+        only pairs touching edited sections go to Gemini. A reply that is not
+        a verdict stores nothing for the pairs it was asked about.
+
+        With persist=False the project's state is read but not updated, for
+        content the user has not accepted yet (e.g. a proposed edit).
+
+        Args:
+            brd_content: BRD content keyed by section ID
+            max_tokens: Output budget for the confirmation call
+            project_id: Project whose conflict state to reuse and update
+            persist: Whether to store this check's sections and verdicts
+
+        Returns:
+            Dictionary with conflicts (id, type, description, severity,
+            sources, statements, resolution_options; empty without an LLM
+            call when nothing could conflict or every candidate was already
+            judged), the number of candidates checked and the number of
+            truncated_candidates left unchecked past max_candidates
+        """
+        started = time.perf_counter()
+        if persist:
+            state = self._project_state(project_id)
+        else:
+            state = self._projects.get(project_id) if project_id else None
+        candidates, truncated = find_candidates(self._statements(brd_content, state, persist), self.max_candidates)
+        if truncated:
+            print(f"⚠️  Conflict pre-screen checked {len(candidates)} candidate pairs, {truncated} more left unchecked")
+        keys = [candidate_key(candidate) for candidate in candidates]
+        previous = state.verdicts if state is not None else {}
+        pending = [candidate for candidate, key in zip(candidates, keys) if key not in previous]
+        self.stats['checks'] += 1
+        self.stats['candidates'] += len(candidates)
+        self.stats['candidates_truncated'] += truncated
+        self.stats['verdicts_reused'] += len(candidates) - len(pending)
+        # What the whole-document prompt used to embed
+        self.stats['full_document_chars'] += len(json.dumps(brd_content, indent=2))
+        self.stats['screen_seconds'] += time.perf_counter() - started
+
+        confirmed: Dict[str, List[Dict[str, Any]]] = {}
+        answered = True
+        if pending:
+            prompt = build_confirmation_prompt(pending)
+            self.stats['llm_calls'] += 1
+            self.stats['candidates_sent'] += len(pending)
+            self.stats['prompt_chars'] += len(prompt)
+            started = time.perf_counter()
+            try:
+                result = await self.llm.generate_content_with_json(prompt, max_tokens=max_tokens)
+            finally:
+                self.stats['llm_seconds'] += time.perf_counter() - started
+            # An unparseable reply comes back as {"content": text} and judged nothing
+            answered = is_verdict_reply(result)
+            if not answered:
+                self.stats['unparsed_replies'] += 1
+            confirmed = confirmed_conflicts(result, pending)
+        else:
+            self.stats['llm_skipped'] += 1
+
+        verdicts = {}
+        conflicts = []
+        for candidate, key in zip(candidates, keys):
+            if key in previous:
+                verdicts[key] = previous[key]
+            elif answered:
+                verdicts[key] = _with_stable_ids(confirmed.get(candidate['id'], []), key)
+            else:
+                # No verdict: left out of the state so the next check asks again
+                continue
+            conflicts.extend(verdicts[key])
+        # Confirmations Gemini did not tie to a candidate are reported but not kept
+        for index, conflict in enumerate(confirmed.get('', []), start=1):
+            conflicts.append(dict(conflict, id=conflict['id'] or f"conf_{index:03d}"))
+        if state is not None and persist:
+            # Pairs that are no longer candidates (edited or removed sections) are forgotten
+            state.verdicts = verdicts
+
+        self.stats['confirmed'] += len(conflicts)
+        return {'conflicts': conflicts, 'candidates': len(candidates), 'truncated_candidates': truncated}
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get pre-screen counters"""
+        stats = self.stats
+        return {
+            'checks': stats['checks'],
+            'llm_calls': stats['llm_calls'],
+            'llm_skipped': stats['llm_skipped'],
+            'candidates': stats['candidates'],
+            'candidates_sent': stats['candidates_sent'],
+            'candidates_truncated': stats['candidates_truncated'],
+            'verdicts_reused': stats['verdicts_reused'],
+            'sections_extracted': stats['sections_extracted'],
+            'sections_reused': stats['sections_reused'],
+            'confirmed': stats['confirmed'],
+            'unparsed_replies': stats['unparsed_replies'],
+            'projects': len(self._projects),
+            'avg_prompt_tokens': round(stats['prompt_chars'] / 4 / stats['llm_calls'], 1) if stats['llm_calls'] else 0.0,
+            'avg_document_tokens': round(stats['full_document_chars'] / 4 / stats['checks'], 1) if stats['checks'] else 0.0,
+            'avg_screen_ms': round(stats['screen_seconds'] * 1000 / stats['checks'], 2) if stats['checks'] else 0.0,
+            'avg_llm_seconds': round(stats['llm_seconds'] / stats['llm_calls'], 3) if stats['llm_calls'] else 0.0,
+        }
+
+
+def is_verdict_reply(result: Any) -> bool:
+    """Whether a parsed confirmation reply is a verdict (array, or object with a 'conflicts' array)"""
+    if isinstance(result, dict):
+        result = result.get('conflicts')
+    return isinstance(result, list)
+
+
+def confirmed_conflicts(result: Any, candidates: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Map Gemini's confirmations back onto the candidate statements
+
+    Args:
+        result: Parsed JSON response (array, or object with 'conflicts')
+        candidates: Candidates that were sent
+
+    Returns:
+        Candidate ID -> conflict dictionaries ('' for confirmations that name
+        no known candidate); sources default to the candidate's sections
+    """
+    if isinstance(result, dict):
+        result = result.get('conflicts', [])
+    if not isinstance(result, list):
+        return {}
+
+    by_id = {candidate['id']: candidate for candidate in candidates}
+    confirmed: Dict[str, List[Dict[str, Any]]] = {}
+    for item in result:
+        if not isinstance(item, dict):
+            continue
+        candidate_id = str(item.get('candidate', ''))
+        candidate = by_id.get(candidate_id)
+        sources = item.get('sources') or []
+        statements = []
+        if candidate is not None:
+            statements = [candidate['statement_1']['text'], candidate['statement_2']['text']]
+            if not sources:
+                sources = list(dict.fromkeys(
+                    [candidate['statement_1']['section'], candidate['statement_2']['section']]
+                ))
+        else:
+            candidate_id = ''
+        confirmed.setdefault(candidate_id, []).append({
+            'id': item.get('id') or '',
+            'type': item.get('type', 'general'),
+            'description': item.get('description', 'Conflict detected'),
+            'severity': item.get('severity', 'medium'),
+            'sources': sources,
+            'statements': statements,
+            'resolution_options': item.get('resolution_options', []),
+        })
+    return confirmed
+
+
+def _with_stable_ids(conflicts: List[Dict[str, Any]], key: str) -> List[Dict[str, Any]]:
+    """IDs derived from the candidate pair, so a conflict keeps its ID across re-checks"""
+    return [
+        dict(conflict, id=f"conf_{key[:10]}" + (f"_{index}" if index > 1 else ''))
+        for index, conflict in enumerate(conflicts, start=1)
+    ]
+
+
+# Singleton instance
+conflict_prescreen = ConflictPrescreen()
@@ -0,0 +1,462 @@
+"""
+Streaming ingesters for raw email and meeting corpora
+Turns mbox files, Enron-style maildir trees and AMI transcripts into the
+email/meeting records the generation service indexes
+"""
+
+import multiprocessing
+import os
+import re
+import time
+import xml.etree.ElementTree as ET
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timezone
+from email.header import decode_header, make_header
+from email.message import Message
+from email.parser import BytesParser
+from email.policy import compat32
+from email.utils import parsedate_to_datetime
+from functools import partial
+from itertools import islice
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from app.services.html_extractor import extract_page
+
+# Record transforms (e.g. enrichment) run inside the worker processes
+Transform = Optional[Callable[[Dict[str, Any]], Dict[str, Any]]]
+
+# Bodies are cut here; prompts only ever draw on a few of their chunks
+MAX_BODY_CHARS = 20000
+
+# Lines where a quoted reply or forwarded message starts
+REPLY_MARKERS = re.compile(
+    r'^\s*(?:-{2,}\s*Original Message\s*-{2,}'
+    r'|-{2,}\s*Forwarded by .*'
+    r'|-{2,}\s*Forwarded message\s*-{2,}'
+    r'|_{10,}\s*$'
+    r'|On .{0,200}wrote:\s*$'
+    r'|From:\s.*\n\s*(?:Sent|Date|To):\s)',
+    re.IGNORECASE | re.MULTILINE
+)
+# Lines where a signature starts ("-- " delimiter, mobile footers, disclaimer rules)
+SIGNATURE_MARKERS = re.compile(
+    r'^(?:--\s?|Sent from my .*|Get Outlook for .*|\*{20,}|={20,})\s*$',
+    re.MULTILINE
+)
+_BLANK_RUNS = re.compile(r'\n\s*\n(?:\s*\n)+')
+# mboxrd escapes body lines starting with "From " as ">From "
+_ESCAPED_FROM = re.compile(rb'^>+From ')
+
+# AMI word-level annotations: <meeting>.<speaker>.words.xml
+AMI_WORDS_SUFFIX = '.words.xml'
+# Silence that ends an utterance even when the speaker does not change
+AMI_UTTERANCE_GAP_SECONDS = 2.0
+
+
+def clean_email_body(body: str) -> str:
+    """
+    Strip quoted reply chains and signatures from an email body
+
+    The text above the first reply/forward marker is kept. A pure forward
+    (nothing written above the marker) keeps the forwarded text instead, so
+    the message is not emptied. '>' quoted lines are always dropped.
+
+    Args:
+        body: Plain-text email body
+
+    Returns:
+        The author's own text, with blank-line runs collapsed
+    """
+    body = body.replace('\r\n', '\n').replace('\r', '\n')
+    marker = REPLY_MARKERS.search(body)
+    if marker and body[:marker.start()].strip():
+        body = body[:marker.start()]
+
+    body = '\n'.join(line for line in body.split('\n') if not line.lstrip().startswith('>'))
+
+    signature = SIGNATURE_MARKERS.search(body)
+    if signature and body[:signature.start()].strip():
+        body = body[:signature.start()]
+
+    return _BLANK_RUNS.sub('\n\n', body).strip()[:MAX_BODY_CHARS]
+
+
+def _header(message: Message, name: str) -> str:
+    """Decoded header value ('' if missing)"""
+    value = message.get(name)
+    if value is None:
+        return ''
+    try:
+        return ' '.join(str(make_header(decode_header(str(value)))).split())
+    except Exception:
+        return ' '.join(str(value).split())
+
+
+def _iso_date(value: str) -> str:
+    """RFC 2822 date as ISO 8601 UTC, or the raw value if it does not parse"""
+    try:
+        parsed = parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        return value
+    if parsed.tzinfo is None:
+        return parsed.isoformat()
+    return parsed.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+def _part_text(part: Message) -> str:
+    """Decoded text of one MIME part"""
+    payload = part.get_payload(decode=True) or b''
+    try:
+        return payload.decode(part.get_content_charset() or 'utf-8', errors='replace')
+    except LookupError:
+        return payload.decode('latin-1')
+
+
+def _message_text(message: Message) -> str:
+    """Plain-text body, falling back to the text of the first HTML part"""
+    html = None
+    for part in message.walk():
+        if part.is_multipart() or part.get_filename():
+            continue
+        content_type = part.get_content_type()
+        if content_type == 'text/plain':
+            return _part_text(part)
+        if content_type == 'text/html' and html is None:
+            html = _part_text(part)
+    return extract_page(html, '')['text'] if html else ''
+
+
+def parse_email_bytes(raw: bytes, source: str = '') -> Optional[Dict[str, Any]]:
+    """
+    Normalize one RFC 822 message into an email record
+
+    Args:
+        raw: Raw message bytes
+        source: Where the message came from (file path or mbox position)
+
+    Returns:
+        Email dictionary (from, to, cc, date, subject, body, message_id, source),
+        or None if the message has neither a sender nor a body
+    """
+    message = BytesParser(policy=compat32).parsebytes(raw)
+    body = clean_email_body(_message_text(message))
+    sender = _header(message, 'From')
+    if not sender and not body:
+        return None
+    return {
+        'from': sender,
+        'to': _header(message, 'To'),
+        'cc': _header(message, 'Cc'),
+        'date': _iso_date(_header(message, 'Date')),
+        'subject': _header(message, 'Subject'),
+        'body': body,
+        'message_id': _header(message, 'Message-ID'),
+        'source': source
+    }
+
+
+def _parse_email_batch(batch: List[Tuple[str, Optional[bytes]]], transform: Transform) -> List[Dict[str, Any]]:
+    """Worker: parse (source, raw bytes or None to read the source file) pairs"""
+    records = []
+    for source, raw in batch:
+        try:
+            if raw is None:
+                with open(source, 'rb') as f:
+                    raw = f.read()
+            record = parse_email_bytes(raw, source)
+        except Exception:
+            record = None
+        records.append(_transformed(record, transform))
+    return records
+
+
+def parse_ami_meeting(meeting_id: str, word_files: List[str]) -> Dict[str, Any]:
+    """
+    Build a meeting record from the per-speaker AMI words files of one meeting
+
+    Words from all speakers are merged by start time and grouped into
+    utterances on speaker changes or pauses; vocal sounds, disfluency
+    markers and gaps are dropped.
+
+    Args:
+        meeting_id: AMI meeting id (e.g. "ES2002a")
+        word_files: Paths of <meeting>.<speaker>.words.xml files
+
+    Returns:
+        Meeting dictionary (meeting_id, date, duration_minutes, participants,
+        transcript, source)
+    """
+    words = []
+    speakers = []
+    for path in sorted(word_files):
+        speaker = f"Speaker {Path(path).name[len(meeting_id) + 1:].split('.')[0]}"
+        speakers.append(speaker)
+        speaker_words = []
+        last_start = 0.0
+        for _, element in ET.iterparse(path):
+            if element.tag == 'w' and element.text:
+                text = element.text.strip()
+                if element.get('punc') == 'true' and speaker_words:
+                    # Glue punctuation to the word before it, before speakers interleave
+                    speaker_words[-1][3] += text
+                else:
+                    start = float(element.get('starttime') or last_start)
+                    last_start = start
+                    speaker_words.append([start, float(element.get('endtime') or start), speaker, text])
+            element.clear()
+        words.extend(speaker_words)
+
+    words.sort(key=lambda word: word[0])
+    lines = []
+    current, tokens, started, last_end = None, [], 0.0, 0.0
+    for start, end, speaker, text in words:
+        if tokens and (speaker != current or start - last_end > AMI_UTTERANCE_GAP_SECONDS):
+            lines.append(_utterance(started, current, tokens))
+            tokens = []
+        if not tokens:
+            current, started, last_end = speaker, start, end
+        tokens.append(text)
+        last_end = max(last_end, end)
+    if tokens:
+        lines.append(_utterance(started, current, tokens))
+
+    duration = max((word[1] for word in words), default=0.0)
+    return {
+        'meeting_id': meeting_id,
+        'date': '',
+        'duration_minutes': round(duration / 60),
+        'participants': speakers,
+        'transcript': '\n\n'.join(lines),
+        'source': str(Path(word_files[0]).parent) if word_files else ''
+    }
+
+
+def _utterance(started: float, speaker: str, tokens: List[str]) -> str:
+    """One transcript line in the "[MM:SS] Speaker: text" format of the demo data"""
+    minutes, seconds = divmod(int(started), 60)
+    return f"[{minutes:02d}:{seconds:02d}] {speaker}: {' '.join(tokens)}"
+
+
+def _parse_ami_batch(batch: List[Tuple[str, List[str]]], transform: Transform) -> List[Dict[str, Any]]:
+    """Worker: parse (meeting id, words files) pairs"""
+    records = []
+    for meeting_id, word_files in batch:
+        try:
+            record = parse_ami_meeting(meeting_id, word_files)
+        except Exception:
+            record = None
+        records.append(_transformed(record, transform))
+    return records
+
+
+def _transformed(record: Optional[Dict[str, Any]], transform: Transform) -> Optional[Dict[str, Any]]:
+    """Apply transform to a parsed record; a record it fails on is skipped like an unparseable one"""
+    if record is None or transform is None:
+        return record
+    try:
+        return transform(record)
+    except Exception:
+        return None
+
+
+def iter_mbox_messages(path: str) -> Iterator[Tuple[str, bytes]]:
+    """
+    Split an mbox file into raw messages without loading it
+
+    Args:
+        path: mbox file
+
+    Returns:
+        Iterator over (source label, raw message bytes)
+    """
+    with open(path, 'rb') as f:
+        lines: List[bytes] = []
+        started = False
+        previous_blank = True
+        index = 0
+        for line in f:
+            if line.startswith(b'From ') and previous_blank:
+                if started and lines:
+                    yield f"{path}#{index}", b''.join(lines)
+                    index += 1
+                started, lines = True, []
+            elif started:
+                lines.append(line[1:] if _ESCAPED_FROM.match(line) else line)
+            previous_blank = not line.strip()
+        if started and lines:
+            yield f"{path}#{index}", b''.join(lines)
+
+
+def iter_maildir_files(root: str) -> Iterator[str]:
+    """
+    Message files under a maildir tree (Enron layout or cur/new folders), in sorted order
+
+    Args:
+        root: Top directory
+
+    Returns:
+        Iterator over message file paths
+    """
+    for directory, subdirs, files in os.walk(root):
+        subdirs[:] = sorted(d for d in subdirs if not d.startswith('.') and d != 'tmp')
+        for name in sorted(files):
+            if not name.startswith('.'):
+                yield os.path.join(directory, name)
+
+
+def available_cpus() -> int:
+    """CPUs this process may run on"""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def process_pool_context():
+    """
+    Start method for worker pools reachable from the server
+
+    Workers start from a clean interpreter (forkserver, else spawn); forking
+    the server would copy its threads' locks (to_thread workers, the SQLite
+    caches) into the children.
+    """
+    method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+    return multiprocessing.get_context(method)
+
+
+def _batched(items: Iterable, size: int) -> Iterator[List]:
+    """Consecutive lists of up to `size` items"""
+    iterator = iter(items)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+class CorpusIngester:
+    """Parse raw corpora across worker processes, streaming records back in input order"""
+
+    def __init__(self, workers: Optional[int] = None, batch_size: Optional[int] = None):
+        """
+        Initialize from arguments or environment variables
+
+        Args:
+            workers: Worker processes, 1 parses in-process, 0 = CPU count
+                (INGEST_WORKERS, default 1)
+            batch_size: Messages handed to a worker at a time (INGEST_BATCH_SIZE)
+        """
+        workers = workers if workers is not None else int(os.getenv('INGEST_WORKERS', '1'))
+        self.workers = workers or available_cpus()
+        self.batch_size = batch_size or int(os.getenv('INGEST_BATCH_SIZE', '200'))
+        self.stats = {'inputs': 0, 'records': 0, 'skipped': 0, 'duplicates': 0, 'elapsed_seconds': 0.0}
+
+    def iter_mbox(self, paths: Iterable[str], transform: Transform = None) -> Iterator[Dict[str, Any]]:
+        """
+        Stream email records from one or more mbox files
+
+        Args:
+            paths: mbox file paths
+            transform: Function applied to each record in the workers (e.g. enrichment)
+
+        Returns:
+            Iterator over email dictionaries, duplicates (same Message-ID) dropped
+        """
+        units = ((source, raw) for path in paths for source, raw in iter_mbox_messages(path))
+        return self._dedupe(self._run(partial(_parse_email_batch, transform=transform), units, self.batch_size))
+
+    def iter_maildir(self, roots: Iterable[str], transform: Transform = None) -> Iterator[Dict[str, Any]]:
+        """
+        Stream email records from maildir trees such as the Enron corpus
+
+        Args:
+            roots: Maildir root directories
+            transform: Function applied to each record in the workers (e.g. enrichment)
+
+        Returns:
+            Iterator over email dictionaries, duplicates (same Message-ID) dropped
+        """
+        units = ((path, None) for root in roots for path in iter_maildir_files(root))
+        return self._dedupe(self._run(partial(_parse_email_batch, transform=transform), units, self.batch_size))
+
+    def iter_ami(self, roots: Iterable[str], transform: Transform = None) -> Iterator[Dict[str, Any]]:
+        """
+        Stream meeting records from AMI corpus word annotations
+
+        Args:
+            roots: Directories containing <meeting>.<speaker>.words.xml files
+            transform: Function applied to each record in the workers (e.g. enrichment)
+
+        Returns:
+            Iterator over meeting dictionaries, one per meeting, sorted by meeting id
+        """
+        meetings: Dict[str, List[str]] = {}
+        for root in roots:
+            for path in Path(root).rglob(f"*{AMI_WORDS_SUFFIX}"):
+                meetings.setdefault(path.name.split('.')[0], []).append(str(path))
+        units = sorted(meetings.items())
+        # A meeting is thousands of words, so hand them out one at a time
+        return self._run(partial(_parse_ami_batch, transform=transform), units, 1)
+
+    def _run(self, func: Callable[[List], List], units: Iterable, batch_size: int) -> Iterator[Dict[str, Any]]:
+        """Map func over batches of units, keeping a bounded number of batches in flight"""
+        started = time.perf_counter()
+        elapsed_before = self.stats['elapsed_seconds']
+
+        def collect(batch_records: List[Optional[Dict[str, Any]]]) -> Iterator[Dict[str, Any]]:
+            for record in batch_records:
+                self.stats['inputs'] += 1
+                if record is None:
+                    self.stats['skipped'] += 1
+                    continue
+                self.stats['records'] += 1
+                yield record
+            self.stats['elapsed_seconds'] = round(elapsed_before + time.perf_counter() - started, 3)
+
+        batches = _batched(units, batch_size)
+        if self.workers <= 1:
+            for batch in batches:
+                yield from collect(func(batch))
+            return
+
+        pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=process_pool_context())
+        try:
+            pending = deque()
+            for batch in batches:
+                pending.append(pool.submit(func, batch))
+                # Two batches per worker keeps them busy without buffering the corpus
+                if len(pending) >= self.workers * 2:
+                    yield from collect(pending.popleft().result())
+            while pending:
+                yield from collect(pending.popleft().result())
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    def _dedupe(self, records: Iterator[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """Drop emails whose Message-ID was already seen (Enron files one message in several folders)"""
+        seen = set()
+        for record in records:
+            message_id = record.get('message_id')
+            if message_id:
+                if message_id in seen:
+                    self.stats['duplicates'] += 1
+                    continue
+                seen.add(message_id)
+            yield record
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get counters for every ingest run by this instance
+
+        Returns:
+            Dictionary with input, record, skip and duplicate counts and throughput
+        """
+        elapsed = self.stats['elapsed_seconds']
+        delivered = self.stats['records'] - self.stats['duplicates']
+        return {
+            **self.stats,
+            'records_per_second': round(delivered / elapsed, 1) if elapsed else 0.0,
+            'workers': self.workers
+        }
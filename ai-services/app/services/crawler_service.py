@@ -0,0 +1,259 @@
+"""
+Concurrent multi-URL crawl on top of ScraperService
+Global and per-domain concurrency limits, robots.txt, crawl delays and a time budget
+"""
+
+import asyncio
+import os
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+from urllib.robotparser import RobotFileParser
+
+from app.services.scrape_cache import normalize_url
+from app.services.scraper_service import ScraperService, scraper_service
+
+ROBOTS_AGENT = 'ReqForgeBot'
+
+# Links to these are never worth following for competitor analysis
+SKIP_EXTENSIONS = (
+    '.pdf', '.zip', '.gz', '.png', '.jpg', '.jpeg', '.gif', '.svg', '.webp', '.ico',
+    '.mp4', '.mp3', '.webm', '.css', '.js', '.json', '.xml', '.woff', '.woff2'
+)
+
+
+def site_of(url: str) -> str:
+    """Host (and port) a URL belongs to for same-site checks ("www." is ignored)"""
+    host = urlsplit(url).netloc.lower()
+    return host[4:] if host.startswith('www.') else host
+
+
+class CrawlerService:
+    """Crawl a list of URLs (optionally following same-site links) politely and concurrently"""
+
+    def __init__(self, scraper: ScraperService):
+        """
+        Initialize limits from environment variables
+
+        Args:
+            scraper: Scraper used to fetch and extract each page
+        """
+        self.scraper = scraper
+        self.max_concurrency = int(os.getenv('CRAWL_MAX_CONCURRENCY', '8'))
+        self.per_domain_concurrency = int(os.getenv('CRAWL_PER_DOMAIN_CONCURRENCY', '2'))
+        self.max_pages = int(os.getenv('CRAWL_MAX_PAGES', '50'))
+        self.time_budget = float(os.getenv('CRAWL_TIME_BUDGET_SECONDS', '60'))
+        self.respect_robots = os.getenv('CRAWL_RESPECT_ROBOTS', 'true').lower() not in ('0', 'false', 'no')
+        # Cap on robots.txt Crawl-delay so one site cannot stall a whole batch
+        self.max_crawl_delay = float(os.getenv('CRAWL_MAX_DELAY_SECONDS', '5'))
+        self.robots_ttl = float(os.getenv('CRAWL_ROBOTS_TTL_SECONDS', '3600'))
+
+        self._robots: Dict[str, Tuple[float, asyncio.Task]] = {}
+        # Per-domain state exists only while a domain has requests in flight
+        # (or a crawl delay still pending), so it does not grow across crawls
+        self._domain_semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._domain_active: Dict[str, int] = {}
+        self._next_request_at: Dict[str, float] = {}
+        self.stats = {'crawls': 0, 'pages': 0, 'errors': 0, 'blocked_by_robots': 0, 'timed_out': 0}
+
+    async def crawl(
+        self,
+        urls: List[str],
+        max_depth: int = 0,
+        max_pages: Optional[int] = None,
+        time_budget: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """
+        Fetch every URL concurrently, following same-site links up to max_depth
+
+        Args:
+            urls: Start URLs
+            max_depth: Link-following depth (0 = only the given URLs)
+            max_pages: Max pages fetched in this crawl (CRAWL_MAX_PAGES)
+            time_budget: Seconds before outstanding pages are abandoned (CRAWL_TIME_BUDGET_SECONDS)
+
+        Returns:
+            Dictionary with per-page results (in discovery order) and crawl counters
+        """
+        max_pages = max_pages or self.max_pages
+        time_budget = time_budget or self.time_budget
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        deadline = started + time_budget
+
+        queue: asyncio.Queue = asyncio.Queue()
+        seen = set()
+        results: Dict[int, Dict[str, Any]] = {}
+        in_flight: Dict[int, Tuple[str, int]] = {}
+        # Each start URL only expands within its own site
+        sites = {site_of(url) for url in urls}
+
+        def enqueue(url: str, depth: int):
+            key = normalize_url(url)
+            if key in seen or len(seen) >= max_pages:
+                return
+            seen.add(key)
+            queue.put_nowait((len(seen) - 1, url, depth))
+
+        for url in urls:
+            enqueue(url, 0)
+
+        async def worker():
+            while True:
+                seq, url, depth = await queue.get()
+                in_flight[seq] = (url, depth)
+                # Cancellation (budget exhausted) leaves the page in in_flight
+                try:
+                    result = await self._visit(url, depth)
+                except Exception as e:
+                    result = {'url': url, 'depth': depth, 'status': 'error', 'error': str(e)}
+                results[seq] = result
+                if result['status'] == 'ok' and depth < max_depth:
+                    for link in result.get('links', []):
+                        if site_of(link) in sites and not urlsplit(link).path.lower().endswith(SKIP_EXTENSIONS):
+                            enqueue(link, depth + 1)
+                in_flight.pop(seq, None)
+                queue.task_done()
+
+        workers = [asyncio.create_task(worker()) for _ in range(self.max_concurrency)]
+        timed_out = False
+        try:
+            await asyncio.wait_for(queue.join(), timeout=max(deadline - loop.time(), 0))
+        except asyncio.TimeoutError:
+            timed_out = True
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+        # Whatever was running or still queued when the budget ran out
+        pending = list(in_flight.items())
+        while not queue.empty():
+            seq, url, depth = queue.get_nowait()
+            pending.append((seq, (url, depth)))
+        for seq, (url, depth) in pending:
+            results[seq] = {'url': url, 'depth': depth, 'status': 'timeout', 'error': 'Crawl time budget exhausted'}
+
+        pages = [results[seq] for seq in sorted(results)]
+        counts = {}
+        for page in pages:
+            counts[page['status']] = counts.get(page['status'], 0) + 1
+
+        self._prune()
+
+        self.stats['crawls'] += 1
+        self.stats['pages'] += counts.get('ok', 0)
+        self.stats['errors'] += counts.get('error', 0)
+        self.stats['blocked_by_robots'] += counts.get('blocked_by_robots', 0)
+        self.stats['timed_out'] += counts.get('timeout', 0)
+
+        return {
+            'pages': pages,
+            'stats': {
+                **counts,
+                'discovered': len(seen),
+                'timed_out': timed_out,
+                'elapsed_seconds': round(loop.time() - started, 3)
+            }
+        }
+
+    async def _visit(self, url: str, depth: int) -> Dict[str, Any]:
+        """Check robots.txt, wait for the domain's turn and scrape one page"""
+        result = {'url': url, 'depth': depth}
+        parts = urlsplit(url)
+        if parts.scheme not in ('http', 'https') or not parts.hostname:
+            return {**result, 'status': 'error', 'error': 'Unsupported URL'}
+
+        origin = f"{parts.scheme}://{parts.netloc}"
+        robots = await self._get_robots(origin) if self.respect_robots else None
+        if robots is not None and not robots.can_fetch(ROBOTS_AGENT, url):
+            return {**result, 'status': 'blocked_by_robots'}
+
+        delay = 0.0
+        if robots is not None:
+            delay = min(float(robots.crawl_delay(ROBOTS_AGENT) or 0), self.max_crawl_delay)
+
+        self._domain_active[parts.netloc] = self._domain_active.get(parts.netloc, 0) + 1
+        try:
+            async with self._get_domain_semaphore(parts.netloc):
+                await self._wait_turn(parts.netloc, delay)
+                try:
+                    data = await self.scraper.scrape(url)
+                except Exception as e:
+                    return {**result, 'status': 'error', 'error': str(e)}
+        finally:
+            self._release_domain(parts.netloc)
+
+        return {**result, 'status': 'ok', **data}
+
+    def _get_domain_semaphore(self, netloc: str) -> asyncio.Semaphore:
+        """Per-domain concurrency limit, created on first use"""
+        semaphore = self._domain_semaphores.get(netloc)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.per_domain_concurrency)
+            self._domain_semaphores[netloc] = semaphore
+        return semaphore
+
+    def _release_domain(self, netloc: str):
+        """Drop a domain's semaphore and spent crawl delay once nothing is using it"""
+        remaining = self._domain_active.get(netloc, 1) - 1
+        if remaining > 0:
+            self._domain_active[netloc] = remaining
+            return
+        self._domain_active.pop(netloc, None)
+        self._domain_semaphores.pop(netloc, None)
+        if self._next_request_at.get(netloc, 0.0) <= time.monotonic():
+            self._next_request_at.pop(netloc, None)
+
+    def _prune(self):
+        """Forget crawl delays that have passed and robots.txt rules past their TTL"""
+        now = time.monotonic()
+        for netloc, start_at in list(self._next_request_at.items()):
+            if start_at <= now and netloc not in self._domain_active:
+                del self._next_request_at[netloc]
+        for origin, (fetched_at, task) in list(self._robots.items()):
+            if task.done() and now - fetched_at > self.robots_ttl:
+                del self._robots[origin]
+
+    async def _wait_turn(self, netloc: str, delay: float):
+        """Space requests to one domain at least `delay` seconds apart"""
+        if delay <= 0:
+            return
+        now = time.monotonic()
+        start_at = max(self._next_request_at.get(netloc, 0.0), now)
+        self._next_request_at[netloc] = start_at + delay
+        if start_at > now:
+            await asyncio.sleep(start_at - now)
+
+    async def _get_robots(self, origin: str) -> RobotFileParser:
+        """robots.txt rules for an origin, fetched once and shared by concurrent callers"""
+        now = time.monotonic()
+        entry = self._robots.get(origin)
+        if entry is None or now - entry[0] > self.robots_ttl or (entry[1].done() and entry[1].cancelled()):
+            entry = (now, asyncio.create_task(self._fetch_robots(origin)))
+            self._robots[origin] = entry
+        return await asyncio.shield(entry[1])
+
+    async def _fetch_robots(self, origin: str) -> RobotFileParser:
+        """Download and parse robots.txt (missing file = allow all, 401/403 = disallow all)"""
+        robots = RobotFileParser(f"{origin}/robots.txt")
+        status, body = await self.scraper.fetch_raw(f"{origin}/robots.txt")
+        if status in (401, 403):
+            robots.disallow_all = True
+        elif 200 <= status < 300:
+            robots.parse(body.splitlines())
+        else:
+            robots.allow_all = True
+        return robots
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get crawl counters
+
+        Returns:
+            Dictionary with crawl, page and skip counters
+        """
+        return {**self.stats, 'robots_cached': len(self._robots), 'active_domains': len(self._domain_active)}
+
+
+crawler_service = CrawlerService(scraper_service)
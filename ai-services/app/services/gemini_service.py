@@ -1,39 +1,82 @@
 """
 Google Gemini AI Service
-Using Google AI Studio API (free tier)
+Using Google AI Studio API (free tier), or the offline stub backend
 """
 
-import google.generativeai as genai
+import asyncio
 import os
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, AsyncIterator, Tuple
 import json
+from app.services.llm_cache import LLMCache
+from app.services.request_coalescer import RequestCoalescer
+from app.services.key_pool import APIKeyPool, APIKeyState, _retry_after, is_rate_limit_error
+from app.services.llm_backends import LLMBackend, create_backend
+from app.utils.helpers import estimate_tokens
 
 
 class GeminiService:
     """Service for interacting with Google Gemini API"""
     
-    def __init__(self):
-        """Initialize Gemini API client"""
-        api_key = os.getenv('GEMINI_API_KEY')
+    def __init__(self, backend: Optional[LLMBackend] = None):
+        """
+        Initialize the LLM client
+        
+        Args:
+            backend: LLM backend to call; defaults to the one selected by
+                LLM_BACKEND ("gemini" or "stub")
+        """
+        self.backend = backend or create_backend()
+        self.model_name = self.backend.model_name
         
-        if not api_key:
-            raise ValueError("GEMINI_API_KEY environment variable not set")
+        # Calls are routed to the key with the most rate-limit headroom
+        api_keys = self.backend.api_keys()
+        self.key_pool = APIKeyPool(api_keys)
         
-        genai.configure(api_key=api_key)
+        # Upper bound on concurrent upstream calls per worker, and the
+        # default per-call timeout in seconds
+        self.max_concurrency = int(os.getenv('GEMINI_MAX_CONCURRENCY', '32'))
+        self.timeout = float(os.getenv('GEMINI_TIMEOUT_SECONDS', '60'))
+        self._semaphore: Optional[asyncio.Semaphore] = None
         
-        # Use Gemini 1.5 Flash (free tier, fast, good quality)
-        self.model = genai.GenerativeModel('gemini-1.5-flash')
+        # Response cache keyed on prompt, model and generation config
+        self.cache = LLMCache()
         
-        # Alternative: Use Gemini 1.5 Pro for better quality (also free)
-        # self.model = genai.GenerativeModel('gemini-1.5-pro')
+        # Identical concurrent requests share a single upstream call
+        self.coalescer = RequestCoalescer()
         
-        print("✅ Gemini AI Service initialized")
+        print(f"✅ Gemini AI Service initialized ({self.backend.name} backend, {len(api_keys)} API key(s))")
+    
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        """Create the concurrency limiter lazily so it binds to the running loop"""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+    
+    async def _call_with_limits(self, coro_factory, timeout: Optional[float] = None):
+        """
+        Await an upstream Gemini call under the concurrency limit and timeout
+        
+        Args:
+            coro_factory: Zero-argument callable returning the awaitable to run
+            timeout: Per-call timeout in seconds (defaults to GEMINI_TIMEOUT_SECONDS)
+            
+        Returns:
+            Result of the awaited call
+        """
+        timeout = timeout or self.timeout
+        async with self._get_semaphore():
+            try:
+                return await asyncio.wait_for(coro_factory(), timeout=timeout)
+            except asyncio.TimeoutError:
+                raise TimeoutError(f"Gemini request timed out after {timeout:.0f}s")
     
     async def generate_content(
         self, 
         prompt: str, 
         max_tokens: int = 2000,
-        temperature: float = 0.7
+        temperature: float = 0.7,
+        timeout: Optional[float] = None,
+        use_cache: bool = True
     ) -> str:
         """
         Generate content using Gemini API
@@ -42,38 +85,83 @@ class GeminiService:
             prompt: Input prompt
             max_tokens: Maximum tokens to generate (Gemini uses this as guidance)
             temperature: Creativity level (0.0 to 1.0)
+            timeout: Per-call timeout in seconds (defaults to GEMINI_TIMEOUT_SECONDS)
+            use_cache: Serve identical requests from the response cache and
+                share identical in-flight calls; False always makes a fresh call
             
         Returns:
             Generated text content
         """
+        request_key = LLMCache.make_key(
+            prompt,
+            self.model_name,
+            {'max_tokens': max_tokens, 'temperature': temperature}
+        )
+        if use_cache:
+            cached = await self.cache.get(request_key)
+            if cached is not None:
+                return cached
+        
         try:
-            # Configure generation parameters
-            generation_config = genai.types.GenerationConfig(
-                max_output_tokens=max_tokens,
-                temperature=temperature,
-            )
-            
-            # Generate content
-            response = self.model.generate_content(
-                prompt,
-                generation_config=generation_config
+            if not use_cache:
+                # Bypassing the cache also means not joining another caller's in-flight call
+                return await self._generate_upstream(prompt, max_tokens, temperature, timeout)
+            return await self.coalescer.run(
+                request_key,
+                lambda: self._generate_upstream(prompt, max_tokens, temperature, timeout, cache_key=request_key)
             )
-            
-            # Extract text from response
-            if response.text:
-                return response.text
-            else:
-                print("⚠️  No text in Gemini response")
-                return ""
                 
         except Exception as e:
             print(f"❌ Gemini API error: {str(e)}")
             raise Exception(f"Failed to generate content: {str(e)}")
     
+    async def _generate_upstream(
+        self,
+        prompt: str,
+        max_tokens: int,
+        temperature: float,
+        timeout: Optional[float],
+        cache_key: Optional[str] = None
+    ) -> str:
+        """
+        Call Gemini once and store the response in the cache
+        
+        Args:
+            prompt: Input prompt
+            max_tokens: Maximum tokens to generate
+            temperature: Creativity level (0.0 to 1.0)
+            timeout: Per-call timeout in seconds
+            cache_key: Cache key to store the response under, None to skip caching
+            
+        Returns:
+            Generated text content
+        """
+        # Generate content without blocking the event loop, on the key
+        # with the most headroom (another key is tried on 429)
+        text = await self.key_pool.execute(
+            lambda api_key: self._call_with_limits(
+                lambda: self.backend.generate(api_key, prompt, max_tokens, temperature),
+                timeout=timeout
+            ),
+            estimated_tokens=estimate_tokens(prompt) + max_tokens,
+            measure=lambda result: estimate_tokens(prompt) + estimate_tokens(result)
+        )
+        
+        # Extract text from response
+        if text:
+            if cache_key:
+                await self.cache.set(cache_key, text)
+            return text
+        else:
+            print("⚠️  No text in Gemini response")
+            return ""
+    
     async def generate_content_with_json(
         self, 
         prompt: str,
-        max_tokens: int = 2000
+        max_tokens: int = 2000,
+        timeout: Optional[float] = None,
+        use_cache: bool = True
     ) -> Dict[str, Any]:
         """
         Generate JSON content using Gemini
@@ -81,83 +169,237 @@ class GeminiService:
         Args:
             prompt: Input prompt (should request JSON output)
             max_tokens: Maximum tokens
+            timeout: Per-call timeout in seconds (defaults to GEMINI_TIMEOUT_SECONDS)
+            use_cache: Serve identical requests from the response cache
             
         Returns:
             Parsed JSON dictionary
         """
         try:
-            # Add JSON formatting instruction to prompt
-            json_prompt = f"""{prompt}
-
-IMPORTANT: Return ONLY valid JSON. No markdown, no code blocks, no explanations. Just pure JSON."""
-            
-            response_text = await self.generate_content(json_prompt, max_tokens=max_tokens)
-            
-            # Clean response - remove markdown code blocks if present
-            cleaned_text = response_text.strip()
-            
-            # Remove ```json and ``` if present
-            if cleaned_text.startswith('```json'):
-                cleaned_text = cleaned_text[7:]
-            elif cleaned_text.startswith('```'):
-                cleaned_text = cleaned_text[3:]
-            
-            if cleaned_text.endswith('```'):
-                cleaned_text = cleaned_text[:-3]
-            
-            cleaned_text = cleaned_text.strip()
+            response_text = await self.generate_content(
+                self.json_prompt(prompt),
+                max_tokens=max_tokens,
+                timeout=timeout,
+                use_cache=use_cache
+            )
             
-            # Parse JSON
-            try:
-                return json.loads(cleaned_text)
-            except json.JSONDecodeError:
-                print(f"⚠️  Failed to parse JSON, returning as text wrapper")
-                return {"content": cleaned_text}
+            return self.parse_json_response(response_text)
                 
         except Exception as e:
             print(f"❌ JSON generation error: {str(e)}")
             raise
     
-    async def stream_content(self, prompt: str):
+    @staticmethod
+    def json_prompt(prompt: str) -> str:
+        """
+        Add the JSON formatting instruction to a prompt
+        
+        Args:
+            prompt: Input prompt (should request JSON output)
+            
+        Returns:
+            Prompt ending with the JSON-only instruction
+        """
+        return f"""{prompt}
+
+IMPORTANT: Return ONLY valid JSON. No markdown, no code blocks, no explanations. Just pure JSON."""
+    
+    @staticmethod
+    def parse_json_response(response_text: str) -> Any:
         """
-        Stream content from Gemini (for future use)
+        Parse a model response that should contain JSON
+        
+        Args:
+            response_text: Raw response text
+            
+        Returns:
+            Parsed JSON, or {"content": text} if it is not valid JSON
+        """
+        # Clean response - remove markdown code blocks if present
+        cleaned_text = response_text.strip()
+        
+        # Remove ```json and ``` if present
+        if cleaned_text.startswith('```json'):
+            cleaned_text = cleaned_text[7:]
+        elif cleaned_text.startswith('```'):
+            cleaned_text = cleaned_text[3:]
+        
+        if cleaned_text.endswith('```'):
+            cleaned_text = cleaned_text[:-3]
+        
+        cleaned_text = cleaned_text.strip()
+        
+        # Parse JSON
+        try:
+            return json.loads(cleaned_text)
+        except json.JSONDecodeError:
+            print(f"⚠️  Failed to parse JSON, returning as text wrapper")
+            return {"content": cleaned_text}
+    
+    async def stream_content(
+        self,
+        prompt: str,
+        max_tokens: int = 2000,
+        temperature: float = 0.7,
+        timeout: Optional[float] = None,
+        use_cache: bool = True
+    ) -> AsyncIterator[str]:
+        """
+        Stream content from Gemini
+        
+        Like generate_content, the call first reserves a key from the pool and
+        then takes a concurrency slot, which is held for the whole stream. The
+        timeout applies to the stream as a whole rather than to each chunk,
+        and the key's token usage is corrected once the stream ends. A cached
+        response is replayed as a single chunk, and a completed stream is
+        stored under the same key generate_content uses.
         
         Args:
             prompt: Input prompt
+            max_tokens: Maximum tokens to generate
+            temperature: Creativity level (0.0 to 1.0)
+            timeout: Timeout in seconds for the full stream (defaults to GEMINI_TIMEOUT_SECONDS)
+            use_cache: Serve and store the response via the response cache
             
         Yields:
             Text chunks as they're generated
         """
-        try:
-            response = self.model.generate_content(
+        cache_key = None
+        if use_cache:
+            cache_key = LLMCache.make_key(
                 prompt,
-                stream=True
+                self.model_name,
+                {'max_tokens': max_tokens, 'temperature': temperature}
             )
+            cached = await self.cache.get(cache_key)
+            if cached is not None:
+                yield cached
+                return
+        
+        timeout = timeout or self.timeout
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        estimated_tokens = estimate_tokens(prompt) + max_tokens
+        
+        try:
+            # Returns with the concurrency slot held
+            state, chunks = await self._open_stream(prompt, max_tokens, temperature, deadline, estimated_tokens)
+            
+            parts = []
+            try:
+                while True:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        raise asyncio.TimeoutError()
+                    try:
+                        chunk = await asyncio.wait_for(chunks.__anext__(), timeout=remaining)
+                    except StopAsyncIteration:
+                        break
+                    if chunk:
+                        parts.append(chunk)
+                        yield chunk
+            finally:
+                self._get_semaphore().release()
+                self.key_pool.report_usage(
+                    state,
+                    estimated_tokens,
+                    estimate_tokens(prompt) + estimate_tokens(''.join(parts))
+                )
             
-            for chunk in response:
-                if chunk.text:
-                    yield chunk.text
+            if cache_key and parts:
+                await self.cache.set(cache_key, ''.join(parts))
                     
+        except asyncio.TimeoutError:
+            print(f"❌ Gemini streaming error: timed out after {timeout:.0f}s")
+            raise TimeoutError(f"Gemini stream timed out after {timeout:.0f}s")
         except Exception as e:
             print(f"❌ Gemini streaming error: {str(e)}")
             raise
     
-    def count_tokens(self, text: str) -> int:
+    async def _open_stream(
+        self,
+        prompt: str,
+        max_tokens: int,
+        temperature: float,
+        deadline: float,
+        estimated_tokens: int
+    ) -> Tuple[APIKeyState, AsyncIterator[str]]:
+        """
+        Start a streaming call, moving to another key on 429
+        
+        Locks are taken in the same order as _generate_upstream: a key from
+        the pool, then the concurrency semaphore. On success the semaphore
+        is left held; the caller releases it when the stream ends.
+        
+        Args:
+            prompt: Input prompt
+            max_tokens: Maximum tokens to generate
+            temperature: Creativity level (0.0 to 1.0)
+            deadline: Loop time by which the stream must have finished
+            estimated_tokens: Tokens to reserve on the key
+            
+        Returns:
+            Tuple of (key state used, async iterator of text chunks)
+        """
+        loop = asyncio.get_running_loop()
+        semaphore = self._get_semaphore()
+        attempts = len(self.key_pool.keys) + 1
+        
+        for attempt in range(attempts):
+            state = await self.key_pool.acquire(estimated_tokens)
+            await semaphore.acquire()
+            try:
+                stream = await asyncio.wait_for(
+                    self.backend.open_stream(state.key, prompt, max_tokens, temperature),
+                    timeout=max(deadline - loop.time(), 0)
+                )
+            except BaseException as e:
+                semaphore.release()
+                if not isinstance(e, Exception) or not is_rate_limit_error(e):
+                    self.key_pool.refund(state, estimated_tokens)
+                    raise
+                self.key_pool.report_rate_limited(state, _retry_after(e))
+                if attempt == attempts - 1:
+                    raise
+                continue
+            return state, stream.__aiter__()
+    
+    async def count_tokens(self, text: str, timeout: Optional[float] = None) -> int:
         """
         Count tokens in text (approximate)
         
         Args:
             text: Input text
+            timeout: Per-call timeout in seconds (defaults to GEMINI_TIMEOUT_SECONDS)
             
         Returns:
             Approximate token count
         """
         try:
-            result = self.model.count_tokens(text)
-            return result.total_tokens
-        except:
+            # countTokens has its own quota, so it does not draw from the
+            # generation buckets of the key pool
+            api_key = self.key_pool.keys[0].key
+            return await self._call_with_limits(
+                lambda: self.backend.count_tokens(api_key, text),
+                timeout=timeout
+            )
+        except Exception:
             # Fallback: rough estimate (1 token ≈ 4 characters)
-            return len(text) // 4
+            return estimate_tokens(text)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get runtime counters for the Gemini client
+        
+        Returns:
+            Dictionary with cache, request coalescing and key pool statistics
+        """
+        return {
+            'backend': self.backend.name,
+            'cache': self.cache.get_stats(),
+            'coalescing': self.coalescer.get_stats(),
+            'key_pool': self.key_pool.get_stats()
+        }
 
 
 # Singleton instance
@@ -0,0 +1,500 @@
+"""
+Per-section BRD generation
+Fans template sections out to concurrent, smaller Gemini calls and merges the results
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import re
+from typing import Dict, Any, Iterable, List, NamedTuple, Optional, Set, Tuple
+from app.services.gemini_service import gemini_service
+from app.utils.helpers import chunk_text, estimate_tokens
+from app.utils.retrieval import BM25Index
+
+
+# Source types in prompt order, with the header each block starts with
+SOURCE_HEADERS = {
+    'emails': "=== EMAILS ===",
+    'meetings': "\n=== MEETING TRANSCRIPTS ===",
+    'slack': "\n=== SLACK MESSAGES ==="
+}
+
+# Estimated prompt tokens of source context for the whole document and for one section
+CONTEXT_TOKEN_BUDGET = int(os.getenv('CONTEXT_TOKEN_BUDGET', '3500'))
+SECTION_CONTEXT_TOKENS = int(os.getenv('SECTION_CONTEXT_TOKENS', '2000'))
+# Email bodies, transcripts and messages are indexed in chunks of about this many characters
+CONTEXT_CHUNK_CHARS = int(os.getenv('CONTEXT_CHUNK_CHARS', '600'))
+
+# Extra vocabulary used to rank source chunks for common section topics
+SECTION_HINTS = {
+    'timeline': ['deadline', 'launch', 'schedule', 'milestone', 'week', 'month', 'date', 'q1', 'q2', 'q3', 'q4'],
+    'budget': ['cost', 'budget', 'price', 'funding', 'approved'],
+    'stakeholders': ['team', 'owner', 'lead', 'manager', 'sponsor', 'approve'],
+    'scope': ['scope', 'feature', 'include', 'exclude', 'mvp', 'phase'],
+    'requirements': ['must', 'should', 'need', 'require', 'support', 'feature'],
+    'risks': ['risk', 'concern', 'issue', 'blocker', 'delay', 'aggressive'],
+    'metrics': ['metric', 'kpi', 'increase', 'reduce', 'target', 'measure', 'rate'],
+    'technical': ['api', 'platform', 'integration', 'ios', 'android', 'react', 'database', 'architecture'],
+    'compliance': ['gdpr', 'ccpa', 'compliance', 'security', 'privacy', 'legal'],
+}
+
+_STOPWORDS = {
+    'and', 'the', 'for', 'with', 'from', 'into', 'our', 'their', 'this', 'that',
+    'are', 'was', 'will', 'what', 'who', 'how', 'why', 'key', 'brd', 'overview', 'definition'
+}
+
+_WORD = re.compile(r'[a-z0-9]+')
+
+
+class BRDGenerationService:
+    """Generate BRD sections in parallel from a shared source context"""
+
+    def __init__(self):
+        """Initialize concurrency, retry and size limits from the environment"""
+        self.max_concurrency = int(os.getenv('SECTION_GENERATION_CONCURRENCY', '6'))
+        self.max_retries = int(os.getenv('SECTION_GENERATION_RETRIES', '2'))
+        self.section_max_tokens = int(os.getenv('SECTION_MAX_TOKENS', '1000'))
+
+    async def generate_sections(
+        self,
+        template_structure: Dict[str, Any],
+        data_sources: Dict[str, Any],
+        previous_content: Optional[Dict[str, Any]] = None,
+        previous_fingerprints: Optional[Dict[str, Dict[str, Any]]] = None
+    ) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, Dict[str, Any]], List[str]]:
+        """
+        Generate template sections concurrently, reusing unchanged ones
+
+        Each section is written from the source chunks that rank highest for
+        its vocabulary, within SECTION_CONTEXT_TOKENS. A section
+        whose fingerprint digest matches the previous run is copied verbatim
+        from previous_content instead of being regenerated, unless that
+        earlier attempt failed or came back empty.
+
+        Args:
+            template_structure: Template loaded by TemplateService
+            data_sources: Raw data sources from the request
+            previous_content: BRD content from an earlier run
+            previous_fingerprints: Fingerprints returned with that content
+
+        Returns:
+            Tuple of (BRD content keyed by section ID in template order,
+            fingerprints per section, IDs of the sections that were regenerated)
+        """
+        sections = template_structure.get('sections', [])
+        previous_content = previous_content or {}
+        previous_fingerprints = previous_fingerprints or {}
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        # One index serves every section's query
+        index = await asyncio.to_thread(SourceIndex, data_sources)
+
+        fingerprints = {}
+        tasks = {}
+        for section in sections:
+            source_context, fingerprints[section['id']] = index.section_context(section)
+
+            previous = previous_fingerprints.get(section['id']) or {}
+            if (
+                previous.get('digest') == fingerprints[section['id']]['digest']
+                and is_reusable_section(previous_content.get(section['id']))
+            ):
+                continue
+
+            tasks[section['id']] = self._generate_section(
+                section,
+                template_structure,
+                source_context,
+                semaphore
+            )
+
+        results = dict(zip(tasks, await asyncio.gather(*tasks.values())))
+
+        brd_content = {
+            section['id']: results.get(section['id'], previous_content.get(section['id']))
+            for section in sections
+        }
+        return brd_content, fingerprints, list(tasks)
+
+    async def _generate_section(
+        self,
+        section: Dict[str, Any],
+        template_structure: Dict[str, Any],
+        source_context: str,
+        semaphore: asyncio.Semaphore
+    ) -> Dict[str, Any]:
+        """
+        Generate one section, retrying with backoff on failure
+
+        Args:
+            section: Section definition from the template
+            template_structure: Full template (for the document outline)
+            source_context: Formatted data sources
+            semaphore: Shared concurrency limiter
+
+        Returns:
+            Section dictionary with title, content and completed flag
+        """
+        prompt = build_section_prompt(section, template_structure, source_context)
+
+        for attempt in range(self.max_retries + 1):
+            try:
+                async with semaphore:
+                    result = await gemini_service.generate_content_with_json(
+                        prompt,
+                        max_tokens=self.section_max_tokens
+                    )
+                return normalize_section(section, result)
+
+            except Exception as e:
+                if attempt == self.max_retries:
+                    print(f"❌ Section '{section['id']}' failed after {attempt + 1} attempts: {str(e)}")
+                    return {
+                        'title': section.get('title', section['id']),
+                        'content': '',
+                        'completed': False,
+                        'error': str(e)
+                    }
+                print(f"⚠️  Section '{section['id']}' attempt {attempt + 1} failed, retrying: {str(e)}")
+                await asyncio.sleep(2 ** attempt)
+
+
+def build_section_prompt(
+    section: Dict[str, Any],
+    template_structure: Dict[str, Any],
+    source_context: str
+) -> str:
+    """
+    Build the generation prompt for a single BRD section
+
+    Args:
+        section: Section definition from the template
+        template_structure: Full template (for the document outline)
+        source_context: Formatted data sources
+
+    Returns:
+        Prompt asking for one section as JSON
+    """
+    outline = ', '.join(s.get('title', s['id']) for s in template_structure.get('sections', []))
+    details = []
+    if section.get('description'):
+        details.append(f"Focus: {section['description']}")
+    if section.get('subsections'):
+        details.append(f"Cover these subsections: {', '.join(section['subsections'])}")
+    details_text = '\n'.join(details)
+
+    return f"""You are an expert Business Analyst writing ONE section of a Business Requirements Document (BRD).
+
+DATA SOURCES:
+{source_context}
+
+DOCUMENT OUTLINE (other sections are written separately; do not repeat their content):
+{outline}
+
+SECTION TO WRITE:
+ID: {section['id']}
+Title: {section.get('title', section['id'])}
+{details_text}
+
+INSTRUCTIONS:
+1. Use only information relevant to this section from the data sources
+2. Filter out noise (casual conversations, off-topic discussions)
+3. Write clear, professional content
+
+Return a JSON object:
+{{
+  "title": "{section.get('title', section['id'])}",
+  "content": "The actual content for this section (as a string)",
+  "completed": true
+}}"""
+
+
+def is_reusable_section(section: Any) -> bool:
+    """Whether a section from an earlier run was generated successfully"""
+    return isinstance(section, dict) and bool(section.get('completed')) and not section.get('error')
+
+
+def normalize_section(section: Dict[str, Any], result: Any) -> Dict[str, Any]:
+    """
+    Coerce a model response into the {title, content, completed} section shape
+
+    Args:
+        section: Section definition from the template
+        result: Parsed model output
+
+    Returns:
+        Section dictionary
+    """
+    # Unwrap {"<section_id>": {...}} responses
+    if isinstance(result, dict) and isinstance(result.get(section['id']), dict):
+        result = result[section['id']]
+
+    title = section.get('title', section['id'])
+    if isinstance(result, dict):
+        title = result.get('title') or title
+        content = result.get('content', '')
+    else:
+        content = result
+
+    if not isinstance(content, str):
+        content = _flatten_content(content)
+
+    return {
+        'title': title,
+        'content': content,
+        'completed': bool(content.strip())
+    }
+
+
+def _flatten_content(content: Any) -> str:
+    """Render list/dict content as plain text"""
+    if isinstance(content, list):
+        return '\n'.join(f"{i}. {_flatten_content(item)}" for i, item in enumerate(content, 1))
+    if isinstance(content, dict):
+        return '\n'.join(f"{key}: {_flatten_content(value)}" for key, value in content.items())
+    return '' if content is None else str(content)
+
+
+class SourceChunk(NamedTuple):
+    """One indexed piece of a source item"""
+    source_type: str
+    item_index: int
+    part: int
+    parts: int
+    text: str
+
+
+class SourceIndex:
+    """
+    BM25 index over every source item, for assembling prompt context
+
+    Email bodies and Slack messages are split with chunk_text, meetings use
+    the parser's transcript_chunks when present. Context for a query is the
+    best-ranked chunks that fit a token budget, rendered under per-type
+    headings (=== EMAILS ===, ...).
+    """
+
+    def __init__(self, data_sources: Dict[str, Any], chunk_chars: int = CONTEXT_CHUNK_CHARS):
+        """
+        Chunk and index data sources
+
+        Args:
+            data_sources: Data sources dictionary
+            chunk_chars: Target chunk size for text that is not already chunked
+        """
+        self.data_sources = data_sources
+        self.chunks: List[SourceChunk] = []
+        searchable = []
+        for source_type in SOURCE_HEADERS:
+            items = data_sources.get(source_type)
+            if not isinstance(items, list):
+                continue
+            for item_index, item in enumerate(items):
+                if not isinstance(item, dict):
+                    continue
+                title, parts = _item_chunks(source_type, item, chunk_chars)
+                for part, text in enumerate(parts):
+                    self.chunks.append(SourceChunk(source_type, item_index, part, len(parts), text))
+                    searchable.append(f"{title} {text}")
+
+        self.index = BM25Index(searchable)
+        self._rendered: Dict[int, str] = {}
+
+    def render(self, chunk_id: int) -> str:
+        """Prompt lines for one chunk (rendered on first use)"""
+        rendered = self._rendered.get(chunk_id)
+        if rendered is None:
+            rendered = self._rendered[chunk_id] = self._render(self.chunks[chunk_id])
+        return rendered
+
+    def _render(self, chunk: SourceChunk) -> str:
+        item = self.data_sources[chunk.source_type][chunk.item_index]
+        part = f" (part {chunk.part + 1}/{chunk.parts})" if chunk.parts > 1 else ''
+        if chunk.source_type == 'emails':
+            return '\n'.join([
+                f"From: {item.get('from', 'Unknown')}",
+                f"Subject: {item.get('subject', 'No subject')}",
+                f"Body{part}: {chunk.text}",
+                "---"
+            ])
+        if chunk.source_type == 'meetings':
+            return '\n'.join([
+                f"Meeting: {item.get('meeting_id', 'Unknown')}",
+                f"Transcript{part}: {chunk.text}",
+                "---"
+            ])
+        return f"[{item.get('user', 'Unknown')}]: {chunk.text}"
+
+    def assemble(
+        self,
+        query_terms: Optional[Iterable[str]] = None,
+        token_budget: Optional[int] = None
+    ) -> Tuple[str, List[str]]:
+        """
+        Build prompt context for a query
+
+        Chunks are taken in BM25 order, skipping any that no longer fit the
+        budget. If nothing matches the query (e.g. an executive summary), or
+        no query is given, chunks are taken in source order instead.
+
+        Args:
+            query_terms: Word stems to rank by (e.g. from section_terms)
+            token_budget: Estimated token limit (default CONTEXT_TOKEN_BUDGET)
+
+        Returns:
+            Tuple of (formatted context with chunks grouped by source type in
+            source order, fingerprints of the items it draws on)
+        """
+        remaining = CONTEXT_TOKEN_BUDGET if token_budget is None else token_budget
+        ranked = [chunk_id for chunk_id, _ in self.index.search(query_terms)] if query_terms else []
+        selected = []
+        for chunk_id in ranked or range(len(self.chunks)):
+            # The chunk text alone already exceeds what is left
+            if estimate_tokens(self.chunks[chunk_id].text) >= remaining:
+                continue
+            cost = estimate_tokens(self.render(chunk_id)) + 1
+            if cost <= remaining:
+                selected.append(chunk_id)
+                remaining -= cost
+        selected.sort()
+
+        formatted = []
+        fingerprints = []
+        seen_items = set()
+        position = 0
+        for source_type, header in SOURCE_HEADERS.items():
+            if source_type in self.data_sources:
+                formatted.append(header)
+            while position < len(selected) and self.chunks[selected[position]].source_type == source_type:
+                chunk = self.chunks[selected[position]]
+                formatted.append(self.render(selected[position]))
+                if (source_type, chunk.item_index) not in seen_items:
+                    seen_items.add((source_type, chunk.item_index))
+                    fingerprints.append(fingerprint_item(self.data_sources[source_type][chunk.item_index]))
+                position += 1
+
+        return "\n".join(formatted), fingerprints
+
+    def section_context(self, section: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
+        """
+        Per-section prompt context and its fingerprint entry
+
+        Args:
+            section: Section definition from the template
+
+        Returns:
+            Tuple of (formatted context within SECTION_CONTEXT_TOKENS,
+            {'digest': ..., 'sources': [...]} for section_fingerprints)
+        """
+        context, sources = self.assemble(section_terms(section), SECTION_CONTEXT_TOKENS)
+        return context, {'digest': section_digest(section, sources), 'sources': sources}
+
+    def section_fingerprints(self, sections: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """
+        Fingerprint entries for every section, keyed by section ID
+
+        Args:
+            sections: Section definitions from the template
+
+        Returns:
+            Section ID -> {'digest': ..., 'sources': [...]}
+        """
+        return {section['id']: self.section_context(section)[1] for section in sections}
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get index size counters"""
+        return {
+            'chunks': len(self.chunks),
+            **self.index.get_stats()
+        }
+
+
+def _item_chunks(source_type: str, item: Dict[str, Any], chunk_chars: int) -> Tuple[str, List[str]]:
+    """Searchable title and text chunks of a source item"""
+    if source_type == 'emails':
+        return str(item.get('subject', '')), chunk_text(str(item.get('body', '')), chunk_size=chunk_chars)
+    if source_type == 'meetings':
+        chunks = item.get('transcript_chunks')
+        if not isinstance(chunks, list) or not chunks:
+            chunks = chunk_text(str(item.get('transcript', '')), chunk_size=chunk_chars)
+        return str(item.get('summary', '')), [str(chunk) for chunk in chunks]
+    return '', chunk_text(str(item.get('text', '')), chunk_size=chunk_chars)
+
+
+def fingerprint_item(item: Any) -> str:
+    """
+    Fingerprint a single source item
+
+    Args:
+        item: Email, meeting or Slack message dictionary
+
+    Returns:
+        Short content hash of the item
+    """
+    payload = json.dumps(item, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+
+def section_digest(section: Dict[str, Any], fingerprints: List[str]) -> str:
+    """
+    Digest of everything a section's output depends on
+
+    Args:
+        section: Section definition from the template
+        fingerprints: Fingerprints of the source items fed to the section
+
+    Returns:
+        Hash of the section definition and its input fingerprints
+    """
+    payload = json.dumps({'section': section, 'sources': fingerprints}, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+
+def _tokens(text: str) -> Set[str]:
+    """Lowercase word stems (first 6 characters) of a text"""
+    return {word[:6] for word in _WORD.findall(text.lower()) if len(word) > 1 and word not in _STOPWORDS}
+
+
+def section_terms(section: Dict[str, Any]) -> Set[str]:
+    """
+    Vocabulary used to rank source chunks for a section
+
+    Args:
+        section: Section definition from the template
+
+    Returns:
+        Set of word stems from the section ID, title, description,
+        subsections and matching SECTION_HINTS entries
+    """
+    text = ' '.join([
+        section['id'].replace('_', ' '),
+        section.get('title', ''),
+        section.get('description', ''),
+        ' '.join(section.get('subsections', [])).replace('_', ' ')
+    ])
+    terms = _tokens(text)
+    for topic, hints in SECTION_HINTS.items():
+        if topic[:6] in terms:
+            terms |= _tokens(' '.join(hints))
+    return terms
+
+
+def template_terms(template_structure: Dict[str, Any]) -> Set[str]:
+    """
+    Vocabulary of a whole template, for single-call generation
+
+    Args:
+        template_structure: Template loaded by TemplateService
+
+    Returns:
+        Union of section_terms over the template's sections
+    """
+    terms = set()
+    for section in template_structure.get('sections', []):
+        terms |= section_terms(section)
+    return terms
+
+
+# Singleton instance
+generation_service = BRDGenerationService()
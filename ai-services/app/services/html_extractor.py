@@ -0,0 +1,235 @@
+"""
+Single-pass HTML extraction for scraped pages
+Pulls title, meta description, headings, links and visible text from one stream of parser events
+"""
+
+from html.parser import HTMLParser
+from typing import Dict, List, Optional
+from urllib.parse import urldefrag, urljoin
+
+# Elements whose content is not visible page text
+SKIP_TAGS = {'script', 'style', 'noscript'}
+HEADING_TAGS = {'h1', 'h2', 'h3'}
+
+# Elements whose text forms one content block (for page diffs)
+BLOCK_TAGS = {
+    'p', 'li', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'td', 'th', 'dt', 'dd',
+    'blockquote', 'pre', 'figcaption', 'caption', 'summary', 'option'
+}
+# Elements that end the current block without starting a new one
+BREAK_TAGS = {
+    'div', 'section', 'article', 'header', 'footer', 'nav', 'main', 'aside',
+    'ul', 'ol', 'dl', 'table', 'tr', 'form', 'br', 'hr', 'body', 'figure', 'details'
+}
+OUTLINE_TAGS = {'h1', 'h2', 'h3'}
+
+MAX_TEXT_CHARS = 5000
+MAX_HEADINGS = 10
+MAX_LINKS = 200
+
+
+class _PageExtractor(HTMLParser):
+    """HTMLParser that collects every extracted field while the document streams past"""
+
+    def __init__(self, url: str, include_blocks: bool = False):
+        super().__init__(convert_charrefs=True)
+        self.url = url
+        self.include_blocks = include_blocks
+        self.blocks: List[Dict[str, str]] = []
+        self.block_parts: List[str] = []
+        self.block_stack: List[str] = []
+        self.section = ''
+        self.text: List[str] = []
+        self.title_parts: Optional[List[str]] = None
+        self.title_has_tags = False
+        self.in_title = False
+        self.meta_description: Optional[str] = None
+        self.headings: List[List[str]] = []
+        # Indexes into self.headings for headings still open, innermost last
+        self.open_headings: List[tuple] = []
+        self.links: List[str] = []
+        self.seen_links = set()
+        self.seen_hrefs = set()
+        self.skip_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIP_TAGS:
+            self.skip_depth += 1
+            return
+        if self.skip_depth:
+            return
+
+        if self.include_blocks and (tag in BLOCK_TAGS or tag in BREAK_TAGS):
+            self._flush_block()
+            if tag in BLOCK_TAGS:
+                self.block_stack.append(tag)
+
+        if self.in_title:
+            self.title_has_tags = True
+        if tag == 'title' and self.title_parts is None:
+            self.title_parts = []
+            self.in_title = True
+        elif tag in HEADING_TAGS and len(self.headings) < MAX_HEADINGS:
+            self.open_headings.append((tag, len(self.headings)))
+            self.headings.append([])
+        elif tag == 'meta' and self.meta_description is None:
+            attributes = dict(attrs)
+            if attributes.get('name') == 'description':
+                self.meta_description = attributes.get('content') or ''
+        elif tag == 'a' and len(self.links) < MAX_LINKS:
+            attributes = dict(attrs)
+            href = attributes.get('href', False)
+            # Resolving is the expensive part, so repeated hrefs are skipped before it
+            if href is not False and href not in self.seen_hrefs:
+                self.seen_hrefs.add(href)
+                link = urldefrag(urljoin(self.url, (href or '').strip()))[0]
+                if link.startswith(('http://', 'https://')) and link not in self.seen_links:
+                    self.seen_links.add(link)
+                    self.links.append(link)
+
+    def handle_startendtag(self, tag, attrs):
+        # <tag/> opens and closes at once; skip tags never self-close in practice
+        if tag in SKIP_TAGS:
+            return
+        self.handle_starttag(tag, attrs)
+        if tag == 'title' or tag in HEADING_TAGS:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        if tag in SKIP_TAGS:
+            if self.skip_depth:
+                self.skip_depth -= 1
+            return
+        if self.skip_depth:
+            return
+
+        if self.include_blocks and (tag in BLOCK_TAGS or tag in BREAK_TAGS):
+            self._flush_block()
+            if tag in self.block_stack:
+                del self.block_stack[len(self.block_stack) - 1 - self.block_stack[::-1].index(tag):]
+
+        if tag == 'title' and self.in_title:
+            self.in_title = False
+        elif tag in HEADING_TAGS:
+            # Close the matching heading and anything opened inside it
+            for position in range(len(self.open_headings) - 1, -1, -1):
+                if self.open_headings[position][0] == tag:
+                    del self.open_headings[position:]
+                    break
+
+    def handle_data(self, data):
+        if self.skip_depth:
+            return
+        self.text.append(data)
+        if self.in_title:
+            self.title_parts.append(data)
+        elif self.include_blocks:
+            self.block_parts.append(data)
+        for _, index in self.open_headings:
+            self.headings[index].append(data)
+
+    def _flush_block(self):
+        """Close the text collected so far as one block, tagged with its innermost block element"""
+        if not self.block_parts:
+            return
+        text = clean_text(''.join(self.block_parts))
+        self.block_parts = []
+        if not text:
+            return
+        tag = self.block_stack[-1] if self.block_stack else 'text'
+        if tag in OUTLINE_TAGS:
+            self.section = text
+        self.blocks.append({'tag': tag, 'text': text, 'section': self.section})
+
+    def result(self) -> Dict:
+        """Extracted fields in the same shape as ScraperService's output"""
+        title = ''
+        if self.title_parts is not None:
+            # Mirrors BeautifulSoup's Tag.string: None unless the title is one plain string
+            title = self.title_parts[0] if len(self.title_parts) == 1 and not self.title_has_tags else None
+
+        result = {
+            'url': self.url,
+            'title': title,
+            'text': clean_text(''.join(self.text))[:MAX_TEXT_CHARS],
+            'meta_description': self.meta_description or '',
+            'headings': [''.join(parts) for parts in self.headings],
+            'links': self.links
+        }
+        if self.include_blocks:
+            self._flush_block()
+            result['blocks'] = self.blocks
+        return result
+
+
+def clean_text(text: str) -> str:
+    """Collapse page text into single-spaced phrases, dropping blank lines"""
+    lines = (line.strip() for line in text.splitlines())
+    chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
+    return ' '.join(chunk for chunk in chunks if chunk)
+
+
+def extract_page(html: str, url: str, include_blocks: bool = False) -> Dict:
+    """
+    Extract the scraper fields from an HTML document in one pass
+
+    CPU-bound; call it through asyncio.to_thread from async code.
+
+    Args:
+        html: Page HTML
+        url: Page URL (used to resolve links)
+        include_blocks: Also return the full page as a list of content blocks
+            ({'tag', 'text', 'section'}), untruncated, for change monitoring
+
+    Returns:
+        Dictionary with url, title, text, meta_description, headings and links
+        (plus blocks if requested)
+    """
+    parser = _PageExtractor(url, include_blocks)
+    parser.feed(html)
+    parser.close()
+    return parser.result()
+
+
+def extract_page_soup(html: str, url: str) -> Dict:
+    """
+    Reference BeautifulSoup implementation of extract_page
+
+    Walks the tree several times; kept for the extraction benchmark and as
+    a fallback (SCRAPER_EXTRACTOR=soup).
+
+    Args:
+        html: Page HTML
+        url: Page URL (used to resolve links)
+
+    Returns:
+        Dictionary with url, title, text, meta_description, headings and links
+    """
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, 'html.parser')
+
+    # Remove script and style elements
+    for script in soup(["script", "style", "noscript"]):
+        script.extract()
+
+    meta = soup.find('meta', attrs={'name': 'description'})
+
+    links = []
+    seen = set()
+    for anchor in soup.find_all('a', href=True):
+        link = urldefrag(urljoin(url, anchor['href'].strip()))[0]
+        if link.startswith(('http://', 'https://')) and link not in seen:
+            seen.add(link)
+            links.append(link)
+            if len(links) >= MAX_LINKS:
+                break
+
+    return {
+        'url': url,
+        'title': soup.title.string if soup.title else '',
+        'text': clean_text(soup.get_text())[:MAX_TEXT_CHARS],
+        'meta_description': meta.get('content', '') if meta else '',
+        'headings': [h.get_text() for h in soup.find_all(['h1', 'h2', 'h3'])[:MAX_HEADINGS]],
+        'links': links
+    }
@@ -0,0 +1,304 @@
+"""
+Rate-limit-aware scheduling over a pool of Gemini API keys
+Each key gets token buckets for requests and tokens per minute
+"""
+
+import asyncio
+import os
+import re
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+
+class RateLimitError(Exception):
+    """Raised when an upstream call is rejected with HTTP 429"""
+
+    def __init__(self, message: str = "Rate limit exceeded", retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def is_rate_limit_error(error: BaseException) -> bool:
+    """
+    Check whether an exception represents an HTTP 429 / quota rejection
+
+    Args:
+        error: Exception raised by an upstream call
+
+    Returns:
+        True if the error is a rate-limit rejection
+    """
+    if isinstance(error, RateLimitError):
+        return True
+    # HTTP status on the exception (google.api_core.exceptions.ResourceExhausted
+    # has code 429); the message is not inspected, so an unrelated error that
+    # merely mentions "429" is not mistaken for a quota rejection
+    return any(getattr(error, attr, None) == 429 for attr in ('code', 'status', 'status_code'))
+
+
+def _retry_after(error: BaseException) -> Optional[float]:
+    """Extract a server-suggested retry delay in seconds, if any"""
+    retry_after = getattr(error, 'retry_after', None)
+    if retry_after is not None:
+        return float(retry_after)
+    match = re.search(r'retry(?:_delay| in| after)[^\d]{0,20}(\d+(?:\.\d+)?)\s*s', str(error), re.IGNORECASE)
+    return float(match.group(1)) if match else None
+
+
+class TokenBucket:
+    """Continuously refilling token bucket"""
+
+    def __init__(self, capacity: float, refill_per_second: float, now: float):
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self.tokens = capacity
+        self.updated_at = now
+
+    def refill(self, now: float):
+        """Add the tokens accrued since the last update"""
+        elapsed = max(now - self.updated_at, 0.0)
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.refill_per_second)
+        self.updated_at = now
+
+    def time_until(self, amount: float) -> float:
+        """Seconds until `amount` tokens are available (call refill first)"""
+        missing = min(amount, self.capacity) - self.tokens
+        if missing <= 0:
+            return 0.0
+        return missing / self.refill_per_second
+
+    def headroom(self) -> float:
+        """Fraction of the bucket currently available"""
+        return self.tokens / self.capacity
+
+
+class APIKeyState:
+    """Buckets, cooldown and counters for one API key"""
+
+    def __init__(self, key: str, index: int, rpm: int, tpm: int, now: float):
+        self.key = key
+        self.label = f"key_{index + 1}"
+        self.requests = TokenBucket(rpm, rpm / 60.0, now)
+        self.tokens = TokenBucket(tpm, tpm / 60.0, now)
+        self.cooldown_until = 0.0
+        self.stats = {'calls': 0, 'rate_limited': 0}
+
+    def refill(self, now: float):
+        """Refill both buckets"""
+        self.requests.refill(now)
+        self.tokens.refill(now)
+
+    def wait_time(self, estimated_tokens: int, now: float) -> float:
+        """Seconds until this key can take a request of the given size"""
+        return max(
+            self.cooldown_until - now,
+            self.requests.time_until(1),
+            self.tokens.time_until(estimated_tokens),
+            0.0
+        )
+
+    def headroom(self) -> float:
+        """Smallest remaining fraction across both buckets"""
+        return min(self.requests.headroom(), self.tokens.headroom())
+
+
+class APIKeyPool:
+    """Route calls to the API key with the most headroom, queueing when all are saturated"""
+
+    def __init__(
+        self,
+        keys: List[str],
+        rpm: Optional[int] = None,
+        tpm: Optional[int] = None,
+        cooldown_seconds: Optional[float] = None,
+        queue_timeout: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Initialize the pool from arguments or environment variables
+
+        Args:
+            keys: API keys to schedule over
+            rpm: Requests per minute allowed per key (GEMINI_KEY_RPM)
+            tpm: Tokens per minute allowed per key (GEMINI_KEY_TPM)
+            cooldown_seconds: Default cooldown after a 429 (GEMINI_KEY_COOLDOWN_SECONDS)
+            queue_timeout: Max seconds to wait for a free key (GEMINI_KEY_QUEUE_TIMEOUT_SECONDS)
+            clock: Monotonic clock, injectable for tests
+        """
+        if not keys:
+            raise ValueError("APIKeyPool needs at least one API key")
+
+        self.clock = clock
+        rpm = rpm or int(os.getenv('GEMINI_KEY_RPM', '15'))
+        tpm = tpm or int(os.getenv('GEMINI_KEY_TPM', '1000000'))
+        self.cooldown_seconds = cooldown_seconds or float(os.getenv('GEMINI_KEY_COOLDOWN_SECONDS', '60'))
+        self.queue_timeout = queue_timeout or float(os.getenv('GEMINI_KEY_QUEUE_TIMEOUT_SECONDS', '300'))
+
+        now = self.clock()
+        self.keys = [APIKeyState(key, index, rpm, tpm, now) for index, key in enumerate(keys)]
+        self._queue_lock: Optional[asyncio.Lock] = None
+        self.stats = {'queued': 0, 'rate_limited': 0, 'retries': 0}
+
+    @staticmethod
+    def keys_from_env() -> List[str]:
+        """
+        Read API keys the same way as the Node backend
+
+        Returns:
+            Keys from GEMINI_API_KEYS (comma-separated), else GEMINI_API_KEY
+        """
+        raw = os.getenv('GEMINI_API_KEYS') or os.getenv('GEMINI_API_KEY') or ''
+        return [key.strip() for key in raw.split(',') if key.strip()]
+
+    def _get_queue_lock(self) -> asyncio.Lock:
+        """Create the FIFO queue lock lazily so it binds to the running loop"""
+        if self._queue_lock is None:
+            self._queue_lock = asyncio.Lock()
+        return self._queue_lock
+
+    def _pick(self, estimated_tokens: int, now: float) -> Optional[APIKeyState]:
+        """Return the ready key with the most headroom, if any"""
+        best = None
+        for state in self.keys:
+            state.refill(now)
+            if state.wait_time(estimated_tokens, now) > 0:
+                continue
+            if best is None or state.headroom() > best.headroom():
+                best = state
+        return best
+
+    async def acquire(self, estimated_tokens: int = 0) -> APIKeyState:
+        """
+        Reserve capacity on the key with the most headroom
+
+        Callers queue in FIFO order while every key is saturated or cooling down.
+
+        Args:
+            estimated_tokens: Expected prompt + output tokens for the call
+
+        Returns:
+            The key state the call should use
+        """
+        deadline = self.clock() + self.queue_timeout
+        async with self._get_queue_lock():
+            queued = False
+            while True:
+                now = self.clock()
+                state = self._pick(estimated_tokens, now)
+                if state is not None:
+                    state.requests.tokens -= 1
+                    state.tokens.tokens -= min(estimated_tokens, state.tokens.capacity)
+                    state.stats['calls'] += 1
+                    return state
+
+                if not queued:
+                    queued = True
+                    self.stats['queued'] += 1
+
+                wait = min(state.wait_time(estimated_tokens, now) for state in self.keys)
+                if now + wait > deadline:
+                    raise RateLimitError(
+                        f"All {len(self.keys)} API key(s) saturated for {self.queue_timeout:.0f}s",
+                        retry_after=wait
+                    )
+                await asyncio.sleep(max(wait, 0.01))
+
+    def report_usage(self, state: APIKeyState, estimated_tokens: int, actual_tokens: int):
+        """
+        Correct a key's token bucket once the real usage is known
+
+        Args:
+            state: Key used for the call
+            estimated_tokens: Tokens reserved in acquire
+            actual_tokens: Tokens actually consumed
+        """
+        reserved = min(estimated_tokens, state.tokens.capacity)
+        state.tokens.tokens = min(
+            state.tokens.capacity,
+            state.tokens.tokens + reserved - actual_tokens
+        )
+
+    def refund(self, state: APIKeyState, estimated_tokens: int):
+        """
+        Return a failed call's token reservation to its key
+
+        The request itself stays counted, since it may have reached the server.
+
+        Args:
+            state: Key used for the call
+            estimated_tokens: Tokens reserved in acquire
+        """
+        self.report_usage(state, estimated_tokens, 0)
+
+    def report_rate_limited(self, state: APIKeyState, retry_after: Optional[float] = None):
+        """
+        Put a key into cooldown after a 429
+
+        Args:
+            state: Key that was rejected
+            retry_after: Server-suggested delay in seconds
+        """
+        state.cooldown_until = self.clock() + (retry_after or self.cooldown_seconds)
+        state.stats['rate_limited'] += 1
+        self.stats['rate_limited'] += 1
+        print(f"⚠️  Gemini {state.label} rate limited, cooling down")
+
+    async def execute(
+        self,
+        call: Callable[[str], Awaitable[Any]],
+        estimated_tokens: int = 0,
+        measure: Optional[Callable[[Any], int]] = None,
+        max_attempts: Optional[int] = None
+    ) -> Any:
+        """
+        Run a call on the best key, moving to another key on 429
+
+        Every 429 puts its key into cooldown, including on the last attempt;
+        any other failure refunds the call's token reservation.
+
+        Args:
+            call: Callable taking an API key and returning the awaitable to run
+            estimated_tokens: Expected prompt + output tokens for the call
+            measure: Optional callable returning the tokens actually used by a result
+            max_attempts: Attempts before giving up (defaults to number of keys + 1)
+
+        Returns:
+            Result of the call
+        """
+        max_attempts = max_attempts or len(self.keys) + 1
+        for attempt in range(max_attempts):
+            state = await self.acquire(estimated_tokens)
+            try:
+                result = await call(state.key)
+            except BaseException as e:
+                if not isinstance(e, Exception) or not is_rate_limit_error(e):
+                    self.refund(state, estimated_tokens)
+                    raise
+                self.report_rate_limited(state, _retry_after(e))
+                if attempt == max_attempts - 1:
+                    raise
+                self.stats['retries'] += 1
+                continue
+
+            if measure is not None:
+                self.report_usage(state, estimated_tokens, measure(result))
+            return result
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get scheduler counters and per-key state
+
+        Returns:
+            Dictionary with pool counters and per-key headroom
+        """
+        now = self.clock()
+        keys = []
+        for state in self.keys:
+            state.refill(now)
+            keys.append({
+                'key': state.label,
+                'headroom': round(state.headroom(), 3),
+                'cooling_down': state.cooldown_until > now,
+                **state.stats
+            })
+        return {**self.stats, 'keys': keys}
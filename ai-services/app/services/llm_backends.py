@@ -0,0 +1,406 @@
+"""
+LLM backends used by GeminiService
+Selected with the LLM_BACKEND environment variable ("gemini" or "stub")
+"""
+
+import asyncio
+import hashlib
+import json
+import math
+import os
+import random
+import re
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import AsyncIterator, Deque, Dict, List
+
+from app.services.key_pool import APIKeyPool, RateLimitError
+
+
+class LLMBackend(ABC):
+    """Interface every LLM backend implements"""
+
+    name = 'base'
+    model_name = ''
+
+    @abstractmethod
+    def api_keys(self) -> List[str]:
+        """
+        Keys the key pool should schedule over
+
+        Returns:
+            List of API keys (at least one)
+        """
+
+    @abstractmethod
+    async def generate(self, api_key: str, prompt: str, max_tokens: int, temperature: float) -> str:
+        """
+        Generate a complete response
+
+        Args:
+            api_key: Key chosen by the key pool
+            prompt: Input prompt
+            max_tokens: Maximum tokens to generate
+            temperature: Creativity level (0.0 to 1.0)
+
+        Returns:
+            Generated text ("" if the model returned nothing)
+        """
+
+    @abstractmethod
+    async def open_stream(
+        self,
+        api_key: str,
+        prompt: str,
+        max_tokens: int,
+        temperature: float
+    ) -> AsyncIterator[str]:
+        """
+        Start a streaming response
+
+        Errors that happen before the first chunk (e.g. 429) are raised here,
+        so the caller can retry on another key.
+
+        Args:
+            api_key: Key chosen by the key pool
+            prompt: Input prompt
+            max_tokens: Maximum tokens to generate
+            temperature: Creativity level (0.0 to 1.0)
+
+        Returns:
+            Async iterator of text chunks
+        """
+
+    async def count_tokens(self, api_key: str, text: str) -> int:
+        """
+        Count tokens in text
+
+        Args:
+            api_key: Key to use
+            text: Input text
+
+        Returns:
+            Token count
+        """
+        return len(text) // 4
+
+
+class GeminiBackend(LLMBackend):
+    """Google Gemini via the generativelanguage async client, one client per API key"""
+
+    name = 'gemini'
+
+    def __init__(self):
+        """Read GEMINI_API_KEYS / GEMINI_API_KEY"""
+        from google.ai import generativelanguage as glm
+
+        self._glm = glm
+
+        # Support either single key or comma-separated multiple keys
+        self._api_keys = APIKeyPool.keys_from_env()
+
+        if not self._api_keys:
+            raise ValueError("GEMINI_API_KEY environment variable not set")
+
+        # Use Gemini 1.5 Flash (free tier, fast, good quality)
+        self.model_name = 'gemini-1.5-flash'
+
+        # Alternative: Use Gemini 1.5 Pro for better quality (also free)
+        # self.model_name = 'gemini-1.5-pro'
+
+        # Each key gets its own client, created on first use
+        self._clients = {}
+
+    def api_keys(self) -> List[str]:
+        return self._api_keys
+
+    def _get_client(self, api_key: str):
+        """Get the async client bound to a specific API key"""
+        client = self._clients.get(api_key)
+        if client is None:
+            # The API key is a client option, so keys never share process-wide SDK state
+            client = self._glm.GenerativeServiceAsyncClient(client_options={'api_key': api_key})
+            self._clients[api_key] = client
+        return client
+
+    def _request(self, prompt: str, max_tokens: int, temperature: float):
+        """Build a generateContent request"""
+        return self._glm.GenerateContentRequest(
+            model=f"models/{self.model_name}",
+            contents=[self._glm.Content(role='user', parts=[self._glm.Part(text=prompt)])],
+            generation_config=self._glm.GenerationConfig(
+                max_output_tokens=max_tokens,
+                temperature=temperature,
+            )
+        )
+
+    @staticmethod
+    def _text(response) -> str:
+        """Text of the first candidate ('' if the response was blocked or empty)"""
+        if not response.candidates:
+            return ''
+        return ''.join(part.text for part in response.candidates[0].content.parts)
+
+    async def generate(self, api_key: str, prompt: str, max_tokens: int, temperature: float) -> str:
+        response = await self._get_client(api_key).generate_content(
+            request=self._request(prompt, max_tokens, temperature)
+        )
+        return self._text(response)
+
+    async def open_stream(
+        self,
+        api_key: str,
+        prompt: str,
+        max_tokens: int,
+        temperature: float
+    ) -> AsyncIterator[str]:
+        responses = await self._get_client(api_key).stream_generate_content(
+            request=self._request(prompt, max_tokens, temperature)
+        )
+
+        async def chunks():
+            async for response in responses:
+                text = self._text(response)
+                if text:
+                    yield text
+
+        return chunks()
+
+    async def count_tokens(self, api_key: str, text: str) -> int:
+        result = await self._get_client(api_key).count_tokens(
+            request=self._glm.CountTokensRequest(
+                model=f"models/{self.model_name}",
+                contents=[self._glm.Content(role='user', parts=[self._glm.Part(text=text)])]
+            )
+        )
+        return result.total_tokens
+
+
+class StubBackendError(Exception):
+    """Simulated upstream failure raised by StubBackend"""
+
+    status_code = 500
+
+
+class StubBackend(LLMBackend):
+    """
+    Deterministic offline backend for load tests and benchmarks
+
+    Responses depend only on the prompt: BRD prompts get template-shaped JSON,
+    conflict pre-screen prompts get every candidate confirmed, other conflict
+    prompts get an empty array and everything else gets filler text.
+    Latency, jitter, error rate and per-key 429s are configurable and drawn
+    from a seeded RNG so runs are reproducible.
+    """
+
+    name = 'stub'
+
+    def __init__(self):
+        """Read the simulation parameters from STUB_* environment variables"""
+        self.model_name = 'stub-model'
+        self.latency_ms = float(os.getenv('STUB_LATENCY_MS', '800'))
+        self.jitter_ms = float(os.getenv('STUB_LATENCY_JITTER_MS', '200'))
+        # fixed | uniform | normal | lognormal
+        self.distribution = os.getenv('STUB_LATENCY_DISTRIBUTION', 'lognormal')
+        self.error_rate = float(os.getenv('STUB_ERROR_RATE', '0'))
+        self.rate_limit_rate = float(os.getenv('STUB_RATE_LIMIT_RATE', '0'))
+        # Simulated server-side quota per key (0 = unlimited)
+        self.key_rpm = int(os.getenv('STUB_KEY_RPM', '0'))
+        self.stream_chunks = int(os.getenv('STUB_STREAM_CHUNKS', '20'))
+        self._rng = random.Random(int(os.getenv('STUB_SEED', '0')))
+        self._keys = [f"stub-key-{i + 1}" for i in range(int(os.getenv('STUB_API_KEYS', '1')))]
+        self._key_calls: Dict[str, Deque[float]] = {key: deque() for key in self._keys}
+        self.stats = {'calls': 0, 'errors': 0, 'rate_limited': 0}
+
+    def api_keys(self) -> List[str]:
+        return self._keys
+
+    def _sample_latency(self) -> float:
+        """Draw one latency in seconds from the configured distribution"""
+        mean, jitter = self.latency_ms, self.jitter_ms
+        if self.distribution == 'fixed' or jitter <= 0:
+            latency = mean
+        elif self.distribution == 'uniform':
+            latency = self._rng.uniform(mean - jitter, mean + jitter)
+        elif self.distribution == 'normal':
+            latency = self._rng.gauss(mean, jitter)
+        else:
+            # Lognormal with the requested mean and standard deviation
+            sigma = math.sqrt(math.log(1 + (jitter / mean) ** 2)) if mean > 0 else 0
+            mu = math.log(mean) - sigma ** 2 / 2 if mean > 0 else 0
+            latency = self._rng.lognormvariate(mu, sigma) if mean > 0 else 0
+        return max(latency, 0.0) / 1000.0
+
+    def _admit(self, api_key: str):
+        """Apply the simulated quota and error model to one call"""
+        self.stats['calls'] += 1
+
+        if self.key_rpm:
+            now = time.monotonic()
+            window = self._key_calls.setdefault(api_key, deque())
+            while window and now - window[0] > 60:
+                window.popleft()
+            if len(window) >= self.key_rpm:
+                self.stats['rate_limited'] += 1
+                raise RateLimitError(f"429 RESOURCE_EXHAUSTED: stub quota for {api_key}", retry_after=60 - (now - window[0]))
+            window.append(now)
+
+        roll = self._rng.random()
+        if roll < self.rate_limit_rate:
+            self.stats['rate_limited'] += 1
+            raise RateLimitError(f"429 RESOURCE_EXHAUSTED: simulated for {api_key}")
+        if roll < self.rate_limit_rate + self.error_rate:
+            self.stats['errors'] += 1
+            raise StubBackendError("500 simulated upstream error")
+
+    async def generate(self, api_key: str, prompt: str, max_tokens: int, temperature: float) -> str:
+        latency = self._sample_latency()
+        self._admit(api_key)
+        await asyncio.sleep(latency)
+        return fake_response(prompt, max_tokens)
+
+    async def open_stream(
+        self,
+        api_key: str,
+        prompt: str,
+        max_tokens: int,
+        temperature: float
+    ) -> AsyncIterator[str]:
+        latency = self._sample_latency()
+        self._admit(api_key)
+        text = fake_response(prompt, max_tokens)
+
+        # Roughly a fifth of the latency goes to the first token
+        await asyncio.sleep(latency * 0.2)
+        size = max(len(text) // self.stream_chunks, 1)
+        pause = latency * 0.8 / max(math.ceil(len(text) / size), 1)
+
+        async def chunks():
+            for start in range(0, len(text), size):
+                yield text[start:start + size]
+                await asyncio.sleep(pause)
+
+        return chunks()
+
+
+_LOREM = [
+    "The platform must support secure checkout and saved payment methods.",
+    "Stakeholders agreed the MVP should launch within the approved budget.",
+    "Users need offline browsing of the product catalog.",
+    "Push notifications will alert customers about order updates.",
+    "The team will review performance targets before each milestone.",
+]
+
+
+def _filler(seed: int, sentences: int) -> str:
+    """Deterministic filler text"""
+    return ' '.join(_LOREM[(seed + i) % len(_LOREM)] for i in range(sentences))
+
+
+def fake_response(prompt: str, max_tokens: int = 2000) -> str:
+    """
+    Produce a deterministic response shaped like what the routes expect
+
+    Args:
+        prompt: Input prompt
+        max_tokens: Output budget; filler is trimmed to roughly fit it
+
+    Returns:
+        Response text (JSON for JSON prompts)
+    """
+    seed = int(hashlib.sha256(prompt.encode('utf-8')).hexdigest()[:8], 16)
+    sentences = max(1, min(6, max_tokens // 60))
+
+    # Single section (per-section generation)
+    section = re.search(r'SECTION TO WRITE:\s*ID: (\S+)\s*Title: ([^\n]*)', prompt)
+    if section:
+        return json.dumps({
+            'title': section.group(2).strip(),
+            'content': _filler(seed, sentences),
+            'completed': True
+        })
+
+    # Whole document: one entry per section of the embedded template
+    if 'REQUIRED BRD STRUCTURE' in prompt:
+        structure = prompt.split('REQUIRED BRD STRUCTURE', 1)[1]
+        sections = re.findall(r'"id":\s*"([^"]+)",\s*"title":\s*"([^"]+)"', structure)
+        per_section = max(1, sentences // 2)
+        return json.dumps({
+            section_id: {'title': title, 'content': _filler(seed + i, per_section), 'completed': True}
+            for i, (section_id, title) in enumerate(sections)
+        }, indent=2)
+
+    # Conflict pre-screen: confirm every candidate pair
+    if 'CANDIDATE CONFLICTS:' in prompt:
+        block = prompt.split('CANDIDATE CONFLICTS:', 1)[1].split('For each REAL conflict', 1)[0]
+        return json.dumps([
+            {
+                'candidate': candidate_id,
+                'type': 'value_conflict',
+                'description': f"Statements disagree on {mismatch.strip()}",
+                'severity': 'medium',
+                'resolution_options': [
+                    {'option': 'Align both sections on one value', 'impact': 'Consistent document'},
+                    {'option': 'Clarify that the statements cover different scopes', 'impact': 'No change to plans'}
+                ]
+            }
+            for candidate_id, mismatch in re.findall(r'^\[(C\d+)\] (.*)$', block, re.MULTILINE)
+        ])
+
+    # Conflict checks ask for a JSON array
+    if 'JSON array' in prompt or 'return: []' in prompt:
+        return '[]'
+
+    # Competitor analysis
+    if '"insights"' in prompt:
+        return json.dumps({
+            'insights': {
+                'main_offerings': _filler(seed, 1),
+                'key_features': ['Mobile checkout', 'Saved payments'],
+                'competitive_advantages': ['Fast onboarding'],
+                'gaps_identified': ['No offline mode']
+            },
+            'suggestions': [{
+                'text': 'Add offline browsing to match competitor capability',
+                'type': 'feature',
+                'section': 'functional_requirements',
+                'priority': 'high'
+            }]
+        })
+
+    # Competitor change monitoring
+    if '"brd_implications"' in prompt:
+        return json.dumps({
+            'summary': _filler(seed, 1),
+            'brd_implications': [_filler(seed + 1, 1)],
+            'suggestions': [{
+                'text': 'Review the competitor change against our scope',
+                'type': 'feature',
+                'section': 'functional_requirements',
+                'priority': 'medium'
+            }]
+        })
+
+    if 'IMPORTANT: Return ONLY valid JSON' in prompt:
+        return '{}'
+
+    return _filler(seed, sentences)
+
+
+def create_backend(name: str = None) -> LLMBackend:
+    """
+    Build the backend selected by configuration
+
+    Args:
+        name: Backend name; defaults to LLM_BACKEND (or "gemini")
+
+    Returns:
+        LLMBackend instance
+    """
+    name = (name or os.getenv('LLM_BACKEND', 'gemini')).lower()
+    if name == 'stub':
+        return StubBackend()
+    if name == 'gemini':
+        return GeminiBackend()
+    raise ValueError(f"Unknown LLM_BACKEND '{name}' (expected 'gemini' or 'stub')")
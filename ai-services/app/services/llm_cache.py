@@ -0,0 +1,265 @@
+"""
+Content-addressed cache for LLM responses
+Bounded in-memory LRU with an optional SQLite tier on disk
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, Dict, Any, Tuple
+
+
+# Disk-tier reads batch their accessed_at updates and flush after this many
+ACCESS_FLUSH_BATCH = 64
+
+
+class LLMCache:
+    """
+    Two-tier (memory LRU + SQLite) cache keyed on prompt, model and config
+
+    The memory tier is only touched from the event loop and takes no lock.
+    SQLite work runs in worker threads under its own lock, so a memory hit
+    never waits behind a disk commit.
+    """
+
+    def __init__(
+        self,
+        max_entries: Optional[int] = None,
+        disk_path: Optional[str] = None,
+        ttl_seconds: Optional[float] = None,
+        max_disk_mb: Optional[float] = None
+    ):
+        """
+        Initialize the cache from arguments or environment variables
+
+        Args:
+            max_entries: Max entries kept in memory (LLM_CACHE_MAX_ENTRIES)
+            disk_path: SQLite file for the disk tier, empty disables it (LLM_CACHE_PATH)
+            ttl_seconds: Time-to-live for cached responses (LLM_CACHE_TTL_SECONDS)
+            max_disk_mb: Size budget for the disk tier in MB (LLM_CACHE_MAX_DISK_MB)
+        """
+        self.enabled = os.getenv('LLM_CACHE_ENABLED', 'true').lower() not in ('0', 'false', 'no')
+        max_entries = max_entries if max_entries is not None else int(os.getenv('LLM_CACHE_MAX_ENTRIES', '512'))
+        ttl_seconds = ttl_seconds if ttl_seconds is not None else float(os.getenv('LLM_CACHE_TTL_SECONDS', '86400'))
+        max_disk_mb = max_disk_mb if max_disk_mb is not None else float(os.getenv('LLM_CACHE_MAX_DISK_MB', '100'))
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_disk_bytes = int(max_disk_mb * 1024 * 1024)
+        disk_path = disk_path if disk_path is not None else os.getenv('LLM_CACHE_PATH', '')
+
+        self._memory: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._disk_lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self._writes_since_evict = 0
+        # key -> last read time, written to accessed_at in batches
+        self._pending_access: Dict[str, float] = {}
+
+        self.stats = {
+            'memory_hits': 0,
+            'disk_hits': 0,
+            'misses': 0,
+            'writes': 0,
+            'evictions': 0
+        }
+
+        if self.enabled and disk_path:
+            self._open_disk(disk_path)
+
+    @staticmethod
+    def make_key(prompt: str, model_name: str, config: Dict[str, Any]) -> str:
+        """
+        Build a content-addressed cache key
+
+        Args:
+            prompt: Full prompt sent to the model
+            model_name: Model identifier
+            config: Generation parameters (max tokens, temperature, ...)
+
+        Returns:
+            SHA-256 hex digest identifying the request
+        """
+        payload = json.dumps(
+            {'prompt': prompt, 'model': model_name, 'config': config},
+            sort_keys=True,
+            ensure_ascii=False
+        )
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _open_disk(self, disk_path: str):
+        """Open (and create if needed) the SQLite disk tier"""
+        try:
+            Path(disk_path).parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(disk_path, check_same_thread=False)
+            self._db.execute('PRAGMA journal_mode=WAL')
+            self._db.execute(
+                'CREATE TABLE IF NOT EXISTS llm_cache ('
+                'key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, '
+                'created_at REAL NOT NULL, accessed_at REAL NOT NULL)'
+            )
+            self._db.execute('CREATE INDEX IF NOT EXISTS idx_llm_cache_accessed ON llm_cache (accessed_at)')
+            self._db.commit()
+            print(f"✅ LLM disk cache at {disk_path}")
+        except Exception as e:
+            print(f"⚠️  LLM disk cache disabled: {str(e)}")
+            self._db = None
+
+    async def get(self, key: str) -> Optional[str]:
+        """
+        Look up a cached response
+
+        Args:
+            key: Cache key from make_key
+
+        Returns:
+            Cached response text, or None on a miss
+        """
+        if not self.enabled:
+            return None
+
+        now = time.time()
+        entry = self._memory.get(key)
+        if entry is not None:
+            value, created_at = entry
+            if now - created_at <= self.ttl_seconds:
+                self._memory.move_to_end(key)
+                self.stats['memory_hits'] += 1
+                return value
+            del self._memory[key]
+
+        if self._db is not None:
+            row = await asyncio.to_thread(self._disk_get, key, now)
+            if row is not None:
+                value, created_at = row
+                self._remember(key, value, created_at)
+                self.stats['disk_hits'] += 1
+                return value
+
+        self.stats['misses'] += 1
+        return None
+
+    async def set(self, key: str, value: str):
+        """
+        Store a response in both tiers
+
+        Args:
+            key: Cache key from make_key
+            value: Response text
+        """
+        if not self.enabled:
+            return
+
+        now = time.time()
+        self._remember(key, value, now)
+        self.stats['writes'] += 1
+
+        if self._db is not None:
+            await asyncio.to_thread(self._disk_set, key, value, now)
+
+    def _remember(self, key: str, value: str, created_at: float):
+        """Insert into the memory LRU, evicting the least recently used entries (event loop only)"""
+        self._memory[key] = (value, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self.stats['evictions'] += 1
+
+    def _disk_get(self, key: str, now: float) -> Optional[Tuple[str, float]]:
+        """
+        Read one entry from SQLite
+
+        Expired rows are treated as misses and left for _evict_disk. The
+        access time is queued rather than committed on every read.
+        """
+        with self._disk_lock:
+            try:
+                row = self._db.execute(
+                    'SELECT value, created_at FROM llm_cache WHERE key = ?', (key,)
+                ).fetchone()
+                if row is None or now - row[1] > self.ttl_seconds:
+                    return None
+                self._pending_access[key] = now
+                if len(self._pending_access) >= ACCESS_FLUSH_BATCH:
+                    self._flush_access()
+                    self._db.commit()
+                return row[0], row[1]
+            except sqlite3.Error as e:
+                print(f"⚠️  LLM disk cache read error: {str(e)}")
+                return None
+
+    def _flush_access(self):
+        """Write queued access times (caller holds the disk lock and commits)"""
+        if self._pending_access:
+            self._db.executemany(
+                'UPDATE llm_cache SET accessed_at = ? WHERE key = ?',
+                [(accessed_at, key) for key, accessed_at in self._pending_access.items()]
+            )
+            self._pending_access.clear()
+
+    def _disk_set(self, key: str, value: str, now: float):
+        """Write one entry to SQLite and periodically enforce TTL and size budget"""
+        with self._disk_lock:
+            try:
+                self._flush_access()
+                self._db.execute(
+                    'INSERT OR REPLACE INTO llm_cache (key, value, size, created_at, accessed_at) '
+                    'VALUES (?, ?, ?, ?, ?)',
+                    (key, value, len(value.encode('utf-8')), now, now)
+                )
+                self._writes_since_evict += 1
+                if self._writes_since_evict >= 50:
+                    self._writes_since_evict = 0
+                    self._evict_disk(now)
+                self._db.commit()
+            except sqlite3.Error as e:
+                print(f"⚠️  LLM disk cache write error: {str(e)}")
+
+    def _evict_disk(self, now: float):
+        """Drop expired rows, then least recently used rows until under budget"""
+        cursor = self._db.execute('DELETE FROM llm_cache WHERE created_at < ?', (now - self.ttl_seconds,))
+        evicted = max(cursor.rowcount, 0)
+
+        total = self._db.execute('SELECT COALESCE(SUM(size), 0) FROM llm_cache').fetchone()[0]
+        if total > self.max_disk_bytes:
+            rows = self._db.execute('SELECT key, size FROM llm_cache ORDER BY accessed_at').fetchall()
+            stale = []
+            for key, size in rows:
+                if total <= self.max_disk_bytes:
+                    break
+                stale.append((key,))
+                total -= size
+            self._db.executemany('DELETE FROM llm_cache WHERE key = ?', stale)
+            evicted += len(stale)
+
+        self.stats['evictions'] += evicted
+
+    def clear(self):
+        """Remove every cached response from both tiers"""
+        self._memory.clear()
+        if self._db is not None:
+            with self._disk_lock:
+                self._pending_access.clear()
+                self._db.execute('DELETE FROM llm_cache')
+                self._db.commit()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get cache counters
+
+        Returns:
+            Dictionary with hit/miss counters, hit rate and tier sizes
+        """
+        hits = self.stats['memory_hits'] + self.stats['disk_hits']
+        lookups = hits + self.stats['misses']
+        return {
+            **self.stats,
+            'enabled': self.enabled,
+            'hit_rate': round(hits / lookups, 3) if lookups else 0.0,
+            'memory_entries': len(self._memory),
+            'disk_enabled': self._db is not None
+        }
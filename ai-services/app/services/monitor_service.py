@@ -0,0 +1,318 @@
+"""
+Competitor page monitoring
+Stores a snapshot per check and diffs it against the previous one block by block
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from difflib import SequenceMatcher
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from app.services.scrape_cache import normalize_url
+from app.services.scraper_service import ScraperService, scraper_service
+
+HEADING_BLOCKS = {'h1', 'h2', 'h3', 'h4', 'h5', 'h6'}
+
+
+def snapshot_hash(snapshot: Dict[str, Any]) -> str:
+    """
+    Hash everything a diff compares
+
+    Args:
+        snapshot: Snapshot with title, meta_description and blocks
+
+    Returns:
+        SHA-256 hex digest
+    """
+    payload = json.dumps(
+        [snapshot.get('title'), snapshot.get('meta_description'), [b['text'] for b in snapshot['blocks']]],
+        ensure_ascii=False
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def diff_snapshots(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Structural and text diff between two snapshots
+
+    Blocks are aligned with difflib on their text, so untouched content and
+    markup-only changes (e.g. a <p> becoming a <div>) do not show up; only
+    inserted, deleted and rewritten blocks do.
+
+    Args:
+        old: Previous snapshot
+        new: Current snapshot
+
+    Returns:
+        Dictionary with the changed blocks, heading outline changes and counters
+    """
+    changes: List[Dict[str, Any]] = []
+    for field in ('title', 'meta_description'):
+        if (old.get(field) or '') != (new.get(field) or ''):
+            changes.append({
+                'change': 'modified', 'tag': field, 'section': '',
+                'before': old.get(field) or '', 'after': new.get(field) or ''
+            })
+
+    old_blocks, new_blocks = old['blocks'], new['blocks']
+    matcher = SequenceMatcher(
+        None,
+        [b['text'] for b in old_blocks],
+        [b['text'] for b in new_blocks],
+        autojunk=False
+    )
+    for op, i1, i2, j1, j2 in matcher.get_opcodes():
+        if op == 'equal':
+            continue
+        removed, added = old_blocks[i1:i2], new_blocks[j1:j2]
+        # Pair rewritten blocks up in order; the remainder is pure insert/delete
+        paired = min(len(removed), len(added)) if op == 'replace' else 0
+        for before, after in zip(removed[:paired], added[:paired]):
+            changes.append({
+                'change': 'modified', 'tag': after['tag'], 'section': after['section'],
+                'before': before['text'], 'after': after['text']
+            })
+        for block in removed[paired:]:
+            changes.append({'change': 'removed', 'tag': block['tag'], 'section': block['section'], 'before': block['text']})
+        for block in added[paired:]:
+            changes.append({'change': 'added', 'tag': block['tag'], 'section': block['section'], 'after': block['text']})
+
+    old_outline = [b['text'] for b in old_blocks if b['tag'] in HEADING_BLOCKS]
+    new_outline = [b['text'] for b in new_blocks if b['tag'] in HEADING_BLOCKS]
+    counts = {'added': 0, 'removed': 0, 'modified': 0}
+    for change in changes:
+        counts[change['change']] += 1
+
+    return {
+        'changes': changes,
+        'structure': {
+            'headings_added': [h for h in new_outline if h not in old_outline],
+            'headings_removed': [h for h in old_outline if h not in new_outline],
+            'blocks_before': len(old_blocks),
+            'blocks_after': len(new_blocks),
+        },
+        'summary': {
+            **counts,
+            'changed_chars': sum(len(c.get('before', '')) + len(c.get('after', '')) for c in changes),
+            'similarity': round(matcher.ratio(), 3),
+        }
+    }
+
+
+class PageMonitor:
+    """Snapshot store and change detector for monitored competitor pages"""
+
+    def __init__(
+        self,
+        scraper: ScraperService,
+        disk_path: Optional[str] = None,
+        max_snapshots: Optional[int] = None
+    ):
+        """
+        Initialize the snapshot store from arguments or environment variables
+
+        Args:
+            scraper: Scraper used to fetch pages
+            disk_path: SQLite file, empty keeps snapshots in memory (MONITOR_DB_PATH)
+            max_snapshots: Snapshots kept per URL (MONITOR_MAX_SNAPSHOTS)
+        """
+        self.scraper = scraper
+        self.max_snapshots = max_snapshots or int(os.getenv('MONITOR_MAX_SNAPSHOTS', '20'))
+        disk_path = disk_path if disk_path is not None else os.getenv('MONITOR_DB_PATH', '')
+
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self.stats = {'checks': 0, 'baselines': 0, 'unchanged': 0, 'not_modified': 0, 'changed': 0}
+        self._open(disk_path)
+
+    def _open(self, disk_path: str):
+        """Open (and create if needed) the SQLite snapshot store"""
+        try:
+            if disk_path:
+                Path(disk_path).parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(disk_path or ':memory:', check_same_thread=False)
+            self._db.execute('PRAGMA journal_mode=WAL')
+            self._db.execute(
+                'CREATE TABLE IF NOT EXISTS page_snapshots ('
+                'id INTEGER PRIMARY KEY AUTOINCREMENT, url TEXT NOT NULL, taken_at REAL NOT NULL, '
+                'checked_at REAL NOT NULL, content_hash TEXT NOT NULL, etag TEXT, last_modified TEXT, '
+                'snapshot TEXT NOT NULL)'
+            )
+            self._db.execute('CREATE INDEX IF NOT EXISTS idx_page_snapshots_url ON page_snapshots (url, id)')
+            self._db.commit()
+            if disk_path:
+                print(f"✅ Monitor snapshots at {disk_path}")
+        except Exception as e:
+            print(f"⚠️  Monitor snapshot store unavailable: {str(e)}")
+            self._db = None
+
+    async def check(
+        self,
+        url: str,
+        analyze: Optional[Callable[[Dict[str, Any]], Awaitable[Any]]] = None
+    ) -> Dict[str, Any]:
+        """
+        Fetch a page and compare it with its last snapshot
+
+        A changed page's snapshot is stored only after `analyze` succeeds, so
+        if the analysis fails the next check diffs against the same snapshot
+        and reports the change again.
+
+        Args:
+            url: Page URL
+            analyze: Optional coroutine function run on a "changed" result;
+                its return value is added as the result's analysis
+
+        Returns:
+            Dictionary with status ("baseline", "unchanged" or "changed"),
+            timestamps, the snapshot title and, when changed, the diff and
+            analysis
+        """
+        if self._db is None:
+            raise Exception("Monitor snapshot store unavailable")
+
+        key = normalize_url(url)
+        self.stats['checks'] += 1
+        previous = await asyncio.to_thread(self._latest, key)
+
+        validators = {}
+        if previous is not None:
+            if previous['etag']:
+                validators['If-None-Match'] = previous['etag']
+            if previous['last_modified']:
+                validators['If-Modified-Since'] = previous['last_modified']
+
+        data, headers = await self.scraper.fetch_snapshot(url, validators)
+        now = time.time()
+
+        if data is None:
+            self.stats['not_modified'] += 1
+            await asyncio.to_thread(self._touch, previous['id'], now, previous['etag'], previous['last_modified'])
+            return self._result(url, 'unchanged', previous, now)
+
+        snapshot = {
+            'title': data.get('title') or '',
+            'meta_description': data.get('meta_description') or '',
+            'blocks': data.get('blocks', [])
+        }
+        page_hash = snapshot_hash(snapshot)
+        etag, last_modified = headers.get('ETag'), headers.get('Last-Modified')
+
+        if previous is not None and previous['content_hash'] == page_hash:
+            self.stats['unchanged'] += 1
+            await asyncio.to_thread(self._touch, previous['id'], now, etag, last_modified)
+            return self._result(url, 'unchanged', previous, now)
+
+        if previous is None:
+            await asyncio.to_thread(self._insert, key, now, page_hash, etag, last_modified, snapshot)
+            self.stats['baselines'] += 1
+            return {**self._result(url, 'baseline', None, now), 'title': snapshot['title']}
+
+        diff = await asyncio.to_thread(diff_snapshots, previous['snapshot'], snapshot)
+        result = {**self._result(url, 'changed', previous, now), 'title': snapshot['title'], **diff}
+        if analyze is not None:
+            result['analysis'] = await analyze(result)
+        await asyncio.to_thread(self._insert, key, now, page_hash, etag, last_modified, snapshot)
+        self.stats['changed'] += 1
+        return result
+
+    @staticmethod
+    def _result(url: str, status: str, previous: Optional[Dict[str, Any]], now: float) -> Dict[str, Any]:
+        """Common fields of a check result"""
+        return {
+            'url': url,
+            'status': status,
+            'checked_at': now,
+            'previous_snapshot_at': previous['taken_at'] if previous else None,
+            'title': previous['snapshot'].get('title', '') if previous else '',
+        }
+
+    def _latest(self, key: str) -> Optional[Dict[str, Any]]:
+        """Most recent snapshot for a URL"""
+        with self._lock:
+            row = self._db.execute(
+                'SELECT id, taken_at, content_hash, etag, last_modified, snapshot FROM page_snapshots '
+                'WHERE url = ? ORDER BY id DESC LIMIT 1', (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            'id': row[0], 'taken_at': row[1], 'content_hash': row[2],
+            'etag': row[3], 'last_modified': row[4], 'snapshot': json.loads(row[5])
+        }
+
+    def _touch(self, snapshot_id: int, now: float, etag: Optional[str], last_modified: Optional[str]):
+        """Record an unchanged check on the latest snapshot"""
+        with self._lock:
+            self._db.execute(
+                'UPDATE page_snapshots SET checked_at = ?, etag = ?, last_modified = ? WHERE id = ?',
+                (now, etag, last_modified, snapshot_id)
+            )
+            self._db.commit()
+
+    def _insert(self, key: str, now: float, page_hash: str, etag: Optional[str], last_modified: Optional[str],
+                snapshot: Dict[str, Any]):
+        """Store a new snapshot and drop the oldest beyond max_snapshots"""
+        with self._lock:
+            self._db.execute(
+                'INSERT INTO page_snapshots (url, taken_at, checked_at, content_hash, etag, last_modified, snapshot) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (key, now, now, page_hash, etag, last_modified, json.dumps(snapshot, ensure_ascii=False))
+            )
+            self._db.execute(
+                'DELETE FROM page_snapshots WHERE url = ? AND id NOT IN ('
+                'SELECT id FROM page_snapshots WHERE url = ? ORDER BY id DESC LIMIT ?)',
+                (key, key, self.max_snapshots)
+            )
+            self._db.commit()
+
+    async def history(self, url: str) -> List[Dict[str, Any]]:
+        """
+        List stored snapshots for a URL, newest first
+
+        Args:
+            url: Page URL
+
+        Returns:
+            List of snapshot summaries (no block content)
+        """
+        if self._db is None:
+            return []
+
+        def read():
+            with self._lock:
+                return self._db.execute(
+                    'SELECT taken_at, checked_at, content_hash, snapshot FROM page_snapshots '
+                    'WHERE url = ? ORDER BY id DESC', (normalize_url(url),)
+                ).fetchall()
+
+        rows = await asyncio.to_thread(read)
+        history = []
+        for taken_at, checked_at, page_hash, snapshot in rows:
+            snapshot = json.loads(snapshot)
+            history.append({
+                'taken_at': taken_at,
+                'last_checked_at': checked_at,
+                'content_hash': page_hash,
+                'title': snapshot.get('title', ''),
+                'blocks': len(snapshot.get('blocks', []))
+            })
+        return history
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get monitoring counters
+
+        Returns:
+            Dictionary with check outcome counters
+        """
+        return {**self.stats, 'enabled': self._db is not None}
+
+
+page_monitor = PageMonitor(scraper_service)
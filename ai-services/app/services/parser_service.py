@@ -2,8 +2,9 @@
 Enhanced parser service using utility functions
 """
 
+import asyncio
 import json
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterator
 from pathlib import Path
 from app.utils.helpers import (
     load_json_file,
@@ -11,6 +12,47 @@ from app.utils.helpers import (
     extract_stakeholders,
     chunk_text
 )
+from app.utils.extraction import extract_text_signals
+from app.utils.json_stream import iter_json_records
+from app.services.corpus_ingest import CorpusIngester
+
+
+def enrich_email(email: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Add requirements and stakeholders extracted from the email body
+    
+    Module-level so ingest worker processes can run it.
+    
+    Args:
+        email: Email dictionary (modified in place)
+        
+    Returns:
+        The same email dictionary
+    """
+    body = email.get('body', '')
+    email['extracted_requirements'], email['mentioned_stakeholders'] = extract_text_signals(body)
+    return email
+
+
+def enrich_meeting(meeting: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Add requirements, stakeholders and transcript chunks to a meeting
+    
+    Args:
+        meeting: Meeting dictionary (modified in place)
+        
+    Returns:
+        The same meeting dictionary
+    """
+    transcript = meeting.get('transcript', '')
+    
+    # Extract requirements and decisions
+    meeting['extracted_requirements'], meeting['mentioned_stakeholders'] = extract_text_signals(transcript)
+    
+    # Chunk long transcripts
+    if len(transcript) > 2000:
+        meeting['transcript_chunks'] = chunk_text(transcript, chunk_size=1000)
+    return meeting
 
 
 class ParserService:
@@ -18,38 +60,52 @@ class ParserService:
     
     def parse_emails(self, file_path: str) -> List[Dict[str, Any]]:
         """
-        Parse email data from JSON file
+        Parse email data from a JSON or JSON-lines file
+        
+        Loads every email into a list; use iter_emails for large exports.
         
         Args:
-            file_path: Path to email JSON file
+            file_path: Path to email JSON/JSONL file
             
         Returns:
             List of parsed email dictionaries
         """
         try:
-            data = load_json_file(file_path)
-            
-            if isinstance(data, list):
-                emails = data
-            elif isinstance(data, dict):
-                emails = [data]
-            else:
-                print(f"⚠️  Unexpected email data format in {file_path}")
-                return []
-            
-            # Enrich emails with extracted requirements
-            for email in emails:
-                body = email.get('body', '')
-                email['extracted_requirements'] = extract_requirements_from_text(body)
-                email['mentioned_stakeholders'] = extract_stakeholders(body)
-            
-            print(f"✅ Parsed {len(emails)} emails from {file_path}")
-            return emails
-            
+            return list(self.iter_emails(file_path))
         except Exception as e:
             print(f"❌ Email parsing error for {file_path}: {str(e)}")
             return []
     
+    def iter_emails(self, file_path: str) -> Iterator[Dict[str, Any]]:
+        """
+        Stream enriched emails from a JSON array, JSON-lines file or single object
+        
+        The file is read incrementally and each email is enriched as it is
+        yielded, so memory stays flat regardless of export size.
+        
+        Args:
+            file_path: Path to email JSON/JSONL file
+            
+        Returns:
+            Iterator over parsed email dictionaries
+            
+        Raises:
+            OSError: If the file cannot be read
+            ValueError: If the file is not a JSON array, object or JSON lines
+        """
+        count = 0
+        skipped = 0
+        for email in iter_json_records(file_path):
+            if not isinstance(email, dict):
+                skipped += 1
+                continue
+            count += 1
+            yield enrich_email(email)
+        
+        if skipped:
+            print(f"⚠️  Skipped {skipped} non-object email records in {file_path}")
+        print(f"✅ Parsed {count} emails from {file_path}")
+    
     def parse_meetings(self, file_path: str) -> List[Dict[str, Any]]:
         """
         Parse meeting transcript data from JSON file
@@ -73,15 +129,7 @@ class ParserService:
             
             # Enrich meetings with extracted information
             for meeting in meetings:
-                transcript = meeting.get('transcript', '')
-                
-                # Extract requirements and decisions
-                meeting['extracted_requirements'] = extract_requirements_from_text(transcript)
-                meeting['mentioned_stakeholders'] = extract_stakeholders(transcript)
-                
-                # Chunk long transcripts
-                if len(transcript) > 2000:
-                    meeting['transcript_chunks'] = chunk_text(transcript, chunk_size=1000)
+                enrich_meeting(meeting)
             
             print(f"✅ Parsed {len(meetings)} meetings from {file_path}")
             return meetings
@@ -134,6 +182,46 @@ class ParserService:
             print(f"❌ Slack parsing error for {file_path}: {str(e)}")
             return []
     
+    def iter_mailbox(self, path: str) -> Iterator[Dict[str, Any]]:
+        """
+        Stream enriched emails from an mbox file or a maildir tree (e.g. Enron)
+        
+        Messages are parsed across worker processes, quoted replies and
+        signatures are stripped and duplicate Message-IDs are dropped.
+        
+        Args:
+            path: mbox file or maildir root directory
+            
+        Returns:
+            Iterator over parsed email dictionaries
+        """
+        ingester = CorpusIngester()
+        if Path(path).is_dir():
+            emails = ingester.iter_maildir([path], transform=enrich_email)
+        else:
+            emails = ingester.iter_mbox([path], transform=enrich_email)
+        yield from emails
+        
+        stats = ingester.get_stats()
+        print(f"✅ Parsed {stats['records'] - stats['duplicates']} emails from {path} "
+              f"({stats['records_per_second']} records/sec)")
+    
+    def iter_ami_meetings(self, path: str) -> Iterator[Dict[str, Any]]:
+        """
+        Stream enriched meetings from AMI corpus word annotations
+        
+        Args:
+            path: Directory containing <meeting>.<speaker>.words.xml files
+            
+        Returns:
+            Iterator over parsed meeting dictionaries
+        """
+        ingester = CorpusIngester()
+        yield from ingester.iter_ami([path], transform=enrich_meeting)
+        
+        stats = ingester.get_stats()
+        print(f"✅ Parsed {stats['records']} meetings from {path} ({stats['records_per_second']} records/sec)")
+    
     def parse_text_file(self, file_path: str) -> Dict[str, Any]:
         """
         Parse plain text file
@@ -192,6 +280,18 @@ class ParserService:
                     parsed_data['documents'].append(self.parse_text_file(doc_path))
         
         return parsed_data
+    
+    async def parse_all_sources_async(self, data_sources: Dict[str, str]) -> Dict[str, List[Dict]]:
+        """
+        parse_all_sources for async callers, run off the event loop
+        
+        Args:
+            data_sources: Dictionary with file paths for each source type
+            
+        Returns:
+            Dictionary with parsed data for all sources
+        """
+        return await asyncio.to_thread(self.parse_all_sources, data_sources)
 
 
 # Singleton instance
@@ -0,0 +1,80 @@
+"""
+Single-flight coalescing of identical in-flight requests
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict
+
+
+class _Flight:
+    """One shared upstream call and the number of callers awaiting it"""
+
+    __slots__ = ('task', 'waiters')
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class RequestCoalescer:
+    """Share one upstream call between concurrent callers with the same key"""
+
+    def __init__(self):
+        """Initialize the in-flight registry and counters"""
+        self._in_flight: Dict[str, _Flight] = {}
+        self.stats = {
+            'upstream_calls': 0,
+            'deduplicated': 0
+        }
+
+    async def run(self, key: str, coro_factory: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run the call for a key, or join the one already in flight
+
+        A caller that is cancelled only detaches itself; the shared call is
+        cancelled only once every caller waiting on it has gone away.
+
+        Args:
+            key: Request identity (e.g. the LLM cache key)
+            coro_factory: Zero-argument callable that starts the upstream call
+
+        Returns:
+            Result of the shared upstream call
+        """
+        flight = self._in_flight.get(key)
+        if flight is None:
+            flight = _Flight(asyncio.ensure_future(coro_factory()))
+            self._in_flight[key] = flight
+            flight.task.add_done_callback(lambda t: self._forget(key, flight))
+            self.stats['upstream_calls'] += 1
+        else:
+            self.stats['deduplicated'] += 1
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                # Nobody is left to receive the result
+                flight.task.cancel()
+
+    def _forget(self, key: str, flight: _Flight):
+        """Drop a finished call from the registry"""
+        if self._in_flight.get(key) is flight:
+            del self._in_flight[key]
+        if not flight.task.cancelled():
+            # Mark the exception as retrieved even if every waiter left
+            flight.task.exception()
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Get coalescing counters
+
+        Returns:
+            Dictionary with upstream call, deduplicated and in-flight counts
+        """
+        return {
+            **self.stats,
+            'in_flight': len(self._in_flight)
+        }
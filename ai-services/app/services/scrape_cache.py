@@ -0,0 +1,324 @@
+"""
+Persistent cache for scraped pages
+Stores extracted fields with HTTP validators so stale entries can be revalidated cheaply
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# Query parameters that never change page content
+TRACKING_PARAMS = {'gclid', 'fbclid', 'msclkid', 'mc_cid', 'mc_eid', 'ref', '_hsenc', '_hsmi'}
+
+# Extracted fields that make up a page's content hash
+CONTENT_FIELDS = ('title', 'text', 'headings', 'meta_description')
+
+
+def normalize_url(url: str) -> str:
+    """
+    Canonical form of a URL for cache lookups
+
+    Lowercases scheme and host, drops default ports, fragments and tracking
+    parameters, sorts the remaining query and gives an empty path a "/".
+
+    Args:
+        url: URL as entered by the user
+
+    Returns:
+        Normalized URL
+    """
+    parts = urlsplit(url.strip())
+    scheme = (parts.scheme or 'http').lower()
+    host = (parts.hostname or '').lower()
+    port = parts.port
+    if port and not ((scheme == 'http' and port == 80) or (scheme == 'https' and port == 443)):
+        host = f"{host}:{port}"
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith('utm_') and key.lower() not in TRACKING_PARAMS
+    )
+    return urlunsplit((scheme, host, parts.path or '/', urlencode(query), ''))
+
+
+def content_hash(data: Dict[str, Any]) -> str:
+    """
+    Hash the extracted content of a page
+
+    Args:
+        data: Scrape result with title, text, headings and meta_description
+
+    Returns:
+        SHA-256 hex digest of the content fields
+    """
+    payload = json.dumps({field: data.get(field) for field in CONTENT_FIELDS}, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class ScrapeCache:
+    """SQLite cache of extracted pages and their competitor analysis, keyed by normalized URL"""
+
+    def __init__(
+        self,
+        disk_path: Optional[str] = None,
+        ttl_seconds: Optional[float] = None,
+        max_age_seconds: Optional[float] = None,
+        max_entries: Optional[int] = None
+    ):
+        """
+        Initialize the cache from arguments or environment variables
+
+        Args:
+            disk_path: SQLite file, empty keeps the cache in memory (SCRAPE_CACHE_PATH)
+            ttl_seconds: Age after which an entry is revalidated before use (SCRAPE_CACHE_TTL_SECONDS)
+            max_age_seconds: Age after which an entry is dropped entirely (SCRAPE_CACHE_MAX_AGE_SECONDS)
+            max_entries: Max pages kept (SCRAPE_CACHE_MAX_ENTRIES)
+        """
+        self.enabled = os.getenv('SCRAPE_CACHE_ENABLED', 'true').lower() not in ('0', 'false', 'no')
+        self.ttl_seconds = ttl_seconds or float(os.getenv('SCRAPE_CACHE_TTL_SECONDS', '3600'))
+        self.max_age_seconds = max_age_seconds or float(os.getenv('SCRAPE_CACHE_MAX_AGE_SECONDS', '2592000'))
+        self.max_entries = max_entries or int(os.getenv('SCRAPE_CACHE_MAX_ENTRIES', '5000'))
+        disk_path = disk_path if disk_path is not None else os.getenv('SCRAPE_CACHE_PATH', '')
+
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self._writes_since_evict = 0
+
+        self.stats = {
+            'fresh_hits': 0,
+            'not_modified': 0,
+            'unchanged': 0,
+            'changed': 0,
+            'misses': 0,
+            'analysis_reused': 0,
+            'evictions': 0
+        }
+
+        if self.enabled:
+            self._open(disk_path)
+
+    def _open(self, disk_path: str):
+        """Open (and create if needed) the SQLite database"""
+        try:
+            if disk_path:
+                Path(disk_path).parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(disk_path or ':memory:', check_same_thread=False)
+            self._db.execute('PRAGMA journal_mode=WAL')
+            self._db.execute(
+                'CREATE TABLE IF NOT EXISTS scrape_cache ('
+                'url TEXT PRIMARY KEY, data TEXT NOT NULL, etag TEXT, last_modified TEXT, '
+                'content_hash TEXT NOT NULL, fetched_at REAL NOT NULL, validated_at REAL NOT NULL, '
+                'analysis TEXT, analysis_hash TEXT)'
+            )
+            self._db.execute('CREATE INDEX IF NOT EXISTS idx_scrape_cache_validated ON scrape_cache (validated_at)')
+            self._db.commit()
+            if disk_path:
+                print(f"✅ Scrape cache at {disk_path}")
+        except Exception as e:
+            print(f"⚠️  Scrape cache disabled: {str(e)}")
+            self._db = None
+
+    async def get(self, url: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached page
+
+        Args:
+            url: Page URL (normalized internally)
+
+        Returns:
+            Entry with data, validators, content_hash and a `fresh` flag, or None
+        """
+        if self._db is None:
+            return None
+        return await asyncio.to_thread(self._read, normalize_url(url), time.time())
+
+    async def put(self, url: str, data: Dict[str, Any], etag: Optional[str], last_modified: Optional[str]) -> bool:
+        """
+        Store a freshly fetched page
+
+        A stored analysis survives only if the content hash is unchanged.
+
+        Args:
+            url: Page URL (normalized internally)
+            data: Extracted page fields
+            etag: ETag response header
+            last_modified: Last-Modified response header
+
+        Returns:
+            True if the content differs from the previously cached copy (or nothing was cached)
+        """
+        if self._db is None:
+            return True
+        page_hash = content_hash(data)
+        previous_hash = await asyncio.to_thread(
+            self._write, normalize_url(url), data, etag, last_modified, page_hash, time.time()
+        )
+        if previous_hash is None:
+            return True
+        changed = previous_hash != page_hash
+        self.stats['changed' if changed else 'unchanged'] += 1
+        return changed
+
+    async def touch(self, url: str):
+        """
+        Mark a cached page as revalidated (server answered 304 Not Modified)
+
+        Args:
+            url: Page URL (normalized internally)
+        """
+        if self._db is None:
+            return
+        self.stats['not_modified'] += 1
+        await asyncio.to_thread(
+            self._execute, 'UPDATE scrape_cache SET validated_at = ? WHERE url = ?', (time.time(), normalize_url(url))
+        )
+
+    async def get_analysis(self, url: str, page_hash: str) -> Optional[Dict[str, Any]]:
+        """
+        Return the stored analysis if it was made for this exact page content
+
+        Args:
+            url: Page URL (normalized internally)
+            page_hash: Content hash of the current page
+
+        Returns:
+            Analysis dictionary, or None
+        """
+        if self._db is None:
+            return None
+        entry = await self.get(url)
+        if entry is None or entry['analysis'] is None or entry['analysis_hash'] != page_hash:
+            return None
+        self.stats['analysis_reused'] += 1
+        return entry['analysis']
+
+    async def set_analysis(self, url: str, page_hash: str, analysis: Dict[str, Any]):
+        """
+        Store the analysis computed for a page's content
+
+        Args:
+            url: Page URL (normalized internally)
+            page_hash: Content hash the analysis was computed from
+            analysis: Analysis dictionary
+        """
+        if self._db is None:
+            return
+        await asyncio.to_thread(
+            self._execute,
+            'UPDATE scrape_cache SET analysis = ?, analysis_hash = ? WHERE url = ? AND content_hash = ?',
+            (json.dumps(analysis, ensure_ascii=False), page_hash, normalize_url(url), page_hash)
+        )
+
+    def _read(self, key: str, now: float) -> Optional[Dict[str, Any]]:
+        """Read one entry, dropping it if it is past the max age"""
+        with self._lock:
+            try:
+                row = self._db.execute(
+                    'SELECT data, etag, last_modified, content_hash, fetched_at, validated_at, analysis, analysis_hash '
+                    'FROM scrape_cache WHERE url = ?', (key,)
+                ).fetchone()
+                if row is None:
+                    return None
+                if now - row[5] > self.max_age_seconds:
+                    self._db.execute('DELETE FROM scrape_cache WHERE url = ?', (key,))
+                    self._db.commit()
+                    return None
+            except sqlite3.Error as e:
+                print(f"⚠️  Scrape cache read error: {str(e)}")
+                return None
+
+        return {
+            'data': json.loads(row[0]),
+            'etag': row[1],
+            'last_modified': row[2],
+            'content_hash': row[3],
+            'fetched_at': row[4],
+            'validated_at': row[5],
+            'analysis': json.loads(row[6]) if row[6] else None,
+            'analysis_hash': row[7],
+            'fresh': now - row[5] <= self.ttl_seconds
+        }
+
+    def _write(self, key: str, data: Dict[str, Any], etag: Optional[str], last_modified: Optional[str],
+               page_hash: str, now: float) -> Optional[str]:
+        """Upsert one entry, returning the previous content hash (None if new)"""
+        with self._lock:
+            try:
+                row = self._db.execute('SELECT content_hash FROM scrape_cache WHERE url = ?', (key,)).fetchone()
+                self._db.execute(
+                    'INSERT INTO scrape_cache (url, data, etag, last_modified, content_hash, fetched_at, validated_at) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?) '
+                    'ON CONFLICT(url) DO UPDATE SET data = excluded.data, etag = excluded.etag, '
+                    'last_modified = excluded.last_modified, fetched_at = excluded.fetched_at, '
+                    'validated_at = excluded.validated_at, '
+                    'analysis = CASE WHEN content_hash = excluded.content_hash THEN analysis END, '
+                    'analysis_hash = CASE WHEN content_hash = excluded.content_hash THEN analysis_hash END, '
+                    'content_hash = excluded.content_hash',
+                    (key, json.dumps(data, ensure_ascii=False), etag, last_modified, page_hash, now, now)
+                )
+                self._writes_since_evict += 1
+                if self._writes_since_evict >= 50:
+                    self._writes_since_evict = 0
+                    self._evict(now)
+                self._db.commit()
+                return row[0] if row else None
+            except sqlite3.Error as e:
+                print(f"⚠️  Scrape cache write error: {str(e)}")
+                return None
+
+    def _execute(self, sql: str, params: tuple):
+        """Run one write statement"""
+        with self._lock:
+            try:
+                self._db.execute(sql, params)
+                self._db.commit()
+            except sqlite3.Error as e:
+                print(f"⚠️  Scrape cache write error: {str(e)}")
+
+    def _evict(self, now: float):
+        """Drop entries past the max age, then the least recently validated beyond max_entries"""
+        cursor = self._db.execute('DELETE FROM scrape_cache WHERE validated_at < ?', (now - self.max_age_seconds,))
+        evicted = max(cursor.rowcount, 0)
+        cursor = self._db.execute(
+            'DELETE FROM scrape_cache WHERE url IN ('
+            'SELECT url FROM scrape_cache ORDER BY validated_at DESC LIMIT -1 OFFSET ?)',
+            (self.max_entries,)
+        )
+        evicted += max(cursor.rowcount, 0)
+        self.stats['evictions'] += evicted
+
+    def record_fresh_hit(self):
+        """Count a lookup served without touching the network"""
+        self.stats['fresh_hits'] += 1
+
+    def record_miss(self):
+        """Count a lookup with nothing cached"""
+        self.stats['misses'] += 1
+
+    def clear(self):
+        """Remove every cached page"""
+        if self._db is not None:
+            self._execute('DELETE FROM scrape_cache', ())
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get cache counters
+
+        Returns:
+            Dictionary with hit/revalidation counters and entry count
+        """
+        entries = 0
+        if self._db is not None:
+            with self._lock:
+                entries = self._db.execute('SELECT COUNT(*) FROM scrape_cache').fetchone()[0]
+        return {
+            **self.stats,
+            'enabled': self._db is not None,
+            'entries': entries
+        }
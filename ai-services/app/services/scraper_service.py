@@ -1,45 +1,243 @@
-from playwright.async_api import async_playwright
-from bs4 import BeautifulSoup
-from typing import Dict
+import aiohttp
+import asyncio
+import os
+import re
+import time
+from typing import Dict, Optional, Tuple
+from app.services.browser_pool import BrowserPool
+from app.services.html_extractor import extract_page, extract_page_soup
+from app.services.scrape_cache import ScrapeCache, content_hash
+
+# Client-rendered apps ship an empty mount point and fill it with JavaScript
+JS_ROOT_PATTERN = re.compile(
+    r'<div[^>]+id=["\'](?:root|app|__next|__nuxt|svelte)["\'][^>]*>\s*</div>',
+    re.IGNORECASE
+)
+NOSCRIPT_PATTERN = re.compile(r'<noscript[^>]*>[^<]*enable javascript', re.IGNORECASE)
+
+USER_AGENT = 'Mozilla/5.0 (compatible; ReqForgeBot/1.0)'
 
 class ScraperService:
-    async def scrape(self, url: str) -> Dict:
-        """Scrape website content"""
-        try:
-            async with async_playwright() as p:
-                browser = await p.chromium.launch(headless=True)
-                page = await browser.new_page()
-                
-                await page.goto(url, wait_until='domcontentloaded', timeout=30000)
-                html = await page.content()
-                await browser.close()
-                
-                soup = BeautifulSoup(html, 'html.parser')
-                
-                # Remove script and style elements
-                for script in soup(["script", "style"]):
-                    script.extract()
-                
-                text = soup.get_text()
-                lines = (line.strip() for line in text.splitlines())
-                chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-                text = ' '.join(chunk for chunk in chunks if chunk)
-                
-                return {
-                    'url': url,
-                    'title': soup.title.string if soup.title else '',
-                    'text': text[:5000],  # Limit to 5000 chars
-                    'meta_description': self._get_meta_description(soup),
-                    'headings': [h.get_text() for h in soup.find_all(['h1', 'h2', 'h3'])[:10]]
+    def __init__(self):
+        # Chromium is launched on the first scrape and reused afterwards
+        self.browser_pool = BrowserPool()
+        # tiered: plain HTTP first, browser only for JS shells | http | browser
+        self.fetch_mode = os.getenv('SCRAPER_FETCH_MODE', 'tiered').lower()
+        self.min_text_chars = int(os.getenv('SCRAPER_MIN_TEXT_CHARS', '200'))
+        self.http_timeout = float(os.getenv('SCRAPER_HTTP_TIMEOUT_SECONDS', '15'))
+        self.http_connections = int(os.getenv('SCRAPER_HTTP_CONNECTIONS', '32'))
+        # fast: single-pass HTMLParser extractor | soup: BeautifulSoup reference implementation
+        self._extractor = extract_page_soup if os.getenv('SCRAPER_EXTRACTOR', 'fast') == 'soup' else extract_page
+        self._session: Optional[aiohttp.ClientSession] = None
+        # Extracted pages and their analyses, revalidated once past the TTL
+        self.cache = ScrapeCache()
+        self.stats = {
+            'tiers': {'cache': 0, 'http': 0, 'browser': 0},
+            'tier_seconds': {'cache': 0.0, 'http': 0.0, 'browser': 0.0},
+            'fallbacks': {}
+        }
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Create the pooled HTTP session lazily so it binds to the running loop"""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.http_connections, ttl_dns_cache=300),
+                timeout=aiohttp.ClientTimeout(total=self.http_timeout),
+                headers={
+                    'User-Agent': USER_AGENT,
+                    'Accept': 'text/html,application/xhtml+xml'
                 }
-                
+            )
+        return self._session
+
+    async def scrape(self, url: str, use_cache: bool = True) -> Dict:
+        """Scrape website content, reusing or revalidating a cached copy when possible"""
+        try:
+            started = time.perf_counter()
+            cached = await self.cache.get(url) if use_cache else None
+            if cached is not None and cached['fresh']:
+                self.cache.record_fresh_hit()
+                return self._served(self._from_cache(cached, 'fresh'), 'cache', started)
+            if cached is None and use_cache:
+                self.cache.record_miss()
+
+            # Only pages fetched over HTTP have validators the server will understand
+            validators = {}
+            if cached is not None and cached['data'].get('fetch_tier') == 'http':
+                if cached['etag']:
+                    validators['If-None-Match'] = cached['etag']
+                if cached['last_modified']:
+                    validators['If-Modified-Since'] = cached['last_modified']
+
+            data, headers = await self._fetch(url, validators)
+            if data is None and cached is None:
+                # A 304 with nothing cached to serve: ask again without validators
+                data, headers = await self._fetch(url, {})
+                if data is None:
+                    raise Exception("Server answered 304 to an unconditional request")
+            if data is None:
+                await self.cache.touch(url)
+                return self._from_cache(cached, 'not_modified')
+
+            data['content_hash'] = content_hash(data)
+            if not use_cache:
+                data['cache_status'] = 'bypass'
+                return data
+
+            changed = await self.cache.put(url, data, headers.get('ETag'), headers.get('Last-Modified'))
+            if not changed:
+                data['cache_status'] = 'unchanged'
+            else:
+                data['cache_status'] = 'changed' if cached is not None else 'miss'
+            return data
+
         except Exception as e:
             print(f"Scraping error: {str(e)}")
             raise Exception(f"Failed to scrape {url}: {str(e)}")
-    
-    def _get_meta_description(self, soup):
-        """Extract meta description"""
-        meta = soup.find('meta', attrs={'name': 'description'})
-        return meta.get('content', '') if meta else ''
 
-scraper_service = ScraperService()
\ No newline at end of file
+    async def fetch_snapshot(self, url: str, validators: Optional[Dict[str, str]] = None):
+        """
+        Fetch a page with its full list of content blocks, bypassing the scrape cache
+
+        Args:
+            url: Page URL
+            validators: Conditional request headers (If-None-Match / If-Modified-Since)
+
+        Returns:
+            Tuple of (extracted data with blocks, or None if the server answered 304; response headers)
+        """
+        try:
+            return await self._fetch(url, validators or {}, include_blocks=True)
+        except Exception as e:
+            print(f"Scraping error: {str(e)}")
+            raise Exception(f"Failed to scrape {url}: {str(e)}")
+
+    async def _fetch(self, url: str, validators: Dict[str, str], include_blocks: bool = False):
+        """
+        Fetch and extract a page, plain HTTP first and the browser as fallback
+
+        Returns:
+            Tuple of (extracted data, or None if the server answered 304; response headers)
+        """
+        if self.fetch_mode != 'browser':
+            started = time.perf_counter()
+            html, reason, headers = await self._fetch_http(url, validators)
+            if reason == 'not_modified':
+                self._served({}, 'http', started)
+                return None, headers
+            if html is not None:
+                data = await self._extract(html, url, include_blocks)
+                reason = self._js_shell_reason(html, data['text'])
+                if reason is None or self.fetch_mode == 'http':
+                    return self._served(data, 'http', started), headers
+            if self.fetch_mode == 'http':
+                raise Exception(f"HTTP fetch failed ({reason})")
+            self.stats['fallbacks'][reason] = self.stats['fallbacks'].get(reason, 0) + 1
+
+        started = time.perf_counter()
+        async with self.browser_pool.page() as page:
+            await page.goto(url, wait_until='domcontentloaded', timeout=30000)
+            html = await page.content()
+
+        return self._served(await self._extract(html, url, include_blocks), 'browser', started), {}
+
+    async def _fetch_http(self, url: str, validators: Optional[Dict[str, str]] = None):
+        """
+        Fetch a page without a browser
+
+        Returns:
+            Tuple of (html or None, reason it is unusable, response headers)
+        """
+        try:
+            async with self._get_session().get(url, headers=validators, allow_redirects=True) as response:
+                headers = {
+                    'ETag': response.headers.get('ETag'),
+                    'Last-Modified': response.headers.get('Last-Modified')
+                }
+                if response.status == 304:
+                    return None, 'not_modified', headers
+                if response.status >= 400:
+                    return None, f"http_{response.status}", headers
+                content_type = response.headers.get('Content-Type', '')
+                if content_type and 'html' not in content_type:
+                    return None, 'not_html', headers
+                return await response.text(errors='replace'), None, headers
+        except Exception as e:
+            return None, f"http_{type(e).__name__}", {}
+
+    async def fetch_raw(self, url: str) -> Tuple[int, str]:
+        """
+        Fetch a small text resource (e.g. robots.txt) over the pooled HTTP session
+
+        Returns:
+            Tuple of (status code, body); status 0 if the request failed
+        """
+        try:
+            async with self._get_session().get(url, allow_redirects=True) as response:
+                return response.status, await response.text(errors='replace')
+        except Exception:
+            return 0, ''
+
+    @staticmethod
+    def _from_cache(entry: Dict, status: str) -> Dict:
+        """Build a scrape result from a cached entry"""
+        return {
+            **entry['data'],
+            'content_hash': entry['content_hash'],
+            'cache_status': status
+        }
+
+    def _js_shell_reason(self, html: str, text: str) -> Optional[str]:
+        """Return why a page looks client-rendered, or None if the HTTP copy is usable"""
+        if len(text) < self.min_text_chars:
+            return 'little_text'
+        if JS_ROOT_PATTERN.search(html):
+            return 'empty_app_root'
+        if NOSCRIPT_PATTERN.search(html) and len(text) < self.min_text_chars * 5:
+            return 'requires_javascript'
+        return None
+
+    def _served(self, data: Dict, tier: str, started: float) -> Dict:
+        """Record which tier served a scrape"""
+        self.stats['tiers'][tier] += 1
+        self.stats['tier_seconds'][tier] += time.perf_counter() - started
+        data['fetch_tier'] = tier
+        return data
+
+    async def get_cached_analysis(self, url: str, page_hash: str) -> Optional[Dict]:
+        """Analysis stored for this URL if it was made from identical content"""
+        return await self.cache.get_analysis(url, page_hash)
+
+    async def save_analysis(self, url: str, page_hash: str, analysis: Dict):
+        """Remember the analysis for this URL's current content"""
+        await self.cache.set_analysis(url, page_hash, analysis)
+
+    async def _extract(self, html: str, url: str, include_blocks: bool = False) -> Dict:
+        """Extract title, text, meta description, headings and links off the event loop"""
+        if include_blocks:
+            # Only the single-pass extractor produces content blocks
+            return await asyncio.to_thread(extract_page, html, url, True)
+        return await asyncio.to_thread(self._extractor, html, url)
+
+    async def close(self):
+        """Shut down the shared browser and HTTP session"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        await self.browser_pool.close()
+
+    def get_stats(self) -> Dict:
+        """Get scraper counters"""
+        served = self.stats['tiers']
+        return {
+            'fetch_mode': self.fetch_mode,
+            'tiers': dict(served),
+            'avg_seconds': {
+                tier: round(self.stats['tier_seconds'][tier] / count, 3) if count else 0.0
+                for tier, count in served.items()
+            },
+            'fallbacks': dict(self.stats['fallbacks']),
+            'cache': self.cache.get_stats(),
+            'browser_pool': self.browser_pool.get_stats()
+        }
+
+scraper_service = ScraperService()
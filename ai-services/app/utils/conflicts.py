@@ -0,0 +1,177 @@
+"""
+Indexed conflict detection between requirements
+Facts are extracted once per requirement and only requirements that share a
+fact type (and, with opt-in topic blocking, a topic term) are compared
+"""
+
+import re
+from bisect import bisect_right
+from typing import Any, Dict, List, NamedTuple, Optional, Set, Tuple
+
+# Fact types in the order conflicts were always reported; each has the pattern
+# matched in the earlier requirement and the one matched in the later one
+FACT_TYPES = ('modality', 'quarter', 'amount', 'duration')
+FACT_PATTERNS = {
+    'modality': (re.compile(r'\bmust\b.*\bnot\b', re.IGNORECASE), re.compile(r'\bmust\b', re.IGNORECASE)),
+    'quarter': (re.compile(r'\bq[1-4]\b', re.IGNORECASE),) * 2,
+    'amount': (re.compile(r'\$[\d,]+', re.IGNORECASE),) * 2,
+    'duration': (re.compile(r'\d+\s*(?:weeks?|months?|days?)', re.IGNORECASE),) * 2,
+}
+DURATION_DAYS = {'day': 1, 'week': 7, 'month': 30}
+_DURATION_PARTS = re.compile(r'(\d+)\s*(day|week|month)')
+
+# Topic terms in more requirements than this are too common to block on
+MAX_TOPIC_BLOCK_SIZE = 64
+_TOPIC_TERM = re.compile(r'[a-z][a-z0-9]{3,}')
+TOPIC_STOPWORDS = {
+    'must', 'should', 'shall', 'will', 'would', 'need', 'needs', 'required', 'require', 'have', 'include',
+    'support', 'with', 'from', 'that', 'this', 'than', 'then', 'they', 'them', 'their', 'there', 'these',
+    'those', 'what', 'when', 'where', 'which', 'while', 'also', 'into', 'onto', 'only', 'over', 'under',
+    'about', 'after', 'before', 'each', 'every', 'other', 'some', 'such', 'able', 'been', 'being', 'were',
+    'does', 'done', 'make', 'made', 'within', 'without', 'across', 'users', 'user', 'system', 'days',
+    'weeks', 'months', 'week', 'month', 'budget', 'launch', 'approved', 'team', 'project', 'phase',
+}
+
+
+class Fact(NamedTuple):
+    """One extracted fact: the matched text (as compared) and a normalized value"""
+    text: str
+    value: Any
+
+
+def extract_facts(text: str) -> Dict[str, Tuple[Optional[Fact], Optional[Fact]]]:
+    """
+    Extract every conflict-relevant fact from a requirement once
+
+    Args:
+        text: Requirement text
+
+    Returns:
+        Mapping of fact type to (fact as the earlier requirement, fact as the
+        later requirement); either side is None when the text has no match.
+        Normalized values: modality 'must_not'/'must', quarter 'q1'-'q4',
+        amount in whole currency units, duration in days
+    """
+    lowered = text.lower()
+    facts = {}
+    for fact_type in FACT_TYPES:
+        earlier_pattern, later_pattern = FACT_PATTERNS[fact_type]
+        earlier = earlier_pattern.search(lowered)
+        later = earlier if later_pattern is earlier_pattern else later_pattern.search(lowered)
+        facts[fact_type] = (
+            _fact(fact_type, earlier.group(), True) if earlier else None,
+            _fact(fact_type, later.group(), False) if later else None,
+        )
+    return facts
+
+
+def _fact(fact_type: str, matched: str, earlier: bool) -> Fact:
+    """Normalize one matched fact"""
+    if fact_type == 'modality':
+        return Fact(matched, 'must_not' if earlier else 'must')
+    if fact_type == 'amount':
+        digits = matched[1:].replace(',', '')
+        return Fact(matched, int(digits) if digits else None)
+    if fact_type == 'duration':
+        parts = _DURATION_PARTS.match(matched)
+        return Fact(matched, int(parts.group(1)) * DURATION_DAYS[parts.group(2)] if parts else None)
+    return Fact(matched, matched)
+
+
+def topic_terms(text: str) -> Set[str]:
+    """Content words used as blocking keys between requirements"""
+    return {term for term in _TOPIC_TERM.findall(text.lower()) if term not in TOPIC_STOPWORDS}
+
+
+def find_conflicts(requirements: List[Dict[str, Any]], topic_blocking: bool = False) -> List[Dict[str, Any]]:
+    """
+    Detect value mismatches between requirements
+
+    A pair (earlier, later) conflicts on a fact type when both have that fact
+    and the matched text differs ("must ... not" in the earlier requirement vs
+    "must" in the later one for modality). Requirements are bucketed by fact
+    type and matched text, so only pairs across different buckets are ever
+    visited; by default the output is the same as comparing every pair. With
+    topic blocking a pair must also share a topic term, which keeps large sets
+    from producing a quadratic number of conflicts but drops conflicts between
+    requirements worded on different topics.
+
+    Args:
+        requirements: List of requirement dictionaries (with 'text')
+        topic_blocking: Opt in to requiring a shared topic term (lossy)
+
+    Returns:
+        List of conflicts ordered by requirement pair, then fact type
+    """
+    facts = [extract_facts(requirement.get('text', '')) for requirement in requirements]
+    if topic_blocking:
+        terms = [topic_terms(requirement.get('text', '')) for requirement in requirements]
+        found = _blocked_pairs(facts, terms)
+    else:
+        found = _all_pairs(facts)
+    found.sort()
+
+    conflicts = []
+    for i, j, type_index in found:
+        fact_type = FACT_TYPES[type_index]
+        conflicts.append({
+            'id': f'conflict_{len(conflicts) + 1}',
+            'type': 'value_mismatch',
+            'requirement_1': requirements[i],
+            'requirement_2': requirements[j],
+            'description': f"Potential conflict: '{facts[i][fact_type][0].text}' vs '{facts[j][fact_type][1].text}'"
+        })
+    return conflicts
+
+
+def _all_pairs(facts: List[Dict[str, Tuple[Optional[Fact], Optional[Fact]]]]) -> List[Tuple[int, int, int]]:
+    """Every conflicting (i, j, fact type) with i < j"""
+    found = []
+    for type_index, fact_type in enumerate(FACT_TYPES):
+        # Later-side matched text -> requirement indexes, ascending
+        buckets: Dict[str, List[int]] = {}
+        for index, requirement_facts in enumerate(facts):
+            later = requirement_facts[fact_type][1]
+            if later is not None:
+                buckets.setdefault(later.text, []).append(index)
+        if not buckets:
+            continue
+
+        for i, requirement_facts in enumerate(facts):
+            earlier = requirement_facts[fact_type][0]
+            if earlier is None:
+                continue
+            for text, indexes in buckets.items():
+                if text != earlier.text:
+                    found.extend((i, j, type_index) for j in indexes[bisect_right(indexes, i):])
+    return found
+
+
+def _blocked_pairs(
+    facts: List[Dict[str, Tuple[Optional[Fact], Optional[Fact]]]],
+    terms: List[Set[str]]
+) -> List[Tuple[int, int, int]]:
+    """Conflicting (i, j, fact type) with i < j among requirements sharing a topic term"""
+    found = []
+    for type_index, fact_type in enumerate(FACT_TYPES):
+        # Topic term -> requirements with a later-side fact of this type, ascending
+        blocks: Dict[str, List[int]] = {}
+        for index, requirement_facts in enumerate(facts):
+            if requirement_facts[fact_type][1] is not None:
+                for term in terms[index]:
+                    blocks.setdefault(term, []).append(index)
+
+        for i, requirement_facts in enumerate(facts):
+            earlier = requirement_facts[fact_type][0]
+            if earlier is None:
+                continue
+            partners = set()
+            for term in terms[i]:
+                block = blocks.get(term)
+                if block is None or len(block) > MAX_TOPIC_BLOCK_SIZE:
+                    continue
+                partners.update(block[bisect_right(block, i):])
+            for j in partners:
+                if facts[j][fact_type][1].text != earlier.text:
+                    found.append((i, j, type_index))
+    return found
@@ -0,0 +1,141 @@
+"""
+Compiled requirement and stakeholder extraction
+Same output as the original per-sentence helpers, without the per-call regex work
+"""
+
+import re
+from typing import Dict, List, Pattern, Tuple
+
+# Common requirement indicators
+REQUIREMENT_INDICATORS = [
+    r'must\s+(?:have|be|include|support)',
+    r'should\s+(?:have|be|include|support)',
+    r'shall\s+(?:have|be|include|support)',
+    r'required?\s+to',
+    r'needs?\s+to',
+    r'(?:will|would)\s+(?:have|include|support)',
+]
+REQUIREMENT_PATTERN = re.compile('|'.join(REQUIREMENT_INDICATORS), re.IGNORECASE)
+# Case-sensitive matching on lowercased text is several times faster than IGNORECASE
+LOWERCASE_REQUIREMENT_PATTERN = re.compile('|'.join(REQUIREMENT_INDICATORS))
+# Characters IGNORECASE matches to the indicators' letters but str.lower() leaves alone
+CASE_FOLD_EXCEPTIONS = ('\u0131', '\u017f')
+# Sentences are the text between runs of these
+SENTENCE_END_CHARS = '.!?'
+SENTENCE_BREAK = re.compile(r'[.!?]')
+MIN_REQUIREMENT_WORDS = 5
+
+# Names with roles, e.g. "John Doe (CEO)", "Sarah Smith - Product Manager)", "Mike Chen, Tech Lead"
+STAKEHOLDER_PATTERNS = [
+    (re.compile(r'([A-Z][a-z]+\s+[A-Z][a-z]+)\s*[\(\-]\s*([A-Z][A-Za-z\s]+)[\)]'), ')'),
+    (re.compile(r'([A-Z][a-z]+\s+[A-Z][a-z]+),\s*([A-Z][A-Za-z\s]+)'), ','),
+]
+
+
+def find_requirements(text: str) -> List[str]:
+    """
+    Sentences that contain a requirement indicator and have at least five words
+
+    Jumps from one indicator match to the next instead of testing every
+    sentence; a sentence's bounds are found around the match. Matches are
+    searched case-sensitively in lowercased text where that gives the same
+    result as re.IGNORECASE.
+
+    Args:
+        text: Input text
+
+    Returns:
+        Requirement sentences in text order
+    """
+    haystack, pattern = _requirement_haystack(text)
+    requirements = []
+    # Everything before cursor belongs to sentences already handled
+    cursor = 0
+    match = pattern.search(haystack)
+    while match is not None:
+        position = match.start()
+        start = max(haystack.rfind(char, cursor, position) for char in SENTENCE_END_CHARS) + 1
+        sentence_break = SENTENCE_BREAK.search(haystack, position)
+        end = sentence_break.start() if sentence_break else len(haystack)
+        sentence = text[start:end].strip()
+        if len(sentence.split()) >= MIN_REQUIREMENT_WORDS:
+            requirements.append(sentence)
+        # Other matches in this sentence cannot add anything
+        cursor = end
+        match = pattern.search(haystack, end)
+    return requirements
+
+
+def _requirement_haystack(text: str) -> Tuple[str, Pattern]:
+    """Lowercased text and the case-sensitive pattern when that is exactly equivalent"""
+    lowered = text.lower()
+    if text.isascii() or (
+        len(lowered) == len(text) and not any(char in text for char in CASE_FOLD_EXCEPTIONS)
+    ):
+        return lowered, LOWERCASE_REQUIREMENT_PATTERN
+    return text, REQUIREMENT_PATTERN
+
+
+def find_stakeholders(text: str) -> List[Dict[str, str]]:
+    """
+    Name/role pairs, first occurrence of each name
+
+    Args:
+        text: Input text
+
+    Returns:
+        List of stakeholder dictionaries (name, role)
+    """
+    stakeholders = []
+    seen_names = set()
+    for pattern, required_char in STAKEHOLDER_PATTERNS:
+        # Every match ends with / contains this character, so most texts skip the scan
+        if required_char not in text:
+            continue
+        for match in pattern.finditer(text):
+            name = match.group(1).strip()
+            if name not in seen_names:
+                seen_names.add(name)
+                stakeholders.append({'name': name, 'role': match.group(2).strip()})
+    return stakeholders
+
+
+def extract_text_signals(text: str) -> Tuple[List[str], List[Dict[str, str]]]:
+    """
+    Requirements and stakeholders of a text in one pass over its sentences
+
+    Neither a requirement indicator nor a stakeholder match can contain
+    sentence punctuation, so testing each sentence for both gives exactly
+    find_requirements(text) and find_stakeholders(text).
+
+    Args:
+        text: Input text
+
+    Returns:
+        Tuple of (requirement sentences, stakeholder dictionaries)
+    """
+    haystack, pattern = _requirement_haystack(text)
+    # Stakeholder matches per pattern, merged in pattern order afterwards
+    scans = [(stakeholder_pattern, []) for stakeholder_pattern, required_char in STAKEHOLDER_PATTERNS
+             if required_char in text]
+    # Lowercasing keeps the punctuation in place, so both splits line up
+    haystack_sentences = SENTENCE_BREAK.split(haystack)
+    sentences = haystack_sentences if haystack is text else SENTENCE_BREAK.split(text)
+    requirements = []
+    for haystack_sentence, sentence in zip(haystack_sentences, sentences):
+        if pattern.search(haystack_sentence):
+            stripped = sentence.strip()
+            if len(stripped.split()) >= MIN_REQUIREMENT_WORDS:
+                requirements.append(stripped)
+        for stakeholder_pattern, matches in scans:
+            matches.extend(stakeholder_pattern.finditer(sentence))
+
+    stakeholders = []
+    seen_names = set()
+    for _, matches in scans:
+        for match in matches:
+            name = match.group(1).strip()
+            if name not in seen_names:
+                seen_names.add(name)
+                stakeholders.append({'name': name, 'role': match.group(2).strip()})
+    return requirements, stakeholders
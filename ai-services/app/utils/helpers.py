@@ -8,6 +8,9 @@ from datetime import datetime
 from typing import Dict, List, Any, Optional
 from pathlib import Path
 
+from app.utils.conflicts import find_conflicts
+from app.utils.extraction import find_requirements, find_stakeholders
+
 
 def format_timestamp(dt: Optional[datetime] = None) -> str:
     """
@@ -113,6 +116,19 @@ def sanitize_filename(filename: str, max_length: int = 255) -> str:
     return sanitized or 'unnamed_file'
 
 
+def estimate_tokens(text: str) -> int:
+    """
+    Rough token count of a text (1 token ≈ 4 characters)
+    
+    Args:
+        text: Input text
+        
+    Returns:
+        Estimated number of tokens
+    """
+    return len(text) // 4
+
+
 def chunk_text(text: str, chunk_size: int = 1000, overlap: int = 100) -> List[str]:
     """
     Split text into overlapping chunks
@@ -209,67 +225,50 @@ def extract_requirements_from_text(text: str) -> List[str]:
     Returns:
         List of extracted requirement statements
     """
-    requirements = []
-    
-    # Common requirement indicators
-    indicators = [
-        r'must\s+(?:have|be|include|support)',
-        r'should\s+(?:have|be|include|support)',
-        r'shall\s+(?:have|be|include|support)',
-        r'required?\s+to',
-        r'needs?\s+to',
-        r'(?:will|would)\s+(?:have|include|support)',
-    ]
-    
-    pattern = '|'.join(indicators)
-    sentences = re.split(r'[.!?]+', text)
-    
-    for sentence in sentences:
-        sentence = sentence.strip()
-        if re.search(pattern, sentence, re.IGNORECASE):
-            if len(sentence.split()) >= 5:  # Minimum 5 words
-                requirements.append(sentence)
-    
-    return requirements
+    return find_requirements(text)
 
 
-def detect_conflicts_in_requirements(requirements: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+def detect_conflicts_in_requirements(
+    requirements: List[Dict[str, Any]],
+    topic_blocking: bool = False
+) -> List[Dict[str, Any]]:
     """
     Detect potential conflicts between requirements
     
+    Every pair is considered unless topic blocking is requested, in which case
+    only pairs sharing a topic term are (see app.utils.conflicts).
+    
     Args:
         requirements: List of requirement dictionaries
+        topic_blocking: Opt in to topic blocking for very large sets
         
     Returns:
         List of detected conflicts
     """
-    conflicts = []
-    conflict_patterns = [
-        (r'\bmust\b.*\bnot\b', r'\bmust\b'),  # Must vs must not
-        (r'\bq[1-4]\b', r'\bq[1-4]\b'),  # Different quarters
-        (r'\$[\d,]+', r'\$[\d,]+'),  # Different budget amounts
-        (r'\d+\s*(?:weeks?|months?|days?)', r'\d+\s*(?:weeks?|months?|days?)'),  # Different timelines
-    ]
+    return find_conflicts(requirements, topic_blocking=topic_blocking)
+
+
+# Response headers for text/event-stream endpoints; disables proxy buffering
+# so events reach the client as they are produced
+SSE_HEADERS = {
+    'Cache-Control': 'no-cache',
+    'X-Accel-Buffering': 'no'
+}
+
+
+def format_sse_event(event: str, data: Any) -> str:
+    """
+    Format a server-sent event
     
-    for i, req1 in enumerate(requirements):
-        for j, req2 in enumerate(requirements[i+1:], start=i+1):
-            text1 = req1.get('text', '').lower()
-            text2 = req2.get('text', '').lower()
-            
-            for pattern1, pattern2 in conflict_patterns:
-                match1 = re.search(pattern1, text1, re.IGNORECASE)
-                match2 = re.search(pattern2, text2, re.IGNORECASE)
-                
-                if match1 and match2 and match1.group() != match2.group():
-                    conflicts.append({
-                        'id': f'conflict_{len(conflicts) + 1}',
-                        'type': 'value_mismatch',
-                        'requirement_1': req1,
-                        'requirement_2': req2,
-                        'description': f"Potential conflict: '{match1.group()}' vs '{match2.group()}'"
-                    })
-    
-    return conflicts
+    Args:
+        event: Event name
+        data: JSON-serializable payload
+        
+    Returns:
+        SSE frame ready to be written to a text/event-stream response
+    """
+    payload = json.dumps(data, ensure_ascii=False)
+    return f"event: {event}\ndata: {payload}\n\n"
 
 
 def format_brd_section(section_id: str, content: Any) -> str:
@@ -343,32 +342,7 @@ def extract_stakeholders(text: str) -> List[Dict[str, str]]:
     Returns:
         List of stakeholder dictionaries
     """
-    stakeholders = []
-    
-    # Pattern to match names with roles
-    # E.g., "John Doe (CEO)", "Sarah Smith - Product Manager"
-    patterns = [
-        r'([A-Z][a-z]+\s+[A-Z][a-z]+)\s*[\(\-]\s*([A-Z][A-Za-z\s]+)[\)]',
-        r'([A-Z][a-z]+\s+[A-Z][a-z]+),\s*([A-Z][A-Za-z\s]+)',
-    ]
-    
-    for pattern in patterns:
-        matches = re.finditer(pattern, text)
-        for match in matches:
-            stakeholders.append({
-                'name': match.group(1).strip(),
-                'role': match.group(2).strip()
-            })
-    
-    # Deduplicate by name
-    seen_names = set()
-    unique_stakeholders = []
-    for stakeholder in stakeholders:
-        if stakeholder['name'] not in seen_names:
-            seen_names.add(stakeholder['name'])
-            unique_stakeholders.append(stakeholder)
-    
-    return unique_stakeholders
+    return find_stakeholders(text)
 
 
 def validate_brd_completeness(brd_content: Dict[str, Any], template: Dict[str, Any]) -> Dict[str, Any]:
@@ -439,11 +413,14 @@ __all__ = [
     'save_json_file',
     'extract_url_from_text',
     'sanitize_filename',
+    'estimate_tokens',
     'chunk_text',
     'calculate_confidence_score',
     'merge_dictionaries',
     'extract_requirements_from_text',
     'detect_conflicts_in_requirements',
+    'format_sse_event',
+    'SSE_HEADERS',
     'format_brd_section',
     'parse_smart_objectives',
     'extract_stakeholders',
@@ -0,0 +1,254 @@
+"""
+Incremental JSON parsing for streamed model output and large files
+"""
+
+import json
+import re
+from pathlib import Path
+from typing import Any, Iterable, Iterator, List, Optional, Tuple
+
+
+# Characters read from disk per step when streaming a file
+FILE_CHUNK_CHARS = 1 << 16
+
+# Extensions that are always read as one JSON document per line
+JSON_LINES_SUFFIXES = {'.jsonl', '.ndjson'}
+
+# Characters that change parser state outside and inside strings
+_STRUCTURAL = re.compile(r'["{}\[\],]')
+_STRING_SPECIAL = re.compile(r'["\\]')
+
+
+class IncrementalJSONParser:
+    """
+    Emit the top-level members of a JSON object or array as soon as each one is complete
+
+    Text before the opening brace/bracket (whitespace, a ```json fence, prose)
+    is ignored, as is anything after the top-level value closes. Object members
+    are emitted as (key, value) pairs and array elements as (index, value).
+    Consumed input is discarded, so memory is bounded by the largest member.
+    """
+
+    def __init__(self):
+        self._buffer = ''
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._container: Optional[str] = None
+        self._member_start = 0
+        self._member_emitted = False
+        self._index = 0
+        self.finished = False
+        self.errors = 0
+
+    def feed(self, chunk: str) -> List[Tuple[Any, Any]]:
+        """
+        Consume the next chunk of text
+
+        Args:
+            chunk: Next piece of the JSON document
+
+        Returns:
+            List of (key or index, value) for members completed by this chunk
+        """
+        if self.finished:
+            return []
+
+        self._buffer += chunk
+        buffer = self._buffer
+        members = []
+        i = self._pos
+
+        while not self.finished:
+            if self._in_string:
+                match = _STRING_SPECIAL.search(buffer, i)
+                if match is None:
+                    i = len(buffer)
+                    break
+                if match.group() == '\\':
+                    if match.end() >= len(buffer):
+                        # Escape split across chunks; resume at the backslash
+                        i = match.start()
+                        break
+                    i = match.end() + 1
+                    continue
+                self._in_string = False
+                i = match.end()
+                continue
+
+            if self._depth == 0:
+                start = _find_open(buffer, i)
+                if start < 0:
+                    i = len(buffer)
+                    break
+                self._container = buffer[start]
+                self._depth = 1
+                self._member_start = start + 1
+                self._member_emitted = False
+                i = start + 1
+                continue
+
+            match = _STRUCTURAL.search(buffer, i)
+            if match is None:
+                i = len(buffer)
+                break
+            char = match.group()
+            i = match.end()
+
+            if char == '"':
+                self._in_string = True
+            elif char in '{[':
+                self._depth += 1
+            elif char in '}]':
+                self._depth -= 1
+                if self._depth == 1:
+                    # A nested object/array member just closed
+                    self._emit(buffer, self._member_start, i, members)
+                    self._member_emitted = True
+                elif self._depth == 0:
+                    if not self._member_emitted:
+                        self._emit(buffer, self._member_start, i - 1, members)
+                    self.finished = True
+            elif char == ',' and self._depth == 1:
+                if not self._member_emitted:
+                    self._emit(buffer, self._member_start, i - 1, members)
+                self._member_start = i
+                self._member_emitted = False
+
+        # Drop everything before the member currently being read
+        cut = self._member_start if self._depth >= 1 else i
+        cut = min(cut, i)
+        self._buffer = buffer[cut:]
+        self._pos = i - cut
+        self._member_start -= cut
+        return members
+
+    def _emit(self, buffer: str, start: int, end: int, members: List[Tuple[Any, Any]]):
+        """Decode one complete member and append it to the output"""
+        text = buffer[start:end].strip()
+        if not text:
+            return
+        try:
+            if self._container == '{':
+                members.extend(json.loads('{' + text + '}').items())
+            else:
+                members.append((self._index, json.loads(text)))
+                self._index += 1
+        except json.JSONDecodeError:
+            self.errors += 1
+
+
+def _find_open(buffer: str, start: int) -> int:
+    """Position of the first '{' or '[' at or after start, -1 if none"""
+    brace = buffer.find('{', start)
+    bracket = buffer.find('[', start)
+    if brace < 0:
+        return bracket
+    if bracket < 0:
+        return brace
+    return min(brace, bracket)
+
+
+def iter_json_records(file_path: str, chunk_size: int = FILE_CHUNK_CHARS) -> Iterator[Any]:
+    """
+    Yield the records of a JSON array or JSON-lines file one at a time
+
+    A top-level array yields its elements and a JSON-lines file (.jsonl,
+    .ndjson, or any file whose first line is a complete object) yields one
+    record per line, so memory stays bounded by the largest record rather
+    than the file. A single top-level object is yielded as one record.
+    Malformed elements/lines are skipped and reported once at the end.
+
+    Args:
+        file_path: Path to the JSON or JSON-lines file
+        chunk_size: Characters read per step
+
+    Returns:
+        Iterator over the decoded records
+
+    Raises:
+        OSError: If the file cannot be read
+        ValueError: If the file is not a JSON array, object or JSON lines
+    """
+    with open(file_path, 'r', encoding='utf-8-sig') as f:
+        if Path(file_path).suffix.lower() in JSON_LINES_SUFFIXES:
+            yield from _iter_json_lines(f, file_path)
+            return
+
+        head = f.read(chunk_size)
+        start = head.lstrip()[:1]
+        if not start:
+            return
+
+        if start == '[':
+            parser = IncrementalJSONParser()
+            chunk = head
+            while chunk:
+                for _, record in parser.feed(chunk):
+                    yield record
+                if parser.finished:
+                    break
+                chunk = f.read(chunk_size)
+            if parser.errors:
+                print(f"⚠️  Skipped {parser.errors} malformed records in {file_path}")
+            if not parser.finished:
+                print(f"⚠️  {file_path} ended before its JSON array was closed")
+            return
+
+        if start != '{':
+            raise ValueError(f"Expected a JSON array, object or JSON lines in {file_path}")
+
+        # One object per line, or a single (possibly pretty-printed) object?
+        f.seek(0)
+        first_line = f.readline()
+        while first_line and not first_line.strip():
+            first_line = f.readline()
+        try:
+            json.loads(first_line)
+        except json.JSONDecodeError:
+            f.seek(0)
+            yield json.load(f)
+            return
+        f.seek(0)
+        yield from _iter_json_lines(f, file_path)
+
+
+def write_json_array(records: Iterable[Any], file_path: str) -> int:
+    """
+    Write records to a JSON array file one at a time
+
+    The output reads back with load_json_file or iter_json_records, and the
+    records are never all held in memory.
+
+    Args:
+        records: Records to write (any iterable, e.g. a generator)
+        file_path: Output path
+
+    Returns:
+        Number of records written
+    """
+    count = 0
+    Path(file_path).parent.mkdir(parents=True, exist_ok=True)
+    with open(file_path, 'w', encoding='utf-8') as f:
+        f.write('[')
+        for record in records:
+            f.write(',\n' if count else '\n')
+            f.write(json.dumps(record, ensure_ascii=False))
+            count += 1
+        f.write('\n]\n')
+    return count
+
+
+def _iter_json_lines(f, file_path: str) -> Iterator[Any]:
+    """Decode one record per non-blank line, skipping malformed lines"""
+    skipped = 0
+    for line in f:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError:
+            skipped += 1
+    if skipped:
+        print(f"⚠️  Skipped {skipped} malformed lines in {file_path}")
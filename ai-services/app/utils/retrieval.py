@@ -0,0 +1,165 @@
+"""
+In-process BM25 retrieval
+An inverted index over short texts (source items and transcript chunks) with
+Okapi BM25 ranking; postings are kept in compact typed arrays
+"""
+
+import heapq
+import math
+from array import array
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Okapi BM25 parameters
+BM25_K1 = 1.2
+BM25_B = 0.75
+# Words are cut to this many characters, so "requirement(s)" and "required" share a term
+STEM_CHARS = 6
+
+STOPWORDS = {
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'but', 'by', 'for', 'from', 'has', 'have', 'he', 'her',
+    'his', 'i', 'if', 'in', 'into', 'is', 'it', 'its', 'me', 'my', 'no', 'not', 'of', 'on', 'or', 'our',
+    'she', 'so', 'that', 'the', 'their', 'them', 'then', 'there', 'these', 'they', 'this', 'to', 'up',
+    'us', 'was', 'we', 'were', 'what', 'when', 'which', 'who', 'will', 'with', 'you', 'your',
+}
+
+# Byte table mapping everything but [a-z0-9] to a space. Splitting the
+# translated ASCII bytes yields the same words as re.findall(r'[a-z0-9]+')
+# on the lowercased text (each non-ASCII character becomes one '?', so it
+# still separates words) at several times the speed.
+_ALNUM = frozenset(b'abcdefghijklmnopqrstuvwxyz0123456789')
+_SEPARATE = bytes(byte if byte in _ALNUM else 32 for byte in range(256))
+
+
+def _words(text: str) -> List[bytes]:
+    """Lowercase ASCII alphanumeric words of a text"""
+    return text.lower().encode('ascii', 'replace').translate(_SEPARATE).split()
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Index terms of a text
+
+    Args:
+        text: Input text
+
+    Returns:
+        Lowercased, stemmed terms in text order (stopwords and one-character words dropped)
+    """
+    terms = []
+    for word in _words(text):
+        term = word[:STEM_CHARS].decode('ascii')
+        if len(word) > 1 and term not in STOPWORDS:
+            terms.append(term)
+    return terms
+
+
+class BM25Index:
+    """
+    Inverted index with BM25 scoring
+
+    Built once from a list of texts; document IDs are positions in that list.
+    Each term's postings are one typed array holding a document ID per
+    occurrence (ascending), so term frequencies are counted when a query
+    first touches the term, and the per-document length normalization is
+    precomputed. Query terms are stems (see tokenize); document lengths
+    count every word.
+    """
+
+    def __init__(self, texts: Iterable[str], k1: float = BM25_K1, b: float = BM25_B):
+        """
+        Index texts
+
+        Args:
+            texts: Documents to index
+            k1: Term frequency saturation
+            b: Length normalization strength
+        """
+        self.k1 = k1
+        occurrences = defaultdict(list)
+        lengths = array('l')
+        for doc_id, text in enumerate(texts):
+            words = _words(text)
+            lengths.append(len(words))
+            for word in words:
+                occurrences[word].append(doc_id)
+
+        # Merge words into their stems (most stems have a single word)
+        stems = defaultdict(list)
+        for word in occurrences:
+            stems[word[:STEM_CHARS]].append(word)
+        self.postings: Dict[str, array] = {}
+        for stem, words in stems.items():
+            if len(words) == 1:
+                doc_ids = occurrences[words[0]]
+            else:
+                doc_ids = sorted(doc_id for word in words for doc_id in occurrences[word])
+            self.postings[stem.decode('ascii')] = array('l', doc_ids)
+        self._frequencies: Dict[str, Counter] = {}
+
+        self.doc_count = len(lengths)
+        self.avg_length = (sum(lengths) / self.doc_count) if self.doc_count else 0.0
+        avg_length = self.avg_length or 1.0
+        # k1 * (1 - b + b * |d| / avgdl) for every document
+        self.norms = array('d', (k1 * (1 - b + b * length / avg_length) for length in lengths))
+
+    def __len__(self) -> int:
+        return self.doc_count
+
+    def frequencies(self, term: str) -> Counter:
+        """Document ID -> occurrences of a term (cached per term)"""
+        counts = self._frequencies.get(term)
+        if counts is None:
+            counts = self._frequencies[term] = Counter(self.postings.get(term, ()))
+        return counts
+
+    def idf(self, term: str) -> float:
+        """BM25 inverse document frequency (never negative)"""
+        frequency = len(self.frequencies(term))
+        return math.log(1 + (self.doc_count - frequency + 0.5) / (frequency + 0.5))
+
+    def scores(self, terms: Iterable[str]) -> Dict[int, float]:
+        """
+        BM25 score of every document matching at least one term
+
+        Args:
+            terms: Query terms (stems, e.g. from tokenize); stopwords are ignored
+
+        Returns:
+            Document ID -> score
+        """
+        scores: Dict[int, float] = {}
+        norms = self.norms
+        k1_plus_one = self.k1 + 1
+        for term in set(terms):
+            if term in STOPWORDS or term not in self.postings:
+                continue
+            idf = self.idf(term)
+            for doc_id, frequency in self.frequencies(term).items():
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * frequency * k1_plus_one / (frequency + norms[doc_id])
+        return scores
+
+    def search(self, terms: Iterable[str], limit: Optional[int] = None) -> List[Tuple[int, float]]:
+        """
+        Documents ranked by BM25 score
+
+        Args:
+            terms: Query terms (stems, e.g. from tokenize)
+            limit: Most results to return (all matches by default)
+
+        Returns:
+            (document ID, score) pairs, best first; ties keep document order
+        """
+        scores = self.scores(terms)
+        if limit is None:
+            return sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        return heapq.nsmallest(limit, scores.items(), key=lambda item: (-item[1], item[0]))
+
+    def get_stats(self) -> Dict[str, float]:
+        """Get index size counters"""
+        return {
+            'documents': self.doc_count,
+            'terms': len(self.postings),
+            'occurrences': sum(len(posting) for posting in self.postings.values()),
+            'avg_document_words': round(self.avg_length, 1),
+        }
@@ -0,0 +1,269 @@
+"""
+Typed facts extracted from BRD text
+Budgets, dates, quarters, durations, platform versions and metrics are
+normalized (amounts in cents, dates as day ranges, durations in days) so
+equal values written differently compare equal
+"""
+
+import calendar
+import math
+import re
+from datetime import date, timedelta
+from decimal import Decimal, InvalidOperation
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+# Fact values are kept within a signed 64-bit integer
+INT64_MIN, INT64_MAX = -2 ** 63, 2 ** 63 - 1
+
+AMOUNT_MULTIPLIERS = {
+    'k': 1000, 'thousand': 1000,
+    'm': 1000000, 'mm': 1000000, 'million': 1000000,
+    'b': 1000000000, 'bn': 1000000000, 'billion': 1000000000,
+}
+# 150000, 150,000 or 1.5 (a trailing comma is punctuation, not part of the number)
+_NUMBER = r'(\d{1,3}(?:,\d{3})+(?:\.\d+)?|\d+(?:\.\d+)?)'
+_AMOUNT_SCALE = r'(?:\s*(thousand|million|billion|bn|mm|k|m|b)\b)?'
+AMOUNT_PATTERN = re.compile(
+    rf'(?:\$|\busd\s*){_NUMBER}{_AMOUNT_SCALE}'
+    rf'|\b{_NUMBER}{_AMOUNT_SCALE}\s*(?:usd|dollars)\b',
+    re.IGNORECASE
+)
+
+DURATION_UNIT_DAYS = {'day': 1, 'business day': 7 / 5, 'week': 7, 'sprint': 14, 'month': 30, 'year': 365}
+NUMBER_WORDS = {
+    'one': 1, 'two': 2, 'three': 3, 'four': 4, 'five': 5, 'six': 6,
+    'seven': 7, 'eight': 8, 'nine': 9, 'ten': 10, 'eleven': 11, 'twelve': 12,
+}
+_DURATION_NUMBER = r'(\d+(?:\.\d+)?|' + '|'.join(NUMBER_WORDS) + r')'
+DURATION_PATTERN = re.compile(
+    rf'\b{_DURATION_NUMBER}(?:\s*(?:-|–|to)\s*{_DURATION_NUMBER})?[\s-]*'
+    r'(business days?|days?|weeks?|sprints?|months?|years?)\b',
+    re.IGNORECASE
+)
+
+MONTHS = {
+    'jan': 1, 'feb': 2, 'mar': 3, 'apr': 4, 'may': 5, 'jun': 6,
+    'jul': 7, 'aug': 8, 'sep': 9, 'oct': 10, 'nov': 11, 'dec': 12,
+}
+_MONTH_NAME = r'(?:jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?|aug(?:ust)?|sep(?:t(?:ember)?)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?)'
+WEEKDAYS = {'monday': 0, 'tuesday': 1, 'wednesday': 2, 'thursday': 3, 'friday': 4, 'saturday': 5, 'sunday': 6}
+DATE_PATTERN = re.compile(
+    # 2024-03-15
+    r'\b(?P<iso_y>\d{4})-(?P<iso_m>\d{1,2})-(?P<iso_d>\d{1,2})\b'
+    # 03/15/2024 (US ordering)
+    r'|\b(?P<us_m>\d{1,2})/(?P<us_d>\d{1,2})/(?P<us_y>\d{4})\b'
+    # March 15, 2024 / March 15 / March 2024
+    rf'|\b(?P<md_month>{_MONTH_NAME})\.?(?:\s+(?P<md_d>\d{{1,2}})(?:st|nd|rd|th)?\b)?(?:,?\s+(?P<md_y>\d{{4}}))?\b'
+    # 15 March 2024
+    rf'|\b(?P<dm_d>\d{{1,2}})(?:st|nd|rd|th)?\s+(?P<dm_month>{_MONTH_NAME})\b(?:,?\s+(?P<dm_y>\d{{4}}))?'
+    # Relative to the source's date
+    r'|\b(?:by\s+|at\s+)?(?:the\s+)?end\s+of\s+(?:the\s+)?(?P<end_of>week|month|quarter|year)\b'
+    r'|\bnext\s+(?P<next>week|month)\b'
+    r'|\b(?P<day_word>today|tomorrow)\b'
+    r'|\b(?:by|on|until|before)\s+(?:next\s+)?(?P<weekday>monday|tuesday|wednesday|thursday|friday|saturday|sunday)\b',
+    re.IGNORECASE
+)
+QUARTER_PATTERN = re.compile(r"\bq([1-4])(?:\s*(?:'(\d{2})|(?:fy\s*)?((?:19|20)\d{2})))?\b", re.IGNORECASE)
+
+VERSION_SUBJECTS = {
+    'ios': 'ios', 'ipados': 'ipados', 'android': 'android', 'macos': 'macos', 'windows': 'windows',
+    'python': 'python', 'node': 'node', 'node.js': 'node', 'nodejs': 'node', 'java': 'java',
+    'oauth': 'oauth', 'tls': 'tls', 'http': 'http', 'react': 'react', 'postgres': 'postgres',
+    'postgresql': 'postgres', 'mongodb': 'mongodb',
+}
+VERSION_PATTERN = re.compile(
+    r'\b(ios|ipados|android|macos|windows|python|node\.js|nodejs|node|java|oauth|tls|http|react|postgresql|postgres|mongodb)'
+    r'\s*v?(\d{1,4})(?:\.(\d{1,3}))?(?:\.(\d{1,3}))?\b',
+    re.IGNORECASE
+)
+PERCENT_PATTERN = re.compile(r'(\d+(?:\.\d+)?)\s*(?:%|percent\b)', re.IGNORECASE)
+METRIC_PATTERN = re.compile(
+    rf'\b{_NUMBER}\s*(k|m)?\s*(users?|customers?|sales?|downloads?|transactions?|orders?|requests?)\b',
+    re.IGNORECASE
+)
+
+PATTERNS = {
+    'amount': AMOUNT_PATTERN, 'date': DATE_PATTERN, 'quarter': QUARTER_PATTERN, 'duration': DURATION_PATTERN,
+    'version': VERSION_PATTERN, 'percent': PERCENT_PATTERN, 'metric': METRIC_PATTERN,
+}
+# For lowercased ASCII text, where case-sensitive matching is equivalent and faster
+LOWERCASE_PATTERNS = {kind: re.compile(pattern.pattern) for kind, pattern in PATTERNS.items()}
+
+
+class TypedFact(NamedTuple):
+    """One normalized fact; low/high are cents, day ordinals, days, version codes, basis points or counts"""
+    kind: str
+    low: int
+    high: int
+    subject: str
+    start: int
+    end: int
+    text: str
+
+
+def extract_typed_facts(text: str, reference_date: Optional[date] = None) -> List[TypedFact]:
+    """
+    Extract and normalize every typed fact in a text
+
+    Year-less dates and quarters and relative expressions ("end of week",
+    "next month", "by Friday") resolve against reference_date and are
+    skipped without one. Numbers too large for a signed 64-bit value
+    (e.g. a long digit run after "$") are skipped.
+
+    Args:
+        text: Source text
+        reference_date: Date the text was written
+
+    Returns:
+        Facts in (kind, position) order
+    """
+    patterns, haystack = _patterns_for(text)
+    # Cheap substring checks skip the kinds a text cannot contain
+    lowered = haystack if patterns is LOWERCASE_PATTERNS else text.lower()
+    facts = []
+
+    def add(kind: str, low: int, high: int, subject: str, match: re.Match):
+        if not (INT64_MIN <= low <= INT64_MAX and INT64_MIN <= high <= INT64_MAX):
+            return
+        # Matched text from the original, not the lowercased haystack
+        facts.append(TypedFact(kind, low, high, subject, match.start(), match.end(), text[match.start():match.end()]))
+
+    if '$' in lowered or 'usd' in lowered or 'dollar' in lowered:
+        for match in patterns['amount'].finditer(haystack):
+            cents = _amount_cents(match.group(1) or match.group(3), match.group(2) or match.group(4))
+            if cents is not None:
+                add('amount', cents, cents, '', match)
+
+    for match in patterns['date'].finditer(haystack):
+        days = _date_range(match, reference_date)
+        if days is not None:
+            add('date', days[0], days[1], '', match)
+
+    for match in patterns['quarter'].finditer(haystack):
+        year = _quarter_year(match, reference_date)
+        if year is not None:
+            quarter = int(match.group(1))
+            add('quarter', date(year, quarter * 3 - 2, 1).toordinal(), _month_end(year, quarter * 3).toordinal(), '', match)
+
+    for match in patterns['duration'].finditer(haystack):
+        low = _number(match.group(1))
+        high = _number(match.group(2)) if match.group(2) else low
+        days = DURATION_UNIT_DAYS[match.group(3).lower().rstrip('s')]
+        # float() of a few hundred digits is inf, which round() cannot convert
+        if math.isfinite(low * days) and math.isfinite(high * days):
+            add('duration', round(low * days), round(high * days), '', match)
+
+    for match in patterns['version'].finditer(haystack):
+        code = int(match.group(2)) * 1000000 + int(match.group(3) or 0) * 1000 + int(match.group(4) or 0)
+        add('version', code, code, VERSION_SUBJECTS[match.group(1).lower()], match)
+
+    if '%' in lowered or 'percent' in lowered:
+        for match in patterns['percent'].finditer(haystack):
+            basis_points = int(Decimal(match.group(1)) * 100)
+            add('percent', basis_points, basis_points, '', match)
+
+    for match in patterns['metric'].finditer(haystack):
+        count = _amount_cents(match.group(1), match.group(2))
+        if count is not None:
+            count //= 100
+            add('metric', count, count, match.group(3).lower().rstrip('s'), match)
+    return facts
+
+
+def _patterns_for(text: str) -> Tuple[Dict[str, re.Pattern], str]:
+    """Case-sensitive patterns over lowercased text for ASCII (same matches, faster), else IGNORECASE"""
+    if text.isascii():
+        return LOWERCASE_PATTERNS, text.lower()
+    return PATTERNS, text
+
+
+def _number(word: str) -> float:
+    """Digits or a number word as a float"""
+    return float(NUMBER_WORDS.get(word.lower(), word))
+
+
+def _amount_cents(number: str, scale: Optional[str]) -> Optional[int]:
+    """'150' + 'K' -> 15000000 (None if it does not fit a signed 64-bit value)"""
+    try:
+        value = Decimal(number.replace(',', ''))
+    except InvalidOperation:
+        return None
+    # Decimal arithmetic rounds to 28 significant digits, so bound the exact
+    # value before scaling rather than the (possibly rounded) result
+    if value.adjusted() > 18:
+        return None
+    if scale:
+        value *= AMOUNT_MULTIPLIERS[scale.lower()]
+    cents = int(value * 100)
+    return cents if cents <= INT64_MAX else None
+
+
+def _month_end(year: int, month: int) -> date:
+    return date(year, month, calendar.monthrange(year, month)[1])
+
+
+def _quarter_year(match: re.Match, reference_date: Optional[date]) -> Optional[int]:
+    if match.group(3):
+        return int(match.group(3))
+    if match.group(2):
+        return 2000 + int(match.group(2))
+    return reference_date.year if reference_date else None
+
+
+def _date_range(match: re.Match, reference: Optional[date]) -> Optional[Tuple[int, int]]:
+    """First and last day (as ordinals) a date expression covers"""
+    groups = match.groupdict()
+    try:
+        if groups['iso_y']:
+            day = date(int(groups['iso_y']), int(groups['iso_m']), int(groups['iso_d']))
+            return day.toordinal(), day.toordinal()
+        if groups['us_y']:
+            day = date(int(groups['us_y']), int(groups['us_m']), int(groups['us_d']))
+            return day.toordinal(), day.toordinal()
+
+        month_name = groups['md_month'] or groups['dm_month']
+        if month_name:
+            month = MONTHS[month_name[:3].lower()]
+            day_number = groups['md_d'] or groups['dm_d']
+            year_text = groups['md_y'] or groups['dm_y']
+            if not day_number and not year_text:
+                # A bare month name ("may", "march") is too ambiguous
+                return None
+            year = int(year_text) if year_text else (reference.year if reference else None)
+            if year is None:
+                return None
+            if day_number:
+                day = date(year, month, int(day_number))
+                return day.toordinal(), day.toordinal()
+            return date(year, month, 1).toordinal(), _month_end(year, month).toordinal()
+    except ValueError:
+        # Out-of-range day or month
+        return None
+
+    if reference is None:
+        return None
+    if groups['end_of']:
+        unit = groups['end_of'].lower()
+        if unit == 'week':
+            day = reference + timedelta(days=max(4 - reference.weekday(), 0))
+        elif unit == 'month':
+            day = _month_end(reference.year, reference.month)
+        elif unit == 'quarter':
+            day = _month_end(reference.year, ((reference.month - 1) // 3 + 1) * 3)
+        else:
+            day = date(reference.year, 12, 31)
+        return day.toordinal(), day.toordinal()
+    if groups['next']:
+        if groups['next'].lower() == 'week':
+            monday = reference + timedelta(days=7 - reference.weekday())
+            return monday.toordinal(), (monday + timedelta(days=6)).toordinal()
+        year, month = (reference.year + 1, 1) if reference.month == 12 else (reference.year, reference.month + 1)
+        return date(year, month, 1).toordinal(), _month_end(year, month).toordinal()
+    if groups['day_word']:
+        day = reference + timedelta(days=1 if groups['day_word'].lower() == 'tomorrow' else 0)
+        return day.toordinal(), day.toordinal()
+    if groups['weekday']:
+        day = reference + timedelta(days=(WEEKDAYS[groups['weekday'].lower()] - reference.weekday()) % 7)
+        return day.toordinal(), day.toordinal()
+    return None
+
@@ -0,0 +1,7 @@
+"""Shared test setup: the service singletons are built on import, so run them offline"""
+
+import os
+
+os.environ.setdefault('LLM_BACKEND', 'stub')
+os.environ.setdefault('STUB_LATENCY_MS', '0')
+os.environ.setdefault('LLM_CACHE_PATH', '')
@@ -0,0 +1,115 @@
+"""ConflictPrescreen verdict reuse with a scripted confirmation reply"""
+
+import asyncio
+
+from app.services.conflict_prescreen import ConflictPrescreen
+
+BRD = {
+    'timeline': 'Launch must be in Q2 2025 and take 8 weeks.',
+    'scope': 'Launch must be in Q4 2025 and take 12 weeks.',
+}
+
+
+class ScriptedLLM:
+    """Returns the given parsed replies in order and counts calls"""
+
+    def __init__(self, *replies):
+        self.replies = list(replies)
+        self.calls = 0
+
+    async def generate_content_with_json(self, prompt, max_tokens=2000):
+        self.calls += 1
+        return self.replies.pop(0)
+
+
+def check(prescreen: ConflictPrescreen):
+    return asyncio.run(prescreen.detect(BRD, project_id='project-1'))
+
+
+def test_verdicts_are_reused_for_unchanged_sections():
+    llm = ScriptedLLM({'conflicts': []})
+    prescreen = ConflictPrescreen(llm=llm)
+
+    assert check(prescreen) == []
+    assert check(prescreen) == []
+    assert llm.calls == 1
+    assert prescreen.get_stats()['verdicts_reused'] > 0
+
+
+def test_unparseable_reply_is_not_cached_as_no_conflict():
+    llm = ScriptedLLM({'content': 'not JSON'}, [])
+    prescreen = ConflictPrescreen(llm=llm)
+
+    assert check(prescreen) == []
+    assert check(prescreen) == []
+    assert llm.calls == 2
+    assert prescreen.get_stats()['unparsed_replies'] == 1
+
+
+def test_proposed_edit_check_leaves_project_state_alone():
+    llm = ScriptedLLM({'conflicts': []}, {'conflicts': []}, {'conflicts': []})
+    prescreen = ConflictPrescreen(llm=llm)
+    check(prescreen)
+    state = prescreen._projects['project-1']
+    verdicts, sections = dict(state.verdicts), dict(state.sections)
+
+    edited = dict(BRD, scope='Launch must be in Q3 2025 and take 10 weeks.')
+    asyncio.run(prescreen.detect(edited, project_id='project-1', persist=False))
+    asyncio.run(prescreen.detect(BRD, project_id='project-2', persist=False))
+
+    assert llm.calls == 3
+    assert state.verdicts == verdicts and state.sections == sections
+    assert 'project-2' not in prescreen._projects
+
+
+def test_edit_check_skips_unparsed_edit_reply():
+    from app.routes import chat
+
+    checks = chat.conflict_prescreen.stats['checks']
+    suggestions = asyncio.run(chat.check_edited_sections('project-1', BRD, {'content': 'not JSON'}))
+
+    assert suggestions == []
+    assert chat.conflict_prescreen.stats['checks'] == checks
+
+
+SECTIONED_BRD = {
+    'timeline': 'Launch must be in Q2 2025.',
+    'scope': 'Launch must be in Q4 2025.',
+    'budget': 'The budget is $100,000 in total.',
+    'costs': 'The budget is $150,000 in total.',
+}
+
+
+def test_edited_section_invalidates_only_its_pairs():
+    llm = ScriptedLLM({'conflicts': []}, {'conflicts': []})
+    prescreen = ConflictPrescreen(llm=llm)
+    asyncio.run(prescreen.detect(SECTIONED_BRD, project_id='project-1'))
+    state = prescreen._projects['project-1']
+    timeline_statements = state.sections['timeline'][1]
+    assert len(state.verdicts) == 2 and prescreen.stats['sections_extracted'] == 4
+
+    edited = dict(SECTIONED_BRD, costs='The budget is $200,000 in total.')
+    asyncio.run(prescreen.detect(edited, project_id='project-1'))
+
+    stats = prescreen.get_stats()
+    assert llm.calls == 2
+    assert stats['sections_extracted'] == 5 and stats['sections_reused'] == 3
+    assert stats['candidates_sent'] == 3 and stats['verdicts_reused'] == 1
+    assert state.sections['timeline'][1] is timeline_statements
+    assert len(state.verdicts) == 2
+
+    del edited['scope']
+    asyncio.run(prescreen.detect(edited, project_id='project-1'))
+
+    assert llm.calls == 2
+    assert 'scope' not in state.sections and len(state.verdicts) == 1
+
+
+def test_candidates_past_the_limit_are_reported():
+    llm = ScriptedLLM({'conflicts': []})
+    prescreen = ConflictPrescreen(llm=llm, max_candidates=1)
+
+    result = asyncio.run(prescreen.check(SECTIONED_BRD, project_id='project-1'))
+
+    assert result['candidates'] == 1 and result['truncated_candidates'] == 1
+    assert prescreen.get_stats()['candidates_truncated'] == 1
@@ -0,0 +1,29 @@
+"""Indexed conflict detection: exact by default, topic blocking only on request"""
+
+from app.utils.conflicts import find_conflicts
+from app.utils.helpers import detect_conflicts_in_requirements
+
+
+def requirements_with_unrelated_conflict(padding):
+    """Two conflicting requirements on different topics, followed by fact-free filler"""
+    requirements = [
+        {'id': 'REQ-1', 'text': 'Checkout redesign goes live in Q1'},
+        {'id': 'REQ-2', 'text': 'Partner portal opens in Q3'},
+    ]
+    requirements.extend({'id': f'FILL-{index}', 'text': f'Filler statement {index}'} for index in range(padding))
+    return requirements
+
+
+def test_large_sets_keep_every_pair_by_default():
+    requirements = requirements_with_unrelated_conflict(2500)
+
+    conflicts = detect_conflicts_in_requirements(requirements)
+
+    assert [(c['requirement_1']['id'], c['requirement_2']['id']) for c in conflicts] == [('REQ-1', 'REQ-2')]
+
+
+def test_topic_blocking_is_opt_in():
+    requirements = requirements_with_unrelated_conflict(10)
+
+    assert len(find_conflicts(requirements)) == 1
+    assert find_conflicts(requirements, topic_blocking=True) == []
@@ -0,0 +1,48 @@
+"""CorpusIngester on a small generated mbox, in-process and across worker processes"""
+
+import pytest
+
+from app.services.corpus_ingest import CorpusIngester
+
+MESSAGE = """From sender@example.com Mon Jan  1 00:00:00 2024
+Message-ID: <{index}@example.com>
+From: Alice <alice@example.com>
+To: Bob <bob@example.com>
+Subject: Update {index}
+Date: Mon, 1 Jan 2024 10:00:00 +0000
+
+The system must support export {index}.
+
+"""
+
+
+def fail_on_second(record):
+    """Transform that breaks on one message (module-level so worker processes can run it)"""
+    if record['subject'] == 'Update 1':
+        raise ValueError('bad record')
+    record['seen'] = True
+    return record
+
+
+@pytest.fixture
+def mbox(tmp_path):
+    path = tmp_path / 'inbox.mbox'
+    path.write_text(''.join(MESSAGE.format(index=index) for index in range(4)))
+    return str(path)
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_transform_error_skips_only_that_record(mbox, workers):
+    ingester = CorpusIngester(workers=workers, batch_size=2)
+
+    records = list(ingester.iter_mbox([mbox], transform=fail_on_second))
+
+    assert [record['subject'] for record in records] == ['Update 0', 'Update 2', 'Update 3']
+    assert all(record['seen'] for record in records)
+    stats = ingester.get_stats()
+    assert stats['records'] == 3 and stats['skipped'] == 1
+
+
+def test_pool_is_opt_in(monkeypatch):
+    monkeypatch.delenv('INGEST_WORKERS', raising=False)
+    assert CorpusIngester().workers == 1
@@ -0,0 +1,98 @@
+"""CrawlerService against the local fixture web server"""
+
+import asyncio
+import time
+
+import pytest
+
+from app.scripts.bench_fixtures import build_site, start_fixture_server
+from app.services.crawler_service import CrawlerService
+from app.services.scraper_service import ScraperService
+
+
+@pytest.fixture
+def env(monkeypatch):
+    monkeypatch.setenv('SCRAPER_FETCH_MODE', 'http')
+    monkeypatch.setenv('SCRAPE_CACHE_ENABLED', 'false')
+    monkeypatch.setenv('CRAWL_PER_DOMAIN_CONCURRENCY', '2')
+    monkeypatch.setenv('CRAWL_MAX_CONCURRENCY', '8')
+
+
+def run_crawl(site, urls_for, slow_scrape: float = 0.0, **kwargs):
+    """Serve `site`, crawl the URLs built by urls_for(base_url) and return (result, crawler, concurrency peaks)"""
+    async def main():
+        runner, base_url = await start_fixture_server(site)
+        scraper = ScraperService()
+        crawler = CrawlerService(scraper)
+        active, peak = {}, {}
+        scrape = scraper.scrape
+
+        async def tracked_scrape(url, *args, **kw):
+            host = url.split('/')[2]
+            active[host] = active.get(host, 0) + 1
+            peak[host] = max(peak.get(host, 0), active[host])
+            try:
+                await asyncio.sleep(slow_scrape)
+                return await scrape(url, *args, **kw)
+            finally:
+                active[host] -= 1
+
+        scraper.scrape = tracked_scrape
+        try:
+            result = await crawler.crawl(urls_for(base_url), **kwargs)
+        finally:
+            await scraper.close()
+            await runner.cleanup()
+        return result, crawler, peak
+
+    return asyncio.run(main())
+
+
+def test_robots_disallow_is_respected(env):
+    result, _, _ = run_crawl(
+        build_site(pages=3, paragraphs=5),
+        lambda base: [f"{base}/private/admin.html", f"{base}/pages/1.html"]
+    )
+    statuses = {page['url'].split('/', 3)[3]: page['status'] for page in result['pages']}
+    assert statuses == {'private/admin.html': 'blocked_by_robots', 'pages/1.html': 'ok'}
+
+
+def test_depth_and_max_pages_limits(env):
+    site = build_site(pages=20, paragraphs=12)
+
+    result, _, _ = run_crawl(site, lambda base: [f"{base}/"], max_depth=0)
+    assert [page['depth'] for page in result['pages']] == [0]
+
+    result, _, _ = run_crawl(site, lambda base: [f"{base}/"], max_depth=1, max_pages=5)
+    assert len(result['pages']) == 5
+    assert result['stats']['discovered'] == 5
+    assert {page['depth'] for page in result['pages']} == {0, 1}
+    # The admin link is discovered but never fetched
+    assert all(page['status'] in ('ok', 'blocked_by_robots', 'error') for page in result['pages'])
+
+
+def test_per_domain_concurrency_limit(env):
+    result, crawler, peak = run_crawl(
+        build_site(pages=10, paragraphs=5),
+        lambda base: [f"{base}/pages/{i}.html" for i in range(10)],
+        slow_scrape=0.05
+    )
+    assert result['stats']['ok'] == 10
+    assert list(peak.values()) == [2]
+    # Per-domain state is released once the crawl is done
+    assert crawler._domain_semaphores == {}
+    assert crawler._domain_active == {}
+    assert crawler._next_request_at == {}
+
+
+def test_crawl_delay_spaces_requests(env):
+    started = time.monotonic()
+    result, crawler, _ = run_crawl(
+        build_site(pages=3, paragraphs=5, crawl_delay=1),
+        lambda base: [f"{base}/pages/{i}.html" for i in range(3)]
+    )
+    elapsed = time.monotonic() - started
+    assert result['stats']['ok'] == 3
+    # Three requests one second apart: the last starts two seconds after the first
+    assert 2.0 <= elapsed < 5.0
+    assert crawler._domain_semaphores == {}
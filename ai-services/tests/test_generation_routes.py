@@ -0,0 +1,19 @@
+"""Request validation on the generation routes"""
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.routes import generation
+
+app = FastAPI()
+app.include_router(generation.router, prefix="/api/ai")
+client = TestClient(app)
+
+
+def test_unknown_generation_mode_is_rejected():
+    response = client.post('/api/ai/generate', json={
+        'project_id': 'project-1', 'data_sources': {}, 'generation_mode': 'paralel'
+    })
+
+    assert response.status_code == 422
+    assert response.json()['detail'][0]['loc'] == ['body', 'generation_mode']
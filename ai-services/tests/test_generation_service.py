@@ -0,0 +1,64 @@
+"""Incremental section generation with a scripted Gemini reply"""
+
+import asyncio
+
+import pytest
+
+from app.scripts.bench_fixtures import sample_data_sources
+from app.services import generation_service
+from app.services.generation_service import BRDGenerationService
+
+TEMPLATE = {
+    'name': 'test',
+    'sections': [
+        {'id': 'timeline', 'title': 'Timeline', 'description': 'Milestones, deadlines and schedule'},
+        {'id': 'budget', 'title': 'Budget', 'description': 'Costs, funding and finance approvals'},
+    ],
+}
+
+
+@pytest.fixture
+def service(monkeypatch):
+    """Generation service whose Gemini calls return the section ID, or fail for IDs in service.failing"""
+    monkeypatch.setenv('SECTION_GENERATION_RETRIES', '0')
+    service = BRDGenerationService()
+    service.failing = set()
+    service.calls = []
+
+    async def generate_content_with_json(prompt, max_tokens=2000):
+        section_id = next(section['id'] for section in TEMPLATE['sections'] if f"ID: {section['id']}" in prompt)
+        service.calls.append(section_id)
+        if section_id in service.failing:
+            raise TimeoutError('simulated timeout')
+        return {'title': section_id.title(), 'content': f"{section_id} content"}
+
+    monkeypatch.setattr(generation_service.gemini_service, 'generate_content_with_json', generate_content_with_json)
+    return service
+
+
+def generate(service, previous=None):
+    content, fingerprints = previous or (None, None)
+    return asyncio.run(service.generate_sections(TEMPLATE, sample_data_sources(20, 2, 20), content, fingerprints))
+
+
+def test_unchanged_sections_are_reused(service):
+    content, fingerprints, regenerated = generate(service)
+    assert regenerated == ['timeline', 'budget']
+
+    reused, _, regenerated = generate(service, (content, fingerprints))
+
+    assert regenerated == []
+    assert reused == content
+    assert len(service.calls) == 2
+
+
+def test_failed_section_is_regenerated(service):
+    service.failing.add('budget')
+    content, fingerprints, _ = generate(service)
+    assert content['budget']['completed'] is False and content['budget']['error']
+
+    service.failing.clear()
+    content, _, regenerated = generate(service, (content, fingerprints))
+
+    assert regenerated == ['budget']
+    assert content['budget'] == {'title': 'Budget', 'content': 'budget content', 'completed': True}
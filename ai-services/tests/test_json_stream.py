@@ -0,0 +1,75 @@
+"""IncrementalJSONParser across chunk boundaries and on truncated input"""
+
+import json
+
+import pytest
+
+from app.utils.json_stream import IncrementalJSONParser, iter_json_records
+
+DOCUMENT = {
+    'executive_summary': {'title': 'Summary {draft}', 'content': 'Costs, "risks" and [scope]'},
+    'escapes': 'back\\slash \\" quote \\\\ end',
+    'unicode': 'café — 🚀',
+    'list': [1, {'nested': ['a,b', '}]']}, None],
+    'flag': True,
+}
+TEXT = '```json\n' + json.dumps(DOCUMENT, indent=2) + '\n```\ntrailing prose }'
+ESCAPED_TEXT = json.dumps(DOCUMENT, ensure_ascii=True)
+
+
+def parse(chunks):
+    parser = IncrementalJSONParser()
+    members = []
+    for chunk in chunks:
+        members.extend(parser.feed(chunk))
+    return parser, members
+
+
+@pytest.mark.parametrize('text', [TEXT, ESCAPED_TEXT])
+def test_every_two_chunk_split_gives_the_same_members(text):
+    for split in range(len(text) + 1):
+        parser, members = parse([text[:split], text[split:]])
+        assert dict(members) == DOCUMENT, f"split at {split}: {text[split - 5:split + 5]!r}"
+        assert parser.finished and parser.errors == 0
+
+
+@pytest.mark.parametrize('text', [TEXT, ESCAPED_TEXT])
+def test_one_character_chunks(text):
+    parser, members = parse(text)
+
+    assert [key for key, _ in members] == list(DOCUMENT)
+    assert dict(members) == DOCUMENT
+
+
+def test_members_are_emitted_as_soon_as_complete():
+    parser = IncrementalJSONParser()
+
+    assert parser.feed('{"a": {"x": 1}, "b": "1, 2') == [('a', {'x': 1})]
+    assert parser.feed('"') == []  # a scalar member ends at the next comma or brace
+    assert parser.feed('}') == [('b', '1, 2')]
+    assert parser.finished
+
+
+def test_truncated_input_keeps_only_complete_members():
+    text = json.dumps(DOCUMENT)
+    for cut in range(len(text)):
+        parser, members = parse([text[:cut]])
+        assert not parser.finished
+        assert parser.errors == 0
+        assert members == list(DOCUMENT.items())[:len(members)]
+
+
+def test_array_elements_are_indexed_and_malformed_ones_counted():
+    parser, members = parse(['[{"id": 1}, {"id": ', '2}, {bad}, 3]'])
+
+    assert members == [(0, {'id': 1}), (1, {'id': 2}), (2, 3)]
+    assert parser.errors == 1 and parser.finished
+
+
+def test_truncated_array_file_yields_complete_records(tmp_path):
+    path = tmp_path / 'records.json'
+    path.write_text(json.dumps([{'id': index, 'text': 'a, "b"'} for index in range(5)])[:-20])
+
+    records = list(iter_json_records(str(path), chunk_size=7))
+
+    assert [record['id'] for record in records] == [0, 1, 2, 3]
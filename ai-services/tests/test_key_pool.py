@@ -0,0 +1,127 @@
+"""APIKeyPool scheduling against the offline stub backend"""
+
+import asyncio
+
+import pytest
+from google.api_core.exceptions import ResourceExhausted
+
+from app.services.gemini_service import GeminiService
+from app.services.key_pool import APIKeyPool, RateLimitError, is_rate_limit_error
+from app.services.llm_backends import StubBackend, StubBackendError
+
+
+@pytest.fixture
+def backend(monkeypatch):
+    """Two stub keys, each allowed 2 requests per minute by the fake server"""
+    monkeypatch.setenv('STUB_LATENCY_MS', '0')
+    monkeypatch.setenv('STUB_API_KEYS', '2')
+    monkeypatch.setenv('STUB_KEY_RPM', '2')
+    return StubBackend()
+
+
+def exhaust(backend: StubBackend, api_key: str):
+    """Use up a key's server-side quota outside the pool"""
+    for _ in range(backend.key_rpm):
+        asyncio.run(backend.generate(api_key, 'warm up', 10, 0.0))
+
+
+def test_429_cools_key_down_and_fails_over(backend):
+    pool = APIKeyPool(backend.api_keys(), rpm=100, cooldown_seconds=30)
+    exhaust(backend, 'stub-key-1')
+
+    result = asyncio.run(pool.execute(lambda key: backend.generate(key, 'hello', 10, 0.0)))
+
+    assert result
+    stats = pool.get_stats()
+    assert stats['rate_limited'] == 1
+    assert stats['retries'] == 1
+    key_1, key_2 = stats['keys']
+    assert key_1['cooling_down'] and key_1['rate_limited'] == 1
+    assert not key_2['cooling_down'] and key_2['calls'] == 1
+
+
+def test_cooling_key_is_skipped(backend):
+    pool = APIKeyPool(backend.api_keys(), rpm=100, cooldown_seconds=30)
+    exhaust(backend, 'stub-key-1')
+
+    async def two_calls():
+        for _ in range(2):
+            await pool.execute(lambda key: backend.generate(key, 'hello', 10, 0.0))
+
+    asyncio.run(two_calls())
+
+    assert pool.get_stats()['rate_limited'] == 1
+    assert backend.stats['rate_limited'] == 1
+    assert [key['calls'] for key in pool.get_stats()['keys']] == [1, 2]
+
+
+def test_gives_up_when_every_key_is_rejected(backend):
+    pool = APIKeyPool(backend.api_keys(), rpm=100, cooldown_seconds=30, queue_timeout=0.5)
+    exhaust(backend, 'stub-key-1')
+    exhaust(backend, 'stub-key-2')
+
+    with pytest.raises(RateLimitError):
+        asyncio.run(pool.execute(lambda key: backend.generate(key, 'hello', 10, 0.0)))
+    assert all(key['cooling_down'] for key in pool.get_stats()['keys'])
+
+
+def test_stream_fails_over_to_another_key(backend, monkeypatch):
+    monkeypatch.setenv('LLM_CACHE_ENABLED', 'false')
+    service = GeminiService(backend=backend)
+    exhaust(backend, 'stub-key-1')
+
+    async def stream():
+        return [chunk async for chunk in service.stream_content('hello', max_tokens=50)]
+
+    assert asyncio.run(stream())
+    stats = service.key_pool.get_stats()
+    assert stats['rate_limited'] == 1
+    assert stats['keys'][1]['calls'] == 1
+
+
+def test_only_rate_limit_errors_are_recognized():
+    assert is_rate_limit_error(RateLimitError())
+    assert is_rate_limit_error(ResourceExhausted('quota exceeded'))
+    assert not is_rate_limit_error(StubBackendError('500 simulated upstream error'))
+    assert not is_rate_limit_error(ValueError('order 429 not found'))
+
+
+def test_last_attempt_429_still_cools_key_down(backend):
+    pool = APIKeyPool(backend.api_keys(), rpm=100, cooldown_seconds=30)
+    exhaust(backend, 'stub-key-1')
+
+    with pytest.raises(RateLimitError):
+        asyncio.run(pool.execute(lambda key: backend.generate(key, 'hello', 10, 0.0), max_attempts=1))
+
+    key_1 = pool.get_stats()['keys'][0]
+    assert key_1['cooling_down'] and key_1['rate_limited'] == 1
+    assert pool.keys[0].cooldown_until - pool.clock() > 30  # the stub's Retry-After, not the default
+
+
+def test_failed_call_refunds_its_token_reservation(backend):
+    pool = APIKeyPool(backend.api_keys(), rpm=100, tpm=1000)
+
+    async def fail(key):
+        raise StubBackendError('500 simulated upstream error')
+
+    with pytest.raises(StubBackendError):
+        asyncio.run(pool.execute(fail, estimated_tokens=400))
+
+    state = next(state for state in pool.keys if state.stats['calls'])
+    assert state.tokens.tokens == pytest.approx(1000, abs=1)
+    assert not pool.get_stats()['rate_limited']
+
+
+def test_stream_uses_retry_after_for_cooldown(backend, monkeypatch):
+    monkeypatch.setenv('LLM_CACHE_ENABLED', 'false')
+    monkeypatch.setenv('GEMINI_KEY_COOLDOWN_SECONDS', '5')
+    service = GeminiService(backend=backend)
+    exhaust(backend, 'stub-key-1')
+
+    async def stream():
+        return [chunk async for chunk in service.stream_content('hello', max_tokens=50)]
+
+    asyncio.run(stream())
+
+    pool = service.key_pool
+    assert pool.keys[0].cooldown_until - pool.clock() > 30
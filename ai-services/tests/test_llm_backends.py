@@ -0,0 +1,22 @@
+"""LLMBackend interface"""
+
+import pytest
+
+from app.services.llm_backends import LLMBackend, StubBackend
+
+
+def test_backend_missing_a_method_fails_on_creation():
+    class NoStreaming(LLMBackend):
+        def api_keys(self):
+            return ['key']
+
+        async def generate(self, api_key, prompt, max_tokens, temperature):
+            return ''
+
+    with pytest.raises(TypeError, match='open_stream'):
+        NoStreaming()
+
+
+def test_stub_backend_implements_the_interface(monkeypatch):
+    monkeypatch.setenv('STUB_LATENCY_MS', '0')
+    assert StubBackend().api_keys()
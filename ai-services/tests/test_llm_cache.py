@@ -0,0 +1,79 @@
+"""LLMCache memory and SQLite tiers, TTL expiry and key separation"""
+
+import asyncio
+
+import pytest
+
+from app.services import llm_cache
+from app.services.llm_cache import LLMCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable time.time for the cache module"""
+    now = [1_000_000.0]
+    monkeypatch.setattr(llm_cache.time, 'time', lambda: now[0])
+    return now
+
+
+@pytest.fixture(autouse=True)
+def enabled(monkeypatch):
+    monkeypatch.setenv('LLM_CACHE_ENABLED', 'true')
+
+
+def test_memory_tier_evicts_least_recently_used():
+    cache = LLMCache(max_entries=2, disk_path='')
+
+    async def main():
+        await cache.set('a', 'A')
+        await cache.set('b', 'B')
+        await cache.get('a')
+        await cache.set('c', 'C')
+        return [await cache.get(key) for key in ('a', 'b', 'c')]
+
+    assert asyncio.run(main()) == ['A', None, 'C']
+    assert cache.get_stats()['evictions'] == 1
+
+
+def test_disk_tier_survives_a_new_instance(tmp_path):
+    path = str(tmp_path / 'llm_cache.sqlite3')
+
+    asyncio.run(LLMCache(disk_path=path).set('key', 'value'))
+    reopened = LLMCache(disk_path=path)
+
+    assert asyncio.run(reopened.get('key')) == 'value'
+    assert reopened.get_stats()['disk_hits'] == 1
+    assert asyncio.run(reopened.get('key')) == 'value'
+    assert reopened.get_stats()['memory_hits'] == 1
+
+
+def test_entries_expire_after_ttl_in_both_tiers(tmp_path, clock):
+    cache = LLMCache(disk_path=str(tmp_path / 'llm_cache.sqlite3'), ttl_seconds=60)
+    asyncio.run(cache.set('key', 'value'))
+
+    clock[0] += 59
+    assert asyncio.run(cache.get('key')) == 'value'
+    clock[0] += 2
+    assert asyncio.run(cache.get('key')) is None
+    assert cache.get_stats()['misses'] == 1
+
+
+def test_explicit_zero_ttl_is_not_replaced_by_the_default(clock):
+    cache = LLMCache(disk_path='', ttl_seconds=0)
+    asyncio.run(cache.set('key', 'value'))
+    clock[0] += 1
+
+    assert cache.ttl_seconds == 0
+    assert asyncio.run(cache.get('key')) is None
+
+
+def test_keys_separate_prompt_model_and_config():
+    base = LLMCache.make_key('prompt', 'model-a', {'max_tokens': 100, 'temperature': 0.7})
+
+    assert base == LLMCache.make_key('prompt', 'model-a', {'temperature': 0.7, 'max_tokens': 100})
+    assert len({
+        base,
+        LLMCache.make_key('prompt 2', 'model-a', {'max_tokens': 100, 'temperature': 0.7}),
+        LLMCache.make_key('prompt', 'model-b', {'max_tokens': 100, 'temperature': 0.7}),
+        LLMCache.make_key('prompt', 'model-a', {'max_tokens': 200, 'temperature': 0.7}),
+    }) == 4
@@ -0,0 +1,102 @@
+"""Single-flight coalescing of identical Gemini calls"""
+
+import asyncio
+
+import pytest
+
+from app.services.gemini_service import GeminiService
+from app.services.request_coalescer import RequestCoalescer
+
+
+@pytest.fixture
+def service(monkeypatch):
+    """Gemini service whose upstream call blocks until release() and counts its calls"""
+    monkeypatch.setenv('LLM_CACHE_ENABLED', 'false')
+    service = GeminiService()
+    service.upstream_calls = 0
+
+    async def generate_upstream(prompt, max_tokens, temperature, timeout, cache_key=None):
+        service.upstream_calls += 1
+        await service.released.wait()
+        return f"reply {service.upstream_calls}"
+
+    monkeypatch.setattr(service, '_generate_upstream', generate_upstream)
+    return service
+
+
+def run_concurrently(service, *use_cache):
+    """Start one generate_content per flag, let them all reach upstream, then release them"""
+    async def main():
+        service.released = asyncio.Event()
+        calls = [asyncio.create_task(service.generate_content('same prompt', use_cache=flag)) for flag in use_cache]
+        await asyncio.sleep(0)
+        service.released.set()
+        return await asyncio.gather(*calls)
+
+    return asyncio.run(main())
+
+
+def test_identical_calls_share_one_upstream_call(service):
+    assert run_concurrently(service, True, True) == ['reply 1', 'reply 1']
+    assert service.upstream_calls == 1
+
+
+def test_cache_bypass_does_not_join_in_flight_call(service):
+    run_concurrently(service, True, False)
+
+    assert service.upstream_calls == 2
+    assert service.coalescer.get_stats()['deduplicated'] == 0
+
+
+def test_cancelled_waiter_leaves_the_shared_call_running():
+    coalescer = RequestCoalescer()
+    released = asyncio.Event()
+    cancelled = []
+
+    async def upstream():
+        try:
+            await released.wait()
+            return 'result'
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    async def main():
+        first = asyncio.create_task(coalescer.run('key', upstream))
+        second = asyncio.create_task(coalescer.run('key', upstream))
+        await asyncio.sleep(0)
+        first.cancel()
+        await asyncio.sleep(0)
+        released.set()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(main()) == 'result'
+    assert not cancelled
+    assert coalescer.get_stats() == {'upstream_calls': 1, 'deduplicated': 1, 'in_flight': 0}
+
+
+def test_shared_call_is_cancelled_when_every_waiter_leaves():
+    coalescer = RequestCoalescer()
+    cancelled = []
+
+    async def upstream():
+        try:
+            await asyncio.Event().wait()
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    async def main():
+        waiters = [asyncio.create_task(coalescer.run('key', upstream)) for _ in range(2)]
+        await asyncio.sleep(0)
+        for waiter in waiters:
+            waiter.cancel()
+        await asyncio.gather(*waiters, return_exceptions=True)
+        await asyncio.sleep(0)
+
+    asyncio.run(main())
+
+    assert cancelled == [True]
+    assert coalescer.get_stats()['in_flight'] == 0
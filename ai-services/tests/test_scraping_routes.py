@@ -0,0 +1,134 @@
+"""Scraping and monitoring routes against the local fixture web server with scripted Gemini replies"""
+
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from app.routes import scraping
+from app.scripts.bench_fixtures import build_site, start_fixture_server
+from app.services.monitor_service import PageMonitor
+from app.services.scraper_service import ScraperService
+
+
+@pytest.fixture
+def scraper(monkeypatch):
+    """A fresh scraper with an in-memory cache, used by the routes"""
+    monkeypatch.setenv('SCRAPER_FETCH_MODE', 'http')
+    monkeypatch.setenv('SCRAPE_CACHE_ENABLED', 'true')
+    monkeypatch.setenv('SCRAPE_CACHE_PATH', '')
+    service = ScraperService()
+    monkeypatch.setattr(scraping, 'scraper_service', service)
+    return service
+
+
+def script_replies(monkeypatch, *replies):
+    """Make generate_content_with_json return the given parsed replies in order; returns the call list"""
+    calls = []
+
+    async def generate_content_with_json(prompt, max_tokens=2000):
+        calls.append(prompt)
+        return replies[len(calls) - 1]
+
+    monkeypatch.setattr(scraping.gemini_service, 'generate_content_with_json', generate_content_with_json)
+    return calls
+
+
+def scrape_twice(scraper):
+    """Scrape the same unchanged fixture page twice through the route"""
+    async def main():
+        runner, base_url = await start_fixture_server(build_site(pages=1, paragraphs=5))
+        request = scraping.ScrapeRequest(url=f"{base_url}/pages/0.html", project_id='project-1')
+        try:
+            return [await scraping.scrape_website(request) for _ in range(2)]
+        finally:
+            await scraper.close()
+            await runner.cleanup()
+
+    return asyncio.run(main())
+
+
+def test_analysis_is_reused_for_unchanged_page(scraper, monkeypatch):
+    analysis = {'insights': {'main_offerings': 'CRM'}, 'suggestions': [{'text': 'Add SSO'}]}
+    calls = script_replies(monkeypatch, analysis)
+
+    first, second = scrape_twice(scraper)
+
+    assert len(calls) == 1
+    assert not first.analysis_cached
+    assert second.analysis_cached and second.insights == analysis['insights']
+
+
+def test_unparseable_analysis_is_not_cached(scraper, monkeypatch):
+    analysis = {'insights': {'main_offerings': 'CRM'}, 'suggestions': []}
+    calls = script_replies(monkeypatch, {'content': 'not JSON'}, analysis)
+
+    first, second = scrape_twice(scraper)
+
+    assert len(calls) == 2
+    assert first.insights == {} and not first.analysis_cached
+    assert second.insights == analysis['insights'] and not second.analysis_cached
+
+
+def test_failed_change_analysis_is_retried_on_next_check(monkeypatch):
+    monkeypatch.setenv('SCRAPER_FETCH_MODE', 'http')
+    monitor = PageMonitor(ScraperService(), disk_path='')
+    monkeypatch.setattr(scraping, 'page_monitor', monitor)
+    calls = []
+
+    async def generate_content_with_json(prompt, max_tokens=2000):
+        calls.append(prompt)
+        if len(calls) == 1:
+            raise TimeoutError('simulated timeout')
+        return {'summary': 'Pricing changed'}
+
+    monkeypatch.setattr(scraping.gemini_service, 'generate_content_with_json', generate_content_with_json)
+    site = build_site(pages=1, paragraphs=5)
+
+    async def main():
+        runner, base_url = await start_fixture_server(site)
+        request = scraping.MonitorRequest(url=f"{base_url}/pages/0.html", project_id='project-1')
+        try:
+            baseline = await scraping.monitor_website(request)
+            site['/pages/0.html'] = site['/pages/0.html'].replace('</body>', '<p>New enterprise tier</p></body>')
+            with pytest.raises(HTTPException):
+                await scraping.monitor_website(request)
+            retried = await scraping.monitor_website(request)
+            after = await scraping.monitor_website(request)
+        finally:
+            await monitor.scraper.close()
+            await runner.cleanup()
+        return baseline, retried, after
+
+    baseline, retried, after = asyncio.run(main())
+
+    assert baseline.status == 'baseline'
+    assert retried.status == 'changed' and retried.analysis == {'summary': 'Pricing changed'}
+    assert after.status == 'unchanged'
+    assert len(calls) == 2
+
+
+def test_not_modified_without_cached_copy_refetches(scraper, monkeypatch):
+    fetch_http = scraper._fetch_http
+    sent = []
+
+    async def answer_304_first(url, validators=None):
+        sent.append(dict(validators or {}))
+        if len(sent) == 1:
+            return None, 'not_modified', {}
+        return await fetch_http(url, validators)
+
+    monkeypatch.setattr(scraper, '_fetch_http', answer_304_first)
+
+    async def main():
+        runner, base_url = await start_fixture_server(build_site(pages=1, paragraphs=5))
+        try:
+            return await scraper.scrape(f"{base_url}/pages/0.html")
+        finally:
+            await scraper.close()
+            await runner.cleanup()
+
+    data = asyncio.run(main())
+
+    assert sent == [{}, {}]
+    assert data['text'] and data['cache_status'] == 'miss'